@@ -0,0 +1,76 @@
+"""
+Benchmark of the pump.fun buy instruction build time.
+
+Compares building the data buffer and the twelve account metas on every call
+(as RpcTransaction used to) against InstructionTemplates.
+
+    python -m benchmarks.bench_instructions
+"""
+import struct
+import timeit
+
+from solders.instruction import Instruction, AccountMeta
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from src.constants import (
+    PUMP_GLOBAL,
+    PUMP_FEE,
+    PUMP_EVENT_AUTHORITY,
+    PUMP_PROGRAM,
+    SYSTEM_PROGRAM,
+    SYSTEM_TOKEN_PROGRAM,
+    SYSTEM_RENT,
+)
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.transactions.instruction_templates import InstructionTemplates
+
+RUNS = 20_000
+
+
+def build_per_call(transaction, user, ata, amount, sol_amount):
+    data = bytearray()
+    data.extend(struct.pack("<Q", 16927863322537952870))
+    data.extend(struct.pack("<Q", amount))
+    data.extend(struct.pack("<Q", sol_amount))
+    return Instruction(
+        PUMP_PROGRAM,
+        bytes(data),
+        [
+            AccountMeta(pubkey=PUMP_GLOBAL, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=PUMP_FEE, is_signer=False, is_writable=True),
+            AccountMeta(pubkey=transaction.token.mint, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=transaction.bondingCurveKey, is_signer=False, is_writable=True),
+            AccountMeta(
+                pubkey=transaction.associatedBondingCurveKey, is_signer=False, is_writable=True
+            ),
+            AccountMeta(pubkey=ata, is_signer=False, is_writable=True),
+            AccountMeta(pubkey=user, is_signer=True, is_writable=True),
+            AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=SYSTEM_RENT, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=PUMP_PROGRAM, is_signer=False, is_writable=False),
+        ],
+    )
+
+
+def main():
+    user, ata = Keypair().pubkey(), Pubkey.new_unique()
+    transaction = Transaction(token=Token(mint=Pubkey.new_unique()))
+    transaction.set_associated_bonding_curve()
+    templates = InstructionTemplates(user)
+
+    assert build_per_call(transaction, user, ata, 1, 2) == templates.buy(transaction, ata, 1, 2)
+
+    for name, build in [
+        ("per call", lambda: build_per_call(transaction, user, ata, 1_000, 2_000)),
+        ("template", lambda: templates.buy(transaction, ata, 1_000, 2_000)),
+    ]:
+        elapsed = min(timeit.repeat(build, number=RUNS, repeat=5))
+        print(f"{name:<10} {elapsed / RUNS * 1e6:>8.2f} us/instruction")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark of the websocket message routing on a recorded stream.
+
+Compares decoding + parsing every frame against prefiltering raw frames first.
+
+    python -m benchmarks.bench_prefilter
+"""
+import json
+import random
+import time
+
+from src.parser import Parser
+from src.prefilter import Prefilter
+
+FIXTURES = "tests/etc/transactions"
+STREAM_SIZE = 100_000
+CREATE_RATIO = 0.02
+TRACKED_RATIO = 0.05
+
+
+def record_stream(size: int = STREAM_SIZE) -> tuple[list[str], set[str]]:
+    """Build a stream of raw frames from the test fixtures, with random mints."""
+    templates = {}
+    for tx_type in ["create", "buy", "sell"]:
+        with open(f"{FIXTURES}/{tx_type}.json") as f:
+            templates[tx_type] = json.load(f)
+
+    tracked = {templates["buy"]["mint"]}
+    untracked = [templates["create"]["mint"]]
+
+    random.seed(42)
+    stream = []
+    for _ in range(size):
+        roll = random.random()
+        if roll < CREATE_RATIO:
+            frame = templates["create"]
+        else:
+            frame = dict(templates[random.choice(["buy", "sell"])])
+            if roll > CREATE_RATIO + TRACKED_RATIO:
+                frame["mint"] = random.choice(untracked)
+        stream.append(json.dumps(frame))
+    return stream, tracked
+
+
+def baseline(stream: list[str], tracked: set[str]) -> int:
+    kept = 0
+    for frame in stream:
+        tx = Parser(json.loads(frame)).parse()
+        if tx.txType == "create" or str(tx.token.mint) in tracked:
+            kept += 1
+    return kept
+
+
+def prefiltered(stream: list[str], tracked: set[str]) -> int:
+    prefilter = Prefilter()
+    kept = 0
+    for frame in stream:
+        if prefilter.accept(frame, tracked):
+            Parser.decode(frame)
+            kept += 1
+    return kept
+
+
+def main():
+    stream, tracked = record_stream()
+    for name, route in [("json.loads + Parser", baseline), ("Prefilter", prefiltered)]:
+        start = time.perf_counter()
+        kept = route(stream, tracked)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:<20} {len(stream) / elapsed:>12,.0f} msg/s ({kept} of {len(stream)} kept)"
+        )
+
+
+if __name__ == "__main__":
+    main()
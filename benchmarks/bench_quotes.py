@@ -0,0 +1,69 @@
+"""
+Benchmark of the bonding curve sell quotes.
+
+Compares Transaction.tokens_for_sol (one float quote per call) and the same
+u64 math as the program on Python ints against QuoteEngine.sell, quoting every
+size against every mint in one call.
+
+    python -m benchmarks.bench_quotes
+"""
+import random
+import timeit
+
+from src.models.token import Token
+from src.models.transaction import Transaction
+from benchmarks.quote_engine import QuoteEngine
+
+MINTS = 10
+QUOTES = [10, 1_000, 100_000]
+
+
+def sell_u64(tokens, sol_reserves, token_reserves, fee_basis_points=100):
+    output = tokens * sol_reserves // (token_reserves + tokens)
+    return output - output * fee_basis_points // 10_000
+
+
+def main():
+    random.seed(42)
+    sol_reserves = [random.randint(30 * 10**9, 80 * 10**9) for _ in range(MINTS)]
+    token_reserves = [random.randint(3 * 10**14, 1_073 * 10**12) for _ in range(MINTS)]
+    transactions = [
+        Transaction(
+            token=Token(mint=str(mint)),
+            vSolInBondingCurve=sol / 1e9,
+            vTokensInBondingCurve=tokens / 1e6,
+        )
+        for mint, (sol, tokens) in enumerate(zip(sol_reserves, token_reserves))
+    ]
+    engine = QuoteEngine(range(MINTS), sol_reserves, token_reserves)
+
+    for quotes in QUOTES:
+        sizes = [random.randint(10**6, 10**13) for _ in range(max(quotes // MINTS, 1))]
+
+        def scalar():
+            return [tx.tokens_for_sol(size / 1e6) for tx in transactions for size in sizes]
+
+        def scalar_u64():
+            return [
+                sell_u64(size, sol, tokens)
+                for sol, tokens in zip(sol_reserves, token_reserves)
+                for size in sizes
+            ]
+
+        assert engine.sell(sizes).ravel().tolist() == scalar_u64()
+
+        runs = max(100_000 // quotes, 1)
+        for name, quote in [
+            ("scalar float", scalar),
+            ("scalar u64", scalar_u64),
+            ("QuoteEngine", lambda: engine.sell(sizes)),
+        ]:
+            elapsed = min(timeit.repeat(quote, number=runs, repeat=5)) / runs
+            print(
+                f"{quotes:>7} quotes  {name:<12} {elapsed * 1e3:>9.3f} ms "
+                f"({quotes / elapsed:>14,.0f} quotes/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark of the similar token name lookup done on every create event.
+
+Compares scanning every stored name with SequenceMatcher.ratio() against
+SimilarityIndex, at 1k, 10k and 100k stored names.
+
+    python -m benchmarks.bench_similarity
+"""
+import difflib
+import random
+import string
+import time
+
+from src.similarity import SimilarityIndex
+
+SIZES = [1_000, 10_000, 100_000]
+QUERIES = 20
+THRESHOLD = 0.6
+
+
+def random_name(rng: random.Random) -> str:
+    words = [
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+        for _ in range(rng.randint(1, 3))
+    ]
+    return " ".join(words).title()
+
+
+def linear(names: list[str], new_name: str) -> bool:
+    for name in names:
+        if difflib.SequenceMatcher(None, name.lower(), new_name.lower()).ratio() >= THRESHOLD:
+            return True
+    return False
+
+
+def timed(lookup, queries: list[str]) -> float:
+    """Mean lookup latency in milliseconds."""
+    start = time.perf_counter()
+    for query in queries:
+        lookup(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'names':>8} {'linear (ms)':>12} {'index (ms)':>12} {'build (s)':>10} {'similar':>8}")
+    for size in SIZES:
+        names = [random_name(rng) for _ in range(size)]
+        queries = [random_name(rng) for _ in range(QUERIES)]
+
+        start = time.perf_counter()
+        index = SimilarityIndex(names)
+        build = time.perf_counter() - start
+
+        similar = sum(index.find(query, THRESHOLD) is not None for query in queries)
+        # The linear scan returns on the first similar name, like the index
+        linear_ms = timed(lambda query: linear(names, query), queries)
+        index_ms = timed(lambda query: index.find(query, THRESHOLD), queries)
+        print(
+            f"{size:>8} {linear_ms:>12.2f} {index_ms:>12.2f} {build:>10.2f} {similar:>5}/{QUERIES}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Vectorized u64 quotes of the pump.fun bonding curve, every size against every
+mint in one call. Not used by the bot: numpy is a dev dependency, the engine is
+measured by bench_quotes and tested against the program math.
+"""
+from typing import Sequence
+
+import numpy as np
+
+from src.constants import PUMP_FEE_BASIS_POINTS, SOL_DECIMALS, TOKEN_DECIMALS
+from src.curve_mirror import CurveMirror
+
+U64 = np.uint64
+I64 = np.int64
+BASIS_POINTS = U64(10_000)
+
+
+def _mul_div(a: np.ndarray, b: np.ndarray, divisor: np.ndarray) -> np.ndarray:
+    """
+    floor(a * b / divisor) of u64 arrays, as the program computes it with a
+    128-bit intermediate product.
+
+    The quotient is estimated in float64, a few units off at most, then fixed
+    with the exact remainder a * b - quotient * divisor: it is small, so its
+    value modulo 2**64 (wrapping u64 products) is the remainder itself. Exact
+    for quotients below 2**53 and divisors below 2**61, any pump.fun amount.
+    """
+    a, b, divisor = np.broadcast_arrays(a, b, divisor)
+    quotient = np.floor(a.astype(np.float64) * b / divisor).astype(U64)
+    remainder = (a * b - quotient * divisor).view(I64)
+    return (quotient.view(I64) + remainder // divisor.view(I64)).view(U64)
+
+
+class QuoteEngine:
+    """
+    pump.fun bonding curve quotes of arrays of trade sizes across arrays of
+    mints, in one call.
+
+    Amounts and reserves are u64 base units (lamports, token base units) and
+    the math is the integer math of the program: 128-bit intermediate
+    products, floor divisions. Sizes are quoted against every mint, results
+    have the shape (mints, sizes).
+    """
+
+    def __init__(
+        self,
+        mints: Sequence[str],
+        sol_reserves: Sequence[int],
+        token_reserves: Sequence[int],
+        fee_basis_points: int = PUMP_FEE_BASIS_POINTS,
+    ):
+        self.mints = list(mints)
+        self.sol_reserves = np.asarray(sol_reserves, dtype=U64)[:, None]
+        self.token_reserves = np.asarray(token_reserves, dtype=U64)[:, None]
+        self.fee_basis_points = U64(fee_basis_points)
+
+    @classmethod
+    def from_mirror(
+        cls, mirror: CurveMirror, fee_basis_points: int = PUMP_FEE_BASIS_POINTS
+    ) -> "QuoteEngine":
+        """Engine over every mint of the mirror with known reserves."""
+        curves = [(mint, state) for mint, state in mirror.curves.items() if state is not None]
+        return cls(
+            [mint for mint, _ in curves],
+            [round(state.sol_reserves * SOL_DECIMALS) for _, state in curves],
+            [round(state.token_reserves * TOKEN_DECIMALS) for _, state in curves],
+            fee_basis_points,
+        )
+
+    def __len__(self) -> int:
+        return len(self.mints)
+
+    def buy(self, lamports: Sequence[int]) -> np.ndarray:
+        """Tokens received for lamports spent on the curve (fee excluded)."""
+        lamports = self.__sizes(lamports)
+        remaining = _mul_div(
+            self.sol_reserves, self.token_reserves, self.sol_reserves + lamports
+        ) + U64(1)
+        return np.where(remaining < self.token_reserves, self.token_reserves - remaining, U64(0))
+
+    def buy_cost(self, tokens: Sequence[int]) -> np.ndarray:
+        """Lamports paid for tokens, fee included. Sizes buying out the curve cost 2**64 - 1."""
+        tokens = self.__sizes(tokens)
+        available = tokens < self.token_reserves
+        tokens = np.where(available, tokens, U64(0))
+        cost = _mul_div(tokens, self.sol_reserves, self.token_reserves - tokens) + U64(1)
+        cost += self.__fee(cost)
+        return np.where(available, cost, np.iinfo(U64).max)
+
+    def sell(self, tokens: Sequence[int]) -> np.ndarray:
+        """Lamports received for tokens, fee deducted."""
+        tokens = self.__sizes(tokens)
+        output = _mul_div(tokens, self.sol_reserves, self.token_reserves + tokens)
+        return output - self.__fee(output)
+
+    def __fee(self, lamports: np.ndarray) -> np.ndarray:
+        return _mul_div(lamports, self.fee_basis_points, BASIS_POINTS)
+
+    @staticmethod
+    def __sizes(sizes: Sequence[int]) -> np.ndarray:
+        return np.atleast_1d(np.asarray(sizes, dtype=U64))[None, :]
@@ -9,20 +9,24 @@ from src.storage import Storage
 load_dotenv()
 
 POLL_INTERVAL = float(os.getenv("POLL_INTERVAL"))
+HOT_RECONNECT = os.getenv("HOT_RECONNECT", "true").lower() == "true"
 
 
 async def main():
     storage = Storage()
     storage.load()
-    bot = Bot(storage=storage, is_rpc=False)
-
-    while True:
-        try:
-            await bot.run()
-        except Exception as e:
-            traceback.print_exc()
-            print(f"[ERROR] WebSocket connection lost: {e}. Reconnecting ...")
-            await asyncio.sleep(POLL_INTERVAL)
+    bot = Bot(storage=storage, is_rpc=False, hot_reconnect=HOT_RECONNECT)
+
+    try:
+        while True:
+            try:
+                await bot.run()
+            except Exception as e:
+                traceback.print_exc()
+                print(f"[ERROR] WebSocket connection lost: {e}. Reconnecting ...")
+                await asyncio.sleep(POLL_INTERVAL)
+    finally:
+        await bot.close()
 
 
 if __name__ == "__main__":
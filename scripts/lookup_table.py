@@ -0,0 +1,63 @@
+"""
+Create the address lookup table of the static pump.fun accounts, or extend an
+existing one with the accounts it misses. The wallet of WALLET_PRIVATE_KEY is
+the table authority and pays the rent.
+
+    python -m scripts.lookup_table [TABLE_ADDRESS]
+
+Set the printed address as PUMP_LOOKUP_TABLE to send v0 transactions.
+"""
+import asyncio
+import os
+import sys
+
+from dotenv import load_dotenv
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.commitment import Confirmed, Finalized
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.pubkey import Pubkey
+from solders.transaction import Transaction as SolTransaction
+
+from src.transactions.lookup_table import (
+    PUMP_STATIC_ACCOUNTS,
+    create_lookup_table,
+    extend_lookup_table,
+    load_lookup_table,
+)
+
+load_dotenv()
+
+
+async def main():
+    account = Keypair.from_base58_string(os.getenv("WALLET_PRIVATE_KEY"))
+    authority = account.pubkey()
+    client = AsyncClient(os.getenv("SOLANA_RPC_URL"))
+
+    if len(sys.argv) > 1:
+        address = Pubkey.from_string(sys.argv[1])
+        table = await load_lookup_table(client, address)
+        missing = [pubkey for pubkey in PUMP_STATIC_ACCOUNTS if pubkey not in table.addresses]
+        instructions = []
+    else:
+        slot = (await client.get_slot(commitment=Finalized)).value
+        create, address = create_lookup_table(authority, authority, slot)
+        missing = PUMP_STATIC_ACCOUNTS
+        instructions = [create]
+
+    if missing:
+        instructions.append(extend_lookup_table(address, authority, authority, missing))
+        blockhash = (await client.get_latest_blockhash(commitment=Confirmed)).value.blockhash
+        transaction = SolTransaction([account], Message(instructions, authority), blockhash)
+        signature = (await client.send_transaction(transaction)).value
+        await client.confirm_transaction(signature, commitment=Confirmed)
+        print(f"INFO [LOOKUP TABLE] {len(missing)} address(es) added: {signature}")
+    else:
+        print("INFO [LOOKUP TABLE] Every static pump.fun account is already in the table")
+
+    print(f"PUMP_LOOKUP_TABLE={address}")
+    await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
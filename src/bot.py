@@ -1,15 +1,21 @@
 import asyncio
 import json
 import os
+import time
 import websockets
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
-from solana.rpc.async_api import AsyncClient
+from solders.address_lookup_table_account import AddressLookupTableAccount
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 
-from .storage import Storage
+from .curve_mirror import CurveMirror
+from .dispatcher import Dispatcher
+from .prefilter import Prefilter
+from .scheduler import Scheduler
+from .storage import Storage, StorageWriter
+from .subscriptions import SubscriptionManager
 from .utils import Utils
 from .constants import (
     PUMP_GLOBAL,
@@ -27,7 +33,19 @@ from .constants import (
 from .models.transaction import Transaction
 from .models.token import Token
 from .parser import Parser
-from .transactions.pumpportal_transaction import PumpPortalTransaction
+from .transactions.blockhash_cache import BlockhashCache
+from .transactions.compute_units import ComputeUnitEstimator
+from .transactions.balance_cache import BalanceCache
+from .transactions.confirmation_manager import ConfirmationManager
+from .transactions.fanout_client import FanoutClient
+from .transactions.fee_oracle import FeeOracle, BUY, SELL, STOP_LOSS
+from .transactions.http_session import HttpSession
+from .transactions.instruction_templates import InstructionTemplates
+from .transactions.lookup_table import load_lookup_table
+from .transactions.presigned_sells import PresignedSells
+from .transactions.rebroadcaster import Rebroadcaster
+from .transactions.reconciliation import OnChainPosition, reconcile
+from .transactions.pumpportal_transaction import PumpPortalTransaction, PUMPPORTAL_BASE_URL
 from .transactions.rpc_transaction import RpcTransaction
 
 load_dotenv()
@@ -35,30 +53,116 @@ load_dotenv()
 # Configuration
 WALLET_PRIVATE_KEY = os.getenv("WALLET_PRIVATE_KEY")
 SOLANA_RPC_URL = os.getenv("SOLANA_RPC_URL")
+SOLANA_RPC_URLS = [
+    url.strip() for url in os.getenv("SOLANA_RPC_URLS", "").split(",") if url.strip()
+]
+SOLANA_WS_URL = os.getenv("SOLANA_WS_URL") or SOLANA_RPC_URL.replace("http", "ws", 1)
 PUMPPORTAL_API_KEY = os.getenv("PUMPPORTAL_API_KEY", None)
 BUY_AMOUNT_SOL = float(os.getenv("BUY_AMOUNT_SOL"))
 SLIPPAGE_PERCENT = float(os.getenv("SLIPPAGE_PERCENT")) / 100
 SLIPPAGE_BPS = int(os.getenv("SLIPPAGE_PERCENT"))
 TRAILING_STOP_LOSS = float(os.getenv("TRAILING_STOP_LOSS")) / 100
 AUTO_SELL_AFTER_MINS = int(os.getenv("AUTO_SELL_AFTER_MINS", 0))  # 0 = disabled
+AUTO_SELL_RETRY_SECS = float(os.getenv("AUTO_SELL_RETRY_SECS", 30))
+STORAGE_FLUSH_DELAY = float(os.getenv("STORAGE_FLUSH_DELAY", 0.05))
+BLOCKHASH_REFRESH_SECS = float(os.getenv("BLOCKHASH_REFRESH_SECS", 2))
+REBROADCAST_INTERVAL_SECS = float(os.getenv("REBROADCAST_INTERVAL_SECS", 0.5))  # 0 = disabled
+PRIORITY_FEE_PERCENTILES = {
+    BUY: float(os.getenv("PRIORITY_FEE_BUY_PERCENTILE", 75)),
+    SELL: float(os.getenv("PRIORITY_FEE_SELL_PERCENTILE", 50)),
+    STOP_LOSS: float(os.getenv("PRIORITY_FEE_STOP_LOSS_PERCENTILE", 90)),
+}
+PRIORITY_FEE_MAX = int(os.getenv("PRIORITY_FEE_MAX", 100_000))
+PRIORITY_FEE_REFRESH_SECS = float(os.getenv("PRIORITY_FEE_REFRESH_SECS", 5))
+PUMPPORTAL_PRIORITY_FEE_MIN = float(os.getenv("PUMPPORTAL_PRIORITY_FEE_MIN", 0.0001))
+PUMPPORTAL_PRIORITY_FEE_MAX = float(os.getenv("PUMPPORTAL_PRIORITY_FEE_MAX", 0.005))
+COMPUTE_UNIT_MARGIN = float(os.getenv("COMPUTE_UNIT_MARGIN", 10)) / 100
+COMPUTE_UNIT_REVALIDATE_SECS = float(os.getenv("COMPUTE_UNIT_REVALIDATE_SECS", 300))
+PUMP_LOOKUP_TABLE = os.getenv("PUMP_LOOKUP_TABLE")  # None = legacy transactions
 MAX_TOKEN_TRACKED = int(os.getenv("MAX_TOKENS_TRACKED", 3))
+DISPATCH_QUEUE_SIZE = int(os.getenv("DISPATCH_QUEUE_SIZE", 1000))
+DISPATCH_DRAIN_SECS = float(os.getenv("DISPATCH_DRAIN_SECS", 10))
+SUBSCRIPTION_BATCH_SECS = float(os.getenv("SUBSCRIPTION_BATCH_SECS", 0.05))
+RECONNECT_BASE_DELAY = float(os.getenv("RECONNECT_BASE_DELAY", 0.1))
+RECONNECT_MAX_DELAY = float(os.getenv("RECONNECT_MAX_DELAY", 10))
+PUMPPORTAL_POOL_SIZE = int(os.getenv("PUMPPORTAL_POOL_SIZE", 4))
+PUMPPORTAL_HTTP2 = os.getenv("PUMPPORTAL_HTTP2", "false").lower() == "true"
 PUMP_WS_URL = "wss://pumpportal.fun/api/data"
 
 
 class Bot:
-    def __init__(self, storage: Storage = None, is_rpc: bool = True):
+    def __init__(
+        self, storage: Storage = None, is_rpc: bool = True, hot_reconnect: bool = False
+    ):
         self.storage: Storage = storage or Storage()
+        self.storage_writer = StorageWriter(self.storage, delay=STORAGE_FLUSH_DELAY)
         self.tracked_tokens: dict[str, Token] = {}
         self.token_purchase_time: dict[str, dict] = {}
         self.partial_sales: dict[str, dict] = {}
+        self.pending_buys: set[str] = set()
+        self.pending_sells: set[str] = set()
+        # Names of the tokens being bought, they are only stored once bought
+        self.pending_names: dict[str, str] = {}
+        # Bonding curve reserves of the tracked tokens, kept up to date by their trades
+        self.curves = CurveMirror()
+        self.dispatcher: Dispatcher | None = None
+        # Token trade subscriptions, sent in batches
+        self.subscriptions = SubscriptionManager(delay=SUBSCRIPTION_BATCH_SECS)
+        self.scheduler = Scheduler()
+        self.prefilter = Prefilter()
         self.account: Keypair = Keypair.from_base58_string(WALLET_PRIVATE_KEY)
         self.is_rpc = is_rpc
-        self.client = AsyncClient(SOLANA_RPC_URL)
+        # Reconnect to PumpPortal within run() instead of returning, keeping the positions
+        self.hot_reconnect = hot_reconnect
+        self.ws = None
+        self.reconnects = 0
+        self.max_gap = 0.0
+        # Transactions are sent to every endpoint, reads go to the fastest one
+        self.client = FanoutClient([SOLANA_RPC_URL, *SOLANA_RPC_URLS])
+        self.known_atas: set[Pubkey] = set()
+        self.instruction_templates = InstructionTemplates(self.account.pubkey())
+        # Filled on the first run when PUMP_LOOKUP_TABLE is set
+        self.lookup_tables: list[AddressLookupTableAccount] = []
+        self.blockhash_cache = BlockhashCache(self.client, refresh_interval=BLOCKHASH_REFRESH_SECS)
+        self.confirmations = ConfirmationManager(SOLANA_WS_URL, self.client)
+        # Token balances of the positions, from our fills and their token accounts
+        self.balance_cache = BalanceCache(SOLANA_WS_URL, self.client, self.account.pubkey())
+        self.rebroadcaster = Rebroadcaster(self.client, interval=REBROADCAST_INTERVAL_SECS)
+        self.fee_oracle = FeeOracle(
+            self.client,
+            percentiles=PRIORITY_FEE_PERCENTILES,
+            refresh_interval=PRIORITY_FEE_REFRESH_SECS,
+            max_price=PRIORITY_FEE_MAX,
+            # PumpPortal priority fees, in SOL
+            min_fee=PUMPPORTAL_PRIORITY_FEE_MIN,
+            max_fee=PUMPPORTAL_PRIORITY_FEE_MAX,
+        )
+        self.compute_units = ComputeUnitEstimator(
+            self.client,
+            self.blockhash_cache,
+            margin=COMPUTE_UNIT_MARGIN,
+            revalidate_interval=COMPUTE_UNIT_REVALIDATE_SECS,
+        )
+        self.presigned_sells = PresignedSells(
+            self.client,
+            self.account,
+            self.blockhash_cache,
+            self.instruction_templates,
+            fee_oracle=self.fee_oracle,
+            compute_units=self.compute_units,
+            lookup_tables=self.lookup_tables,
+            balance_cache=self.balance_cache,
+        )
+        self.http_session = HttpSession(
+            PUMPPORTAL_BASE_URL, max_connections=PUMPPORTAL_POOL_SIZE, http2=PUMPPORTAL_HTTP2
+        )
 
     async def run(self) -> None:
         """Main method of the bot."""
         print("INFO [BOT] Starting bot with:")
         print("RPC_URL:", SOLANA_RPC_URL)
+        if SOLANA_RPC_URLS:
+            print("RPC_URLS:", ", ".join(SOLANA_RPC_URLS))
         print("WALLET:", self.account.pubkey())
         print("BUY_AMOUNT_SOL:", BUY_AMOUNT_SOL)
         print("SLIPPAGE_PERCENT:", SLIPPAGE_PERCENT)
@@ -67,35 +171,193 @@ class Bot:
         print("MAX_TOKEN_TRACKED:", MAX_TOKEN_TRACKED)
         print("PUMP_WS_URL:", PUMP_WS_URL)
         print("-----------------------------------------------")
-        async with websockets.connect(PUMP_WS_URL) as ws:
-
-            await self.subscribe_new_tokens(ws)
-
-            await self.__reload_tracked_tokens(ws)
-
-            async for message in ws:
-                tx = Parser(json.loads(message)).parse()
-                if tx:
-                    token_address = str(tx.token.mint)
-
-                    if tx.txType == "create" \
-                       and Utils.is_similar_token(self.storage.tokens, tx.token.name) is False:
-                        await self.__buy_token(ws, tx)
-
-                    elif tx.txType == "buy":
-                        price = tx.token_price()
-
-                        if token_address in self.tracked_tokens:
-                            self.tracked_tokens[token_address].price = price
+        if not self.is_rpc:
+            await self.http_session.warmup()
+        elif PUMP_LOOKUP_TABLE and not self.lookup_tables:
+            await self.__load_lookup_table()
 
-                    elif tx.txType == "sell":
-                        price = tx.token_price()
-                        if token_address in self.tracked_tokens and price is not None:
-                            await self.__sell_token(ws, tx)
+        self.dispatcher = Dispatcher(
+            lambda message: self.__route_message(self.ws, message),
+            maxsize=DISPATCH_QUEUE_SIZE,
+        )
+        self.dispatcher.start()
+        self.scheduler.start()
+        self.storage_writer.start()
+        self.fee_oracle.start()
+        if self.is_rpc:
+            self.blockhash_cache.start()
+            self.presigned_sells.start()
+            self.confirmations.start()
+            self.balance_cache.start()
+        try:
+            await self.__listen()
+        finally:
+            print(
+                f"INFO [DISPATCHER] Max queue depth: {self.dispatcher.max_depth}, "
+                f"{self.dispatcher.waited} frame(s) waited for room, "
+                f"{self.prefilter.dropped}/{self.prefilter.received} messages dropped"
+            )
+            print(
+                f"INFO [WEBSOCKET] {len(self.subscriptions)} token(s) subscribed, "
+                f"{self.subscriptions.frames} subscription frame(s) sent"
+            )
+            await self.scheduler.stop()
+            # Let the buys being sent be stored before their confirmations are dropped
+            await self.dispatcher.stop(timeout=DISPATCH_DRAIN_SECS)
+            await self.rebroadcaster.stop()
+            await self.confirmations.stop()
+            await self.balance_cache.stop()
+            await self.storage_writer.stop()
+            await self.presigned_sells.stop()
+            await self.compute_units.stop()
+            await self.blockhash_cache.stop()
+            await self.fee_oracle.stop()
+            prices = ", ".join(
+                f"{tier}: {self.fee_oracle.price(tier)}" for tier in self.fee_oracle.percentiles
+            )
+            print(f"INFO [FEE ORACLE] Unit prices (micro-lamports/CU): {prices}")
+            if self.is_rpc:
+                print(
+                    f"INFO [CONFIRM RPC] {self.confirmations.confirmed} confirmed, "
+                    f"{self.confirmations.failed} failed, "
+                    f"{self.confirmations.expired} expired, "
+                    f"max {self.confirmations.max_pending} pending"
+                )
+                for endpoint in self.client.endpoints:
+                    print(
+                        f"INFO [RPC] {endpoint.url}: {endpoint.requests} request(s), "
+                        f"{endpoint.success_rate:.0%} success, "
+                        f"latency: {endpoint.latency * 1000:.1f}ms"
+                    )
+                print(
+                    f"INFO [RPC] {self.rebroadcaster.attempts} rebroadcast(s), "
+                    f"{self.rebroadcaster.errors} failed, mean latency: "
+                    f"{self.rebroadcaster.mean_latency * 1000:.1f}ms, max: "
+                    f"{self.rebroadcaster.max_latency * 1000:.1f}ms"
+                )
+                print(
+                    f"INFO [SELL RPC] {self.presigned_sells.hits} pre-signed sell(s) sent, "
+                    f"{self.presigned_sells.misses} built on the spot, "
+                    f"{self.presigned_sells.builds} signature(s)"
+                )
+                print(
+                    f"INFO [BALANCES] {self.balance_cache.hits} cached, "
+                    f"{self.balance_cache.misses} fetched, "
+                    f"{self.balance_cache.notifications} account notification(s)"
+                )
+                print(
+                    f"INFO [COMPUTE UNITS] {self.compute_units.simulations} simulation(s), "
+                    f"{self.compute_units.errors} failed, measured units: "
+                    f"{sorted(self.compute_units.units.values())}"
+                )
+            print(
+                f"INFO [STORAGE] {self.storage_writer.flushes} flush(es), max latency: "
+                f"{self.storage_writer.max_flush_latency * 1000:.1f}ms, "
+                f"{self.storage_writer.pending_writes} change(s) pending"
+            )
+            if self.reconnects:
+                print(
+                    f"INFO [WEBSOCKET] {self.reconnects} reconnection(s), "
+                    f"longest gap: {self.max_gap:.2f}s"
+                )
 
-                await self.__check_auto_sell(ws)
+    async def close(self) -> None:
+        """
+        Close the RPC client and the HTTP connection pool, on final shutdown
+        only: run() is started again on the same bot after a disconnection.
+        """
+        await self.client.close()
+        await self.http_session.close()
 
-            await self.__websocket_disconnected(ws)
+    async def __listen(self) -> None:
+        """
+        Receive the PumpPortal messages. In hot reconnect mode, a dropped
+        connection is opened again after a jittered exponential backoff, the
+        positions are kept in memory and their subscriptions sent in one frame.
+        """
+        reloaded = False
+        disconnected_at = None
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(PUMP_WS_URL) as ws:
+                    self.ws = ws
+                    await self.subscribe_new_tokens(ws)
+                    self.subscriptions.attach(ws)
+                    if not reloaded:
+                        await self.__reload_tracked_tokens(ws)
+                        reloaded = True
+                    else:
+                        await self.subscriptions.flush()
+                    if disconnected_at is not None:
+                        gap = time.monotonic() - disconnected_at
+                        self.reconnects += 1
+                        self.max_gap = max(self.max_gap, gap)
+                        print(
+                            f"INFO [WEBSOCKET] Reconnected after {gap:.2f}s offline, "
+                            f"{len(self.subscriptions)} token(s) subscribed again"
+                        )
+                        disconnected_at = None
+                        attempt = 0
+
+                    async for message in ws:
+                        await self.dispatcher.put(message)
+
+                    if not self.hot_reconnect:
+                        await self.dispatcher.join()
+                        await self.__websocket_disconnected(ws)
+                        return
+                    print("WARNING [WEBSOCKET] Connection closed by PumpPortal")
+            except Exception as e:
+                if not self.hot_reconnect:
+                    raise
+                print(f"WARNING [WEBSOCKET] Connection lost: {e}")
+
+            # Whatever the dead connection was sent, the next one is subscribed from scratch
+            self.subscriptions.drop()
+            if disconnected_at is None:
+                disconnected_at = time.monotonic()
+            delay = Utils.backoff_delay(attempt, RECONNECT_BASE_DELAY, RECONNECT_MAX_DELAY)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def __route_message(self, ws, message) -> None:
+        """Parse a message and submit the buy/sell decision to the worker of its mint."""
+        tx = None
+        if self.prefilter.accept(message, self.tracked_tokens):
+            tx = Parser.decode(message)
+        if tx:
+            token_address = tx.token.address
+
+            if tx.txType == "create" and self.__is_similar_token(tx.token.name) is False:
+                # Concurrent buys of similar names in the same burst are skipped too
+                self.pending_names[token_address] = tx.token.name
+                self.dispatcher.submit(token_address, lambda: self.__buy_token(ws, tx))
+
+            elif tx.txType == "buy":
+                price = tx.token_price()
+
+                if token_address in self.tracked_tokens:
+                    self.tracked_tokens[token_address].price = price
+                    self.curves.apply(tx)
+                    if self.is_rpc:
+                        self.presigned_sells.update(tx)
+
+            elif tx.txType == "sell":
+                price = tx.token_price()
+                if token_address in self.tracked_tokens and price is not None:
+                    self.curves.apply(tx)
+                    if self.is_rpc:
+                        self.presigned_sells.update(tx)
+                    self.dispatcher.submit(token_address, lambda: self.__sell_token(ws, tx))
+
+    def __is_similar_token(self, name: str) -> bool:
+        """Whether a token name is too similar to a stored token or to a token being bought."""
+        if Utils.is_similar_token(self.storage.names, name):
+            return True
+        return bool(self.pending_names) and Utils.is_similar_token(
+            [{"name": pending} for pending in self.pending_names.values()], name
+        )
 
     async def subscribe_new_tokens(self, ws: websockets) -> None:
         print("INFO [WEBSOCKET] Subscribing to new token minted on pump.fun")
@@ -108,89 +370,114 @@ class Bot:
     async def subscribe_token_transactions(
         self, ws: websockets, token_address: str
     ) -> None:
+        """Subscribe to the token transactions, sent with the other changes of the batch."""
         print(f"INFO [WEBSOCKET] Subscribing to token {token_address} transactions")
-        await ws.send(
-            json.dumps({"method": "subscribeTokenTrade", "keys": [token_address]})
-        )
+        self.subscriptions.subscribe(token_address)
 
     async def unsubscribe_token_transactions(
         self, ws: websockets, token_address: str
     ) -> None:
-        print(
-            f"[INFO [WEBSOCKET] Unsubscribing from token {token_address} transactions"
-        )
-        await ws.send(
-            json.dumps({"method": "unsubscribeTokenTrade", "keys": [token_address]})
-        )
+        """Unsubscribe from the token transactions, sent with the other changes of the batch."""
+        print(f"INFO [WEBSOCKET] Unsubscribing from token {token_address} transactions")
+        self.subscriptions.unsubscribe(token_address)
 
-    async def __check_auto_sell(self, ws):
-        """Auto-sell tokens after AUTO_SELL_AFTER_MINS minutes."""
+    def __schedule_auto_sell(self, ws, token_address, delay):
+        """Register the auto-sell deadline of a position, it runs on the worker of its mint."""
         if AUTO_SELL_AFTER_MINS <= 0:
             return
 
-        now = datetime.utcnow()
-        due_tokens = []
-
-        for token_address, tracked in list(self.token_purchase_time.items()):
-            if now - tracked["buy_time"] >= timedelta(minutes=AUTO_SELL_AFTER_MINS):
-                due_tokens.append((tracked["buy_time"], tracked["transaction"]))
+        self.scheduler.schedule(
+            token_address,
+            delay,
+            lambda: self.dispatcher.submit(
+                token_address, lambda: self.__auto_sell(ws, token_address)
+            ),
+        )
 
-        if not due_tokens:
+    async def __auto_sell(self, ws, token_address):
+        """Auto-sell tokens after AUTO_SELL_AFTER_MINS minutes."""
+        tracked = self.token_purchase_time.get(token_address)
+        token = self.tracked_tokens.get(token_address)
+        if not tracked or not token:
             return
 
-        due_tokens.sort()
+        print(
+            f"INFO [AUTO-SELL] Selling token {token.name} ({token_address}) after {AUTO_SELL_AFTER_MINS} mins"  # noqa: E501
+        )
+        # Sold at the latest reserves, not the ones of the buy
+        self.curves.fill(tracked["transaction"])
+        await self.__sell_token(ws, tracked["transaction"], True)
 
-        for _, transaction in due_tokens:
-            token_address = str(transaction.token.mint)
-            token = self.tracked_tokens.get(token_address)
-            if token:
-                print(
-                    f"INFO [AUTO-SELL] Selling token {token.name} ({token_address}) after {AUTO_SELL_AFTER_MINS} mins"  # noqa: E501
-                )
-                await self.__sell_token(ws, transaction, True)
+        # Sell failed, try again later
+        if token_address in self.tracked_tokens:
+            self.__schedule_auto_sell(ws, token_address, AUTO_SELL_RETRY_SECS)
 
     async def __websocket_disconnected(self, ws):
         """Websocket has been disconnected."""
         # Unsubscribe from new tokens
         await self.unsubscribe_new_tokens(ws)
 
-        # Ensure only active tokens are unsubscribed
-        active_tokens = list(self.tracked_tokens.keys())
-        if active_tokens:
-            await asyncio.gather(
-                *[
-                    self.unsubscribe_token_transactions(ws, token_address)
-                    for token_address in active_tokens
-                ]
-            )
-
-        # Close websocket connection
-        await self.client.close()
+        # Unsubscribe from every token in one frame
+        await self.subscriptions.detach()
 
     async def __buy_token(self, ws, tx):
         """Buy a token using RPC or HTTP and save it to storage."""
         token = tx.token
-        token_address = str(tx.token.mint)
-        if len(self.tracked_tokens) >= MAX_TOKEN_TRACKED:
+        token_address = tx.token.address
+        # Buys in flight on other workers count towards the limit
+        if len(self.tracked_tokens) + len(self.pending_buys) >= MAX_TOKEN_TRACKED:
             print(
                 f"WARNING [BUY HTTP] Max tracked tokens ({MAX_TOKEN_TRACKED}) reached. Cannot buy {token.name} ({token_address})"  # noqa: E501
             )
+            self.pending_names.pop(token_address, None)
         else:
-            res = False
-            if self.is_rpc:
-                rpc = RpcTransaction(self.client, tx, self.account)
-                res = await rpc.send_buy_transaction(BUY_AMOUNT_SOL)
-            else:
-                res = PumpPortalTransaction(tx).send_buy_transaction(
-                    amount=BUY_AMOUNT_SOL, slippage=SLIPPAGE_BPS
-                )
+            self.pending_buys.add(token_address)
+            sent = False
+            try:
+                res = False
+                if self.is_rpc:
+                    # Saved once confirmed, it stays a pending buy meanwhile
+                    rpc = self.__rpc_transaction(tx)
+                    sent = await rpc.send_buy_transaction(
+                        BUY_AMOUNT_SOL,
+                        on_confirmed=lambda confirmed: self.dispatcher.submit(
+                            token_address, lambda: self.__buy_confirmed(ws, tx, confirmed)
+                        ),
+                    )
+                    if sent is True:
+                        self.__save_token_pending(tx, token_address)
+                else:
+                    res = await PumpPortalTransaction(
+                        tx, self.http_session
+                    ).send_buy_transaction_async(
+                        amount=BUY_AMOUNT_SOL,
+                        slippage=SLIPPAGE_BPS,
+                        priority_fee=self.fee_oracle.priority_fee(BUY),
+                    )
 
-            if res is True:
+                if res is True:
+                    await self.__save_token_bought(ws, tx, token_address)
+            finally:
+                if sent is not True:
+                    self.pending_buys.discard(token_address)
+                    # Bought over HTTP it is in storage now, otherwise it failed
+                    self.pending_names.pop(token_address, None)
+
+    async def __buy_confirmed(self, ws, tx, confirmed):
+        """Save a buy once confirmed, release its pending slot either way."""
+        token_address = tx.token.address
+        self.pending_buys.discard(token_address)
+        try:
+            if confirmed is True:
                 await self.__save_token_bought(ws, tx, token_address)
+            else:
+                self.storage.update(token_address, {"status": "inactive"})
+        finally:
+            self.pending_names.pop(token_address, None)
 
     async def __sell_token(self, ws, tx, auto_sell=False):
         """Sell a token using RPC or HTTP and update storage."""
-        token_address = str(tx.token.mint)
+        token_address = tx.token.address
         token = self.tracked_tokens.get(token_address)
 
         if not token:
@@ -204,12 +491,11 @@ class Bot:
         highest_price = self.tracked_tokens[token_address].price
         current_price = tx.token_price()
 
-        res = False
         if current_price <= highest_price * (1 - TRAILING_STOP_LOSS):
             print(
                 f"INFO [SELL HTTP] Selling 100% of {token.name} due to trailing stop-loss"
             )
-            await self.__execute_sell(ws, tx, 100)  # Sell 100%
+            await self.__execute_sell(ws, tx, 100, STOP_LOSS)  # Sell 100%
             return
         else:
 
@@ -240,32 +526,66 @@ class Bot:
                         "quarter_sold"
                     ] = True  # Mark second sell done
             else:
-                rpc = RpcTransaction(self.client, tx, self.account)
-                res = await rpc.send_sell_transaction()
+                await self.__rpc_sell(ws, tx)
 
-                if res is True:
-                    await self.__clean_token_sold(ws, token_address)
+    async def __rpc_sell(self, ws, tx, tier=SELL):
+        """Send a sell using RPC, the position is cleaned once it is confirmed."""
+        token_address = tx.token.address
+        if token_address in self.pending_sells:
+            print(f"INFO [SELL RPC] Sell of {token_address} already waiting for confirmation")
+            return
+
+        self.pending_sells.add(token_address)
+        sent = await self.__rpc_transaction(tx).send_sell_transaction(
+            on_confirmed=lambda confirmed: self.dispatcher.submit(
+                token_address, lambda: self.__sell_confirmed(ws, token_address, confirmed)
+            ),
+            tier=tier,
+        )
+        if sent is not True:
+            self.pending_sells.discard(token_address)
+
+    async def __sell_confirmed(self, ws, token_address, confirmed):
+        """Clean a position once its sell is confirmed."""
+        self.pending_sells.discard(token_address)
+        if confirmed is True:
+            await self.__clean_token_sold(ws, token_address)
 
     async def __clean_token_sold(self, ws, token_address):
         """Remove token sold from storage and tracked tokens. Unsubscribe from transactions."""
         await self.unsubscribe_token_transactions(ws, token_address)
         # Set token from storage to inactive
-        for token in self.storage.tokens:
-            if token["address"] == token_address:
-                token["status"] = "inactive"
-                break
-        self.storage.save()
+        self.storage.update(token_address, {"status": "inactive"})
         # Remove token from tracked tokens
         if token_address in self.tracked_tokens:
             del self.tracked_tokens[token_address]
-        # Remove token from purchase time
+        # Remove token from purchase time and its auto-sell timer
         if token_address in self.token_purchase_time:
             del self.token_purchase_time[token_address]
+        self.scheduler.cancel(token_address)
+        self.curves.untrack(token_address)
+        self.presigned_sells.untrack(token_address)
+        self.balance_cache.untrack(token_address)
+
+    def __save_token_pending(self, tx, token_address):
+        """
+        Store a sent buy before its confirmation. If the bot stops meanwhile, it
+        is checked on chain by the startup reconciliation.
+        """
+        self.storage.add(
+            {
+                "name": tx.token.name,
+                "address": token_address,
+                "status": "pending",
+                "price": tx.token_price(),
+                "buy_time": datetime.utcnow().isoformat(),
+            }
+        )
 
     async def __save_token_bought(self, ws, tx, token_address):
         buy_time = datetime.utcnow()
         # Update and save storage
-        self.storage.tokens.append(
+        self.storage.add(
             {
                 "name": tx.token.name,
                 "address": token_address,
@@ -274,7 +594,6 @@ class Bot:
                 "buy_time": buy_time.isoformat(),
             }
         )
-        self.storage.save()
         # Update tracked tokens, purchased datetime and partial sales
         tx.token.price = tx.token_price()
         self.tracked_tokens[token_address] = tx.token
@@ -286,23 +605,33 @@ class Bot:
             "half_sold": False,
             "quarter_sold": False,
         }
+        self.__schedule_auto_sell(ws, token_address, AUTO_SELL_AFTER_MINS * 60)
+        self.curves.track(tx)
+        if self.is_rpc:
+            self.balance_cache.track(tx.token.mint)
+            self.presigned_sells.track(tx)
         await self.subscribe_token_transactions(ws, token_address)
 
-    async def __execute_sell(self, ws, tx, percentage):
+    async def __execute_sell(self, ws, tx, percentage, tier=SELL):
         """
         Executes a partial sell of a token.
         :param ws: WebSocket connection
         :param tx: Transaction data
         :param percentage: Percentage of total tokens to sell
+        :param tier: Urgency tier of the priority fee
         """
-        token_address = str(tx.token.mint)
+        token_address = tx.token.address
 
         # Only execute HTTP-based selling strategy
         if not self.is_rpc:
             print(f"INFO [SELL] Selling {percentage}% of {token_address}")
 
-            res = PumpPortalTransaction(tx).send_sell_transaction(
-                amount=percentage, slippage=SLIPPAGE_BPS
+            res = await PumpPortalTransaction(
+                tx, self.http_session
+            ).send_sell_transaction_async(
+                amount=percentage,
+                slippage=SLIPPAGE_BPS,
+                priority_fee=self.fee_oracle.priority_fee(tier),
             )
             if res is True:
                 print(
@@ -313,33 +642,144 @@ class Bot:
                 if percentage == 100:
                     await self.__clean_token_sold(ws, token_address)
         else:
-            rpc = RpcTransaction(self.client, tx, self.account)
-            res = await rpc.send_sell_transaction()
-
-            if res is True:
-                await self.__clean_token_sold(ws, token_address)
+            await self.__rpc_sell(ws, tx, tier)
 
     async def __reload_tracked_tokens(self, ws: websockets) -> None:
-        """Reload tracked tokens from storage and subscribe to their transactions."""
-        tasks = []
-        for token in self.storage.tokens:
-            token_address = token["address"]
-            if token["status"] == "active":
-                buy_time = (
-                    datetime.fromisoformat(token["buy_time"])
-                    if "buy_time" in token
-                    else datetime.utcnow()
+        """
+        Reload tracked tokens from storage, reconcile them with the chain and
+        subscribe to their transactions.
+        """
+        # Positions still in memory when run() is started again, only their timers were dropped
+        for token_address in self.tracked_tokens:
+            purchase = self.token_purchase_time.get(token_address)
+            if purchase is not None:
+                self.__schedule_auto_sell(
+                    ws, token_address, self.__auto_sell_delay(purchase["buy_time"])
                 )
+            await self.subscribe_token_transactions(ws, token_address)
+
+        # Pending buys were sent but not confirmed when the bot stopped
+        active = [
+            token
+            for token in self.storage.tokens
+            if token["status"] in ("active", "pending")
+            and token["address"] not in self.tracked_tokens  # noqa: W503
+        ]
+        positions = await self.__reconcile([token["address"] for token in active])
+
+        for token in active:
+            token_address = token["address"]
+            position = positions.get(token_address)
+            if position is not None and not position.alive:
+                self.__prune(token_address, position)
+                continue
+            if token["status"] == "pending":
+                if position is None:
+                    print(f"WARNING [RECONCILE] Buy of {token_address} unknown, kept pending")
+                    continue
+                print(f"INFO [RECONCILE] Buy of {token_address} landed, tracking it")
+                self.storage.update(token_address, {"status": "active"})
+                self.pending_buys.discard(token_address)
+
+            buy_time = (
+                datetime.fromisoformat(token["buy_time"])
+                if "buy_time" in token
+                else datetime.utcnow()
+            )
 
-                self.tracked_tokens[token_address] = Token(
-                    name=token["name"], mint=token_address, price=token["price"]
-                )
-                self.token_purchase_time[token_address] = {
-                    "transaction": Transaction(
-                        token=self.tracked_tokens[token_address]
-                    ),
-                    "buy_time": buy_time,
-                }
-                tasks.append(self.subscribe_token_transactions(ws, token_address))
-
-        await asyncio.gather(*tasks)
+            self.tracked_tokens[token_address] = Token(
+                name=token["name"], mint=token_address, price=token["price"]
+            )
+            tx = Transaction(token=self.tracked_tokens[token_address])
+            self.token_purchase_time[token_address] = {
+                "transaction": tx,
+                "buy_time": buy_time,
+            }
+            self.__schedule_auto_sell(ws, token_address, self.__auto_sell_delay(buy_time))
+            self.curves.track(tx)
+            if position is not None:
+                self.curves.seed(token_address, position.sol_reserves, position.token_reserves)
+                self.curves.fill(tx)
+                # The trailing stop-loss starts from the highest price known
+                current_price = position.sol_reserves / position.token_reserves
+                tx.token.price = max(tx.token.price or 0, current_price)
+            if self.is_rpc:
+                if position is not None:
+                    self.balance_cache.set(token_address, position.balance)
+                self.balance_cache.track(tx.token.mint)
+                self.presigned_sells.track(tx)
+            await self.subscribe_token_transactions(ws, token_address)
+
+        # Every position in one frame
+        await self.subscriptions.flush()
+
+    async def __reconcile(self, token_addresses: list[str]) -> dict[str, OnChainPosition]:
+        """
+        On-chain state of the stored positions, empty when it can't be read.
+        PumpPortal trades settle in the wallet of the API key, not ours: the
+        positions of the HTTP mode are not reconciled.
+        """
+        if not token_addresses or not self.is_rpc:
+            return {}
+        started = time.perf_counter()
+        try:
+            positions = await reconcile(
+                self.client,
+                self.account.pubkey(),
+                [Pubkey.from_string(token_address) for token_address in token_addresses],
+            )
+        except Exception as e:
+            print(f"WARNING [RECONCILE] Unable to read positions, trusting storage: {e}")
+            return {}
+        print(
+            f"INFO [RECONCILE] {len(positions)} position(s) read in "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return positions
+
+    def __prune(self, token_address: str, position: OnChainPosition) -> None:
+        """Set a stored position that can't be sold anymore to inactive."""
+        if position.balance <= 0:
+            reason = "no tokens held"
+        elif position.sol_reserves is None:
+            reason = "bonding curve not found"
+        else:
+            reason = "bonding curve complete"
+        print(f"WARNING [RECONCILE] Dropping position {token_address}: {reason}")
+        self.storage.update(token_address, {"status": "inactive"})
+
+    async def __load_lookup_table(self) -> None:
+        """Load PUMP_LOOKUP_TABLE, transactions stay legacy when it can't be loaded."""
+        try:
+            table = await load_lookup_table(self.client, Pubkey.from_string(PUMP_LOOKUP_TABLE))
+        except Exception as e:
+            print(f"WARNING [RPC] Unable to load lookup table {PUMP_LOOKUP_TABLE}: {e}")
+            return
+        self.lookup_tables.append(table)
+        print(
+            f"INFO [RPC] Lookup table {PUMP_LOOKUP_TABLE} loaded "
+            f"({len(table.addresses)} addresses), sending v0 transactions"
+        )
+
+    def __auto_sell_delay(self, buy_time: datetime) -> float:
+        """Seconds left before the auto-sell of a position bought at buy_time."""
+        deadline = buy_time + timedelta(minutes=AUTO_SELL_AFTER_MINS)
+        return (deadline - datetime.utcnow()).total_seconds()
+
+    def __rpc_transaction(self, tx) -> RpcTransaction:
+        """RPC transaction sharing the bot client and caches."""
+        return RpcTransaction(
+            self.client,
+            tx,
+            self.account,
+            blockhash_cache=self.blockhash_cache,
+            known_atas=self.known_atas,
+            templates=self.instruction_templates,
+            presigned_sells=self.presigned_sells,
+            confirmations=self.confirmations,
+            rebroadcaster=self.rebroadcaster,
+            fee_oracle=self.fee_oracle,
+            compute_units=self.compute_units,
+            lookup_tables=self.lookup_tables,
+            balance_cache=self.balance_cache,
+        )
@@ -12,7 +12,11 @@ SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM = Pubkey.from_string(
     "ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL"
 )
 SYSTEM_RENT = Pubkey.from_string("SysvarRent111111111111111111111111111111111")
+PUMP_BUY_DISCRIMINATOR = 16927863322537952870
+PUMP_SELL_DISCRIMINATOR = 12502976635542562355
+PUMP_FEE_BASIS_POINTS = 100
 UNIT_BUDGET = 300_000
 UNIT_PRICE = 1_000
 SOL_DECIMALS = 1e9
 TOKEN_DECIMALS = 1e6
+BONDING_CURVE_CACHE_SIZE = 4096
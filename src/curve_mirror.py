@@ -0,0 +1,91 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from .models.transaction import Transaction
+
+
+@dataclass(slots=True)
+class CurveState:
+    """Virtual reserves of a bonding curve, in the units of the trade stream."""
+
+    sol_reserves: float
+    token_reserves: float
+    trades: int = 0
+
+
+class CurveMirror:
+    """
+    Bonding curve state of the tracked mints, mirrored from the trade stream.
+
+    A frame carrying the virtual reserves (create frames at least) sets the
+    state of its mint, buys and sells without them move it by their amounts.
+    Trades are filled with the mirrored reserves, so quotes of a tracked mint
+    are always computed locally from its latest state, without any RPC read.
+    Frames of untracked mints are ignored, the table never outgrows the
+    tracked positions.
+    """
+
+    def __init__(self):
+        self.curves: dict[str, Optional[CurveState]] = {}
+
+    def __len__(self) -> int:
+        return len(self.curves)
+
+    def __contains__(self, token_address: str) -> bool:
+        return token_address in self.curves
+
+    def track(self, transaction: Transaction) -> None:
+        """Mirror the curve of a mint, from the reserves of transaction when it has them."""
+        self.curves.setdefault(transaction.token.address, None)
+        self.apply(transaction)
+
+    def untrack(self, token_address: str) -> None:
+        self.curves.pop(token_address, None)
+
+    def seed(self, token_address: str, sol_reserves: float, token_reserves: float) -> None:
+        """Set the reserves of a tracked mint read from another source."""
+        if token_address in self.curves:
+            self.curves[token_address] = CurveState(sol_reserves, token_reserves)
+
+    def get(self, token_address: str) -> Optional[CurveState]:
+        return self.curves.get(token_address)
+
+    def apply(self, transaction: Transaction) -> bool:
+        """
+        Update the curve of a trade's mint, then fill the trade with the
+        resulting reserves. Returns False when the curve is not known.
+        """
+        token_address = transaction.token.address
+        if token_address not in self.curves:
+            return False
+
+        state = self.curves[token_address]
+        if (
+            transaction.vSolInBondingCurve is not None
+            and transaction.vTokensInBondingCurve is not None  # noqa: W503
+        ):
+            state = CurveState(
+                transaction.vSolInBondingCurve, transaction.vTokensInBondingCurve
+            )
+            self.curves[token_address] = state
+        elif state is None:
+            return False
+        elif transaction.solAmount and transaction.tokenAmount:
+            if transaction.txType == "buy":
+                state.sol_reserves += transaction.solAmount
+                state.token_reserves -= transaction.tokenAmount
+            elif transaction.txType == "sell":
+                state.sol_reserves -= transaction.solAmount
+                state.token_reserves += transaction.tokenAmount
+            state.trades += 1
+
+        return self.fill(transaction)
+
+    def fill(self, transaction: Transaction) -> bool:
+        """Set the mirrored reserves on a transaction, False when the curve is not known."""
+        state = self.curves.get(transaction.token.address)
+        if state is None:
+            return False
+        transaction.vSolInBondingCurve = state.sol_reserves
+        transaction.vTokensInBondingCurve = state.token_reserves
+        return True
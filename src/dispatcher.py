@@ -0,0 +1,121 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+
+class Dispatcher:
+    """
+    Decouple websocket ingestion from trade execution.
+
+    Raw frames are pushed into a bounded queue by the websocket reader.
+    A single dispatch task hands each frame to the router, which submits jobs
+    keyed by token mint. Jobs of the same mint run in order on a dedicated
+    worker task, jobs of different mints run concurrently.
+    """
+
+    def __init__(self, router: Callable[[str], None], maxsize: int = 1000):
+        self.router = router
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.workers: dict[str, asyncio.Task] = {}
+        self.jobs: dict[str, deque] = {}
+        self.max_depth = 0
+        self.waited = 0
+        self.__full_waits: Optional[int] = None
+        self.__task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        """Number of raw frames waiting to be routed."""
+        return self.queue.qsize()
+
+    @property
+    def pending_jobs(self) -> int:
+        """Number of jobs waiting or running on the per-mint workers."""
+        return sum(len(jobs) for jobs in self.jobs.values()) + len(self.workers)
+
+    def start(self) -> None:
+        """Start the dispatch task."""
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__dispatch())
+
+    async def put(self, frame: str) -> None:
+        """
+        Queue a raw frame, waiting if the queue is full (backpressure).
+
+        Logged once when the queue becomes full, then once when it has room
+        again with the number of frames that had to wait.
+        """
+        if self.queue.full():
+            if self.__full_waits is None:
+                self.__full_waits = 0
+                print(
+                    f"WARNING [DISPATCHER] Queue full ({self.queue.maxsize} frames), "
+                    "reader is waiting"
+                )
+            self.__full_waits += 1
+            self.waited += 1
+        elif self.__full_waits is not None:
+            print(f"INFO [DISPATCHER] Queue has room again, {self.__full_waits} frame(s) waited")
+            self.__full_waits = None
+        await self.queue.put(frame)
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def submit(self, key: str, job: Callable[[], Awaitable]) -> None:
+        """Run a job on the worker of the given key, after its previous jobs."""
+        self.jobs.setdefault(key, deque()).append(job)
+        if key not in self.workers:
+            self.workers[key] = asyncio.create_task(self.__work(key))
+
+    async def join(self) -> None:
+        """Wait until every queued frame has been routed and every job has run."""
+        await self.queue.join()
+        while self.workers:
+            await asyncio.gather(*list(self.workers.values()), return_exceptions=True)
+
+    async def stop(self, timeout: float = 0) -> None:
+        """
+        Stop routing frames, give the jobs already submitted `timeout` seconds
+        to finish (a buy being sent has to be stored), then cancel the workers
+        still running.
+        """
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        # Jobs may submit follow-up jobs, wait for those too
+        while self.workers and loop.time() < deadline:
+            await asyncio.wait(list(self.workers.values()), timeout=deadline - loop.time())
+        tasks = list(self.workers.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.workers.clear()
+        self.jobs.clear()
+
+    async def __dispatch(self) -> None:
+        """Route frames in the order they have been received."""
+        while True:
+            frame = await self.queue.get()
+            try:
+                self.router(frame)
+            except Exception as e:
+                print(f"ERROR [DISPATCHER] Unable to route message: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def __work(self, key: str) -> None:
+        """Run the jobs of a key one after the other, then exit when there is none left."""
+        jobs = self.jobs[key]
+        try:
+            while jobs:
+                job = jobs.popleft()
+                try:
+                    await job()
+                except Exception as e:
+                    print(f"ERROR [DISPATCHER] Job failed for {key}: {e}")
+        finally:
+            self.workers.pop(key, None)
+            if not jobs:
+                self.jobs.pop(key, None)
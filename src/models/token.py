@@ -1,21 +1,54 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 from solders.pubkey import Pubkey
 
 
-@dataclass
+@dataclass(slots=True, init=False)
 class Token:
-    """Model representation of a Token on pump.fun"""
+    """
+    Model representation of a Token on pump.fun
 
-    mint: Optional[Pubkey] = None
+    The mint is kept as its base58 address, the Pubkey is only built
+    the first time `mint` is read.
+    """
+
+    address: Optional[str] = None
     name: Optional[str] = None
     symbol: Optional[str] = None
     price: Optional[float] = None
+    _pubkey: Optional[Pubkey] = field(default=None, repr=False, compare=False)
+
+    def __init__(
+        self,
+        mint: Optional[Pubkey | str] = None,
+        name: Optional[str] = None,
+        symbol: Optional[str] = None,
+        price: Optional[float] = None,
+    ):
+        self.mint = mint
+        self.name = name
+        self.symbol = symbol
+        self.price = price
+
+    @property
+    def mint(self) -> Optional[Pubkey]:
+        if self._pubkey is None and self.address is not None:
+            self._pubkey = Pubkey.from_string(self.address)
+        return self._pubkey
+
+    @mint.setter
+    def mint(self, mint: Optional[Pubkey | str]) -> None:
+        if isinstance(mint, Pubkey):
+            self.address = str(mint)
+            self._pubkey = mint
+        else:
+            self.address = mint
+            self._pubkey = None
 
     def __deepcopy__(self, memo):
         """Deepcopy is used in test, and we need to fix pickle error."""
         return Token(
-            mint=Pubkey.from_string(str(self.mint)),
+            mint=self.address,
             name=self.name,
             symbol=self.symbol,
             price=self.price
@@ -1,13 +1,23 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 from solders.pubkey import Pubkey  # type: ignore
 from spl.token.instructions import get_associated_token_address
 
 from .token import Token
-from ..constants import PUMP_PROGRAM, SOL_DECIMALS, TOKEN_DECIMALS
+from ..constants import PUMP_PROGRAM, SOL_DECIMALS, TOKEN_DECIMALS, BONDING_CURVE_CACHE_SIZE
 
 
-@dataclass
+@lru_cache(maxsize=BONDING_CURVE_CACHE_SIZE)
+def derive_bonding_curve_accounts(mint: Pubkey) -> tuple[Pubkey, Pubkey]:
+    """Derive the bonding curve and its associated token account of a mint (LRU cached)."""
+    bonding_curve, _ = Pubkey.find_program_address(
+        ["bonding-curve".encode(), bytes(mint)], PUMP_PROGRAM
+    )
+    return bonding_curve, get_associated_token_address(bonding_curve, mint)
+
+
+@dataclass(slots=True)
 class Transaction:
     """Model representation of a transaction on pump.fun"""
 
@@ -31,12 +41,8 @@ class Transaction:
         return None
 
     def set_associated_bonding_curve(self):
-        bonding_curve, _ = Pubkey.find_program_address(
-            ["bonding-curve".encode(), bytes(self.token.mint)], PUMP_PROGRAM
-        )
-        self.bondingCurveKey = bonding_curve
-        self.associatedBondingCurveKey = get_associated_token_address(
-            bonding_curve, self.token.mint
+        self.bondingCurveKey, self.associatedBondingCurveKey = derive_bonding_curve_accounts(
+            self.token.mint
         )
 
     def sol_for_tokens(self, amount):
@@ -1,7 +1,19 @@
-from solders.pubkey import Pubkey
+import json
+
 from .models.transaction import Transaction
 from .models.token import Token
 
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is optional
+    loads = json.loads
+
+# Numeric fields decoded from every message, the reserves when the message has them
+TRADE_FIELDS = ("tokenAmount", "solAmount", "marketCapSol", "initialBuy")
+RESERVE_FIELDS = ("vTokensInBondingCurve", "vSolInBondingCurve")
+
 
 class Parser:
     """Parser for messages received via pump.fun API into a Transaction + Token."""
@@ -9,42 +21,44 @@ class Parser:
     def __init__(self, message):
         self.message = message
 
+    @classmethod
+    def decode(cls, frame: str | bytes) -> Transaction | None:
+        """Decode a raw websocket frame straight into a Transaction."""
+        return cls(loads(frame)).parse()
+
     def parse(self) -> Transaction:
         """Parse the JSON message into a Transaction object."""
+        message = self.message
 
         # Extract common fields
-        txType = self.message.get("txType")
+        txType = message.get("txType")
 
-        mint = self.message.get("mint")
+        mint = message.get("mint")
         if mint:
-            token = Token(mint=Pubkey.from_string(mint))
+            # The mint stays a string until a Pubkey is needed
+            token = Token(mint=mint)
 
             # If the transaction is a token creation (minting)
             if txType == "create":
-                token.name = self.message.get("name")
-                token.symbol = self.message.get("symbol")
+                token.name = message.get("name")
+                token.symbol = message.get("symbol")
 
             # Create the Transaction object
             tx = Transaction(
                 token=token,
-                traderPublicKey=self.message.get("traderPublicKey"),
+                traderPublicKey=message.get("traderPublicKey"),
                 txType=txType,
-                tokenAmount=self._safe_float("tokenAmount"),
-                solAmount=self._safe_float("solAmount"),
-                marketCapSol=self._safe_float("marketCapSol"),
-                initialBuy=self._safe_float("initialBuy"),
             )
+            self.__decode_fields(tx, TRADE_FIELDS)
+            self.__decode_fields(tx, RESERVE_FIELDS)
 
-            if txType == "create":
-                tx.vTokensInBondingCurve = self._safe_float("vTokensInBondingCurve")
-                tx.vSolInBondingCurve = self._safe_float("vSolInBondingCurve")
-
-            tx.set_associated_bonding_curve()
             tx.token.price = tx.token_price()
 
             return tx
 
-    def _safe_float(self, key: str) -> float:
-        """Helper method to safely convert a dictionary value to float, handling missing keys."""
-        value = self.message.get(key)
-        return float(value) if value is not None else None
+    def __decode_fields(self, tx: Transaction, fields: tuple) -> None:
+        """Set the numeric fields present in the message, JSON numbers are already decoded."""
+        for key in fields:
+            value = self.message.get(key)
+            if value is not None:
+                setattr(tx, key, value if type(value) is float else float(value))
@@ -0,0 +1,34 @@
+import re
+
+TX_TYPE_PATTERN = re.compile(r'"txType"\s*:\s*"([^"]*)"')
+MINT_PATTERN = re.compile(r'"mint"\s*:\s*"([^"]*)"')
+
+
+class Prefilter:
+    """
+    Route raw websocket frames before any decoding.
+
+    Only the txType and mint are extracted from the raw frame, so trades on
+    mints we don't track and control messages are dropped without building
+    any dict, Token, Pubkey or Transaction.
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.dropped = 0
+
+    def accept(self, frame: str, tracked_tokens) -> bool:
+        """Return True if the frame has to be decoded: creates and trades on tracked mints."""
+        self.received += 1
+        tx_type = TX_TYPE_PATTERN.search(frame)
+        if tx_type is not None:
+            tx_type = tx_type.group(1)
+            if tx_type == "create":
+                return True
+            if tx_type in ("buy", "sell"):
+                mint = MINT_PATTERN.search(frame)
+                if mint is not None and mint.group(1) in tracked_tokens:
+                    return True
+
+        self.dropped += 1
+        return False
@@ -0,0 +1,84 @@
+import asyncio
+import heapq
+import itertools
+from typing import Callable, Optional
+
+
+class Scheduler:
+    """
+    Fire callbacks at their deadline from a dedicated task.
+
+    Deadlines are kept in a binary heap (O(log n) per insert), the task sleeps
+    until the earliest one is due, so timers fire even when no message is received.
+    Each key has at most one timer, rescheduling or cancelling a key invalidates
+    its previous heap entry lazily.
+    """
+
+    def __init__(self):
+        self.heap: list[tuple[float, int, str]] = []
+        self.timers: dict[str, tuple[int, Callable[[], None]]] = {}
+        self.__counter = itertools.count()
+        self.__wakeup: Optional[asyncio.Event] = None
+        self.__task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.timers)
+
+    def start(self) -> None:
+        """Start the scheduler task."""
+        if self.__task is None:
+            self.__wakeup = asyncio.Event()
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        """Stop the scheduler task and drop every timer."""
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+        self.heap.clear()
+        self.timers.clear()
+
+    def schedule(self, key: str, delay: float, callback: Callable[[], None]) -> None:
+        """Call callback in delay seconds, replacing the previous timer of the key."""
+        deadline = asyncio.get_running_loop().time() + max(delay, 0)
+        seq = next(self.__counter)
+        self.timers[key] = (seq, callback)
+        heapq.heappush(self.heap, (deadline, seq, key))
+        if self.heap[0][1] == seq and self.__wakeup is not None:
+            # New earliest deadline, the task has to sleep less
+            self.__wakeup.set()
+
+    def cancel(self, key: str) -> None:
+        """Cancel the timer of a key, if any."""
+        self.timers.pop(key, None)
+
+    def __is_stale(self, entry: tuple[float, int, str]) -> bool:
+        timer = self.timers.get(entry[2])
+        return timer is None or timer[0] != entry[1]
+
+    async def __run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            while self.heap and self.__is_stale(self.heap[0]):
+                heapq.heappop(self.heap)
+
+            self.__wakeup.clear()
+            if not self.heap:
+                await self.__wakeup.wait()
+                continue
+
+            delay = self.heap[0][0] - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.__wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key = heapq.heappop(self.heap)
+            _, callback = self.timers.pop(key)
+            try:
+                callback()
+            except Exception as e:
+                print(f"ERROR [SCHEDULER] Timer of {key} failed: {e}")
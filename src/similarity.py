@@ -0,0 +1,94 @@
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Iterable
+
+
+class SimilarityIndex:
+    """
+    Index of token names answering "is there a stored name similar to this one?"
+
+    Returns exactly what comparing the new name against every stored name with
+    difflib.SequenceMatcher(None, existing, new).ratio() would, but prunes most
+    stored names before the exact ratio is computed:
+
+    - names are lowercased and deduplicated once, when they are added,
+    - names are bucketed by length, whole buckets are skipped using the
+      real_quick_ratio() bound 2 * min(len) / total,
+    - each name keeps a character multiset signature (one bitmask per
+      multiplicity level), the quick_ratio() bound is then a few popcounts.
+
+    n-gram or MinHash candidates are not used on purpose: SequenceMatcher also
+    counts single character matches ("d.o.g.e" vs "doge" is 0.73) which such
+    candidate generation would miss.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: dict[str, str] = {}
+        self.buckets: dict[int, list[tuple[str, tuple[int, ...]]]] = {}
+        self.__bits: dict[str, int] = {}
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str) -> None:
+        """Index a name."""
+        normalized = (name or "").lower()
+        if normalized in self.names:
+            return
+        self.names[normalized] = name
+        self.buckets.setdefault(len(normalized), []).append(
+            (normalized, self.__signature(normalized, grow=True))
+        )
+
+    def find(self, name: str, threshold: float) -> tuple[str, float] | None:
+        """Return a stored name whose similarity with name is >= threshold, and its similarity."""
+        query = (name or "").lower()
+        if query in self.names and threshold <= 1.0:
+            return self.names[query], 1.0
+
+        signature = self.__signature(query, grow=False)
+        query_length = len(query)
+        # SequenceMatcher caches its analysis of the second sequence
+        matcher = SequenceMatcher(None)
+        matcher.set_seq2(query)
+
+        for length in sorted(self.buckets, key=lambda length: abs(length - query_length)):
+            total = length + query_length
+            if 2.0 * min(length, query_length) / total < threshold:
+                continue
+
+            for existing, levels in self.buckets[length]:
+                matches = 0
+                for query_level, level in zip(signature, levels):
+                    matches += (query_level & level).bit_count()
+                if 2.0 * matches / total < threshold:
+                    continue
+
+                matcher.set_seq1(existing)
+                similarity = matcher.ratio()
+                if similarity >= threshold:
+                    return self.names[existing], similarity
+
+        return None
+
+    def __signature(self, name: str, grow: bool) -> tuple[int, ...]:
+        """
+        Character multiset of a name, as bitmasks: level k holds the characters
+        appearing more than k times. popcount(a & b) summed over the levels is
+        then the number of characters two names have in common.
+        """
+        levels = []
+        for char, count in Counter(name).items():
+            bit = self.__bits.get(char)
+            if bit is None:
+                if not grow:
+                    # Unknown character, it can't match any stored name
+                    continue
+                bit = self.__bits[char] = 1 << len(self.__bits)
+            for level in range(count):
+                if level == len(levels):
+                    levels.append(0)
+                levels[level] |= bit
+        return tuple(levels)
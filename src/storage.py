@@ -1,17 +1,39 @@
+import asyncio
 import os
 import json
+import time
+from typing import Callable, Optional
+
+from .similarity import SimilarityIndex
 
 
 class Storage:
+    """
+    Purchased tokens storage.
+
+    The token list is kept in a JSON snapshot (TOKEN_STORAGE_FILE), every change
+    made since the last snapshot is appended to a journal next to it, so writing
+    an event costs the same whatever the size of the history. The journal is
+    replayed on load and folded into a new snapshot every COMPACT_EVERY entries.
+
+    Without a StorageWriter attached (on_change), changes are written right away.
+    """
 
     TOKEN_STORAGE_FILE = os.getenv("TOKEN_STORAGE_FILE", "token_storage.json")
+    COMPACT_EVERY = int(os.getenv("STORAGE_COMPACT_EVERY", 1000))
 
     def __init__(self, filepath=TOKEN_STORAGE_FILE):
         self.tokens = []
+        self.index: dict[str, dict] = {}
+        self.names = SimilarityIndex()
         self.filepath = filepath
+        self.journal_path = f"{filepath}.journal"
+        self.journal_entries = 0
+        self.pending: list[dict] = []
+        self.on_change: Optional[Callable[[], None]] = None
 
     def load(self) -> None:
-        """Loads purchased tokens from a JSON file."""
+        """Loads purchased tokens from a JSON file, then replays the journal."""
         if os.path.exists(self.filepath):
             with open(self.filepath, "r") as file:
                 try:
@@ -21,8 +43,179 @@ class Storage:
                     self.tokens = []  # Reset tokens if the file is corrupted
         else:
             self.tokens = []
+        self.index = {token["address"]: token for token in self.tokens if "address" in token}
+        self.names = SimilarityIndex(token["name"] for token in self.tokens)
+
+        self.journal_entries = self.__replay_journal()
+        if self.journal_entries:
+            self.save()
+
+    def add(self, token: dict) -> None:
+        """Add a purchased token, and index its name and address."""
+        self.__apply({"op": "add", "token": token})
+        self.__append({"op": "add", "token": token})
+
+    def update(self, address: str, fields: dict) -> bool:
+        """Update fields of the token with the given address, returns False if unknown."""
+        entry = {"op": "update", "address": address, "fields": fields}
+        if not self.__apply(entry):
+            return False
+        self.__append(entry)
+        return True
+
+    def get(self, address: str) -> dict | None:
+        """Return the token with the given address."""
+        return self.index.get(address)
 
     def save(self) -> None:
-        """Saves purchased tokens to a JSON file."""
-        with open(self.filepath, "w") as file:
-            json.dump(self.tokens, file, indent=4)
+        """Saves purchased tokens to a JSON file (atomically) and empties the journal."""
+        self.write([], self.tokens)
+        self.journal_entries = 0
+
+    def take_pending(self) -> tuple[list[dict], list[dict] | None]:
+        """
+        Hand over the journal entries waiting to be written, with a copy of the
+        tokens when the journal is due for compaction. Called from the event loop,
+        the result is then written by write() on any thread.
+        """
+        entries, self.pending = self.pending, []
+        self.journal_entries += len(entries)
+        if entries and self.journal_entries >= self.COMPACT_EVERY:
+            self.journal_entries = 0
+            return entries, [dict(token) for token in self.tokens]
+        return entries, None
+
+    def write(self, entries: list[dict], snapshot: list[dict] | None = None) -> None:
+        """Append entries to the journal, or replace the snapshot when one is given."""
+        if snapshot is None:
+            with open(self.journal_path, "a") as journal:
+                journal.write("".join(json.dumps(entry) + "\n" for entry in entries))
+                journal.flush()
+                os.fsync(journal.fileno())
+            return
+
+        # The snapshot already contains the entries
+        tmp_path = f"{self.filepath}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(snapshot, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.filepath)
+
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def __apply(self, entry: dict) -> bool:
+        """Apply a journal entry to the in-memory tokens."""
+        if entry["op"] == "add":
+            token = dict(entry["token"])
+            existing = self.index.get(token["address"])
+            if existing is not None:
+                # Entry replayed on top of a snapshot that already contains it
+                existing.update(token)
+                return True
+            self.tokens.append(token)
+            self.index[token["address"]] = token
+            self.names.add(token["name"])
+            return True
+
+        token = self.index.get(entry["address"])
+        if token is None:
+            return False
+        token.update(entry["fields"])
+        return True
+
+    def __append(self, entry: dict) -> None:
+        """Queue an entry for the journal, written now unless a StorageWriter is attached."""
+        self.pending.append(entry)
+        if self.on_change is not None:
+            self.on_change()
+        else:
+            self.write(*self.take_pending())
+
+    def __replay_journal(self) -> int:
+        """Apply the journal entries written after the last snapshot."""
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        replayed = 0
+        with open(self.journal_path, "r") as journal:
+            for line in journal:
+                try:
+                    self.__apply(json.loads(line))
+                    replayed += 1
+                except (json.JSONDecodeError, KeyError):
+                    # Last line torn by a crash while it was written
+                    print("[ERROR] Corrupted token storage journal entry, skipping it.")
+        return replayed
+
+
+class StorageWriter:
+    """
+    Write Storage changes off the event loop.
+
+    Changes made within `delay` seconds are coalesced into a single write,
+    done in a worker thread. Stopping the writer flushes what is left.
+    """
+
+    def __init__(self, storage: Storage, delay: float = 0.05):
+        self.storage = storage
+        self.delay = delay
+        self.flushes = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.__changed: Optional[asyncio.Event] = None
+        self.__stopping = False
+        self.__task: Optional[asyncio.Task] = None
+
+    @property
+    def pending_writes(self) -> int:
+        """Number of changes not written to disk yet."""
+        return len(self.storage.pending)
+
+    def start(self) -> None:
+        """Attach to the storage and start the writer task."""
+        if self.__task is None:
+            self.__stopping = False
+            self.__changed = asyncio.Event()
+            self.storage.on_change = self.__changed.set
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        """Detach from the storage once every pending change has been written."""
+        if self.__task is not None:
+            self.__stopping = True
+            self.__changed.set()
+            await self.__task
+            self.__task = None
+        self.storage.on_change = None
+
+    async def __run(self) -> None:
+        while True:
+            await self.__changed.wait()
+            if not self.__stopping:
+                # Let more changes pile up, they are written together
+                await asyncio.sleep(self.delay)
+            self.__changed.clear()
+            await self.__flush()
+            if self.__stopping:
+                return
+
+    async def __flush(self) -> None:
+        entries, snapshot = self.storage.take_pending()
+        if not entries:
+            return
+
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(self.storage.write, entries, snapshot)
+        except Exception as e:
+            print(f"ERROR [STORAGE] Unable to write {len(entries)} change(s): {e}")
+            # Keep them for the next flush
+            self.storage.pending[:0] = entries
+            self.storage.journal_entries = max(self.storage.journal_entries - len(entries), 0)
+            return
+
+        self.flushes += 1
+        self.last_flush_latency = time.perf_counter() - start
+        self.max_flush_latency = max(self.max_flush_latency, self.last_flush_latency)
@@ -0,0 +1,108 @@
+import asyncio
+import json
+from typing import Optional
+
+
+class SubscriptionManager:
+    """
+    Token trade subscriptions of the PumpPortal websocket.
+
+    subscribe() and unsubscribe() only change the desired set. Changes made
+    within delay seconds are coalesced and sent by flush() as at most one
+    subscribeTokenTrade and one unsubscribeTokenTrade frame, each carrying
+    every key added or removed since the last flush. The acknowledged set is
+    what the current connection has been sent: attach() resets it, so the
+    next flush subscribes to the whole desired set in a single frame.
+    """
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.desired: set[str] = set()
+        self.acknowledged: set[str] = set()
+        self.frames = 0
+        self.__ws = None
+        self.__task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.desired)
+
+    def __contains__(self, token_address: str) -> bool:
+        return token_address in self.desired
+
+    @property
+    def pending(self) -> bool:
+        """Changes not sent yet."""
+        return self.desired != self.acknowledged
+
+    def attach(self, ws) -> None:
+        """Use a new connection, nothing is subscribed on it yet."""
+        self.__ws = ws
+        self.acknowledged.clear()
+        self.__schedule()
+
+    async def detach(self) -> None:
+        """
+        Unsubscribe the connection from every key in one frame and stop using
+        it. The desired set is kept for the next connection.
+        """
+        self.__cancel()
+        if self.__ws is not None and self.acknowledged:
+            await self.__send("unsubscribeTokenTrade", self.acknowledged)
+        self.acknowledged.clear()
+        self.__ws = None
+
+    def drop(self) -> None:
+        """The connection is lost, nothing is subscribed anymore. The desired set is kept."""
+        self.__cancel()
+        self.acknowledged.clear()
+        self.__ws = None
+
+    def subscribe(self, token_address: str) -> None:
+        self.desired.add(token_address)
+        self.__schedule()
+
+    def unsubscribe(self, token_address: str) -> None:
+        self.desired.discard(token_address)
+        self.__schedule()
+
+    async def flush(self) -> None:
+        """Send the changes made since the last flush."""
+        self.__cancel()
+        if self.__ws is None:
+            return
+        added = self.desired - self.acknowledged
+        removed = self.acknowledged - self.desired
+        # Marked first, changes made while a frame is sent go to the next flush
+        self.acknowledged |= added
+        self.acknowledged -= removed
+        if added and not await self.__send("subscribeTokenTrade", added):
+            self.acknowledged -= added
+        if removed and not await self.__send("unsubscribeTokenTrade", removed):
+            self.acknowledged |= removed - self.desired
+
+    async def __send(self, method: str, keys: set[str]) -> bool:
+        ws = self.__ws
+        try:
+            await ws.send(json.dumps({"method": method, "keys": sorted(keys)}))
+        except Exception as e:
+            # Subscribed again when a new connection is attached
+            print(f"WARNING [WEBSOCKET] Unable to send {method} ({len(keys)} key(s)): {e}")
+            return False
+        self.frames += 1
+        print(f"INFO [WEBSOCKET] {method}: {len(keys)} token(s)")
+        return True
+
+    def __schedule(self) -> None:
+        if self.__ws is None or not self.pending or self.__task is not None:
+            return
+        self.__task = asyncio.create_task(self.__flush_later())
+
+    def __cancel(self) -> None:
+        task, self.__task = self.__task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def __flush_later(self) -> None:
+        await asyncio.sleep(self.delay)
+        self.__task = None
+        await self.flush()
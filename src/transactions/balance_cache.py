@@ -0,0 +1,212 @@
+import asyncio
+import base64
+import itertools
+import json
+import struct
+import websockets
+from typing import Callable, Optional
+
+from solders.pubkey import Pubkey
+from spl.token.instructions import get_associated_token_address
+
+from ..constants import TOKEN_DECIMALS
+from ..utils import Utils
+
+# Offset of the u64 amount in an SPL token account (after the mint and the owner)
+AMOUNT_OFFSET = 64
+
+
+def _account_balance(value: Optional[dict]) -> float:
+    """Token balance of an accountNotification value, 0 once the account is closed."""
+    if not value or not value.get("data"):
+        return 0.0
+    data = base64.b64decode(value["data"][0])
+    if len(data) < AMOUNT_OFFSET + 8:
+        return 0.0
+    return struct.unpack_from("<Q", data, AMOUNT_OFFSET)[0] / TOKEN_DECIMALS
+
+
+class BalanceCache:
+    """
+    Token balances of our positions, kept without an RPC read per sell.
+
+    A balance is set by our own confirmed buys and sells (positions are
+    bought once, the sell closes the associated token account), and by the
+    accountSubscribe notifications of the associated token account of every
+    tracked mint. get() only reads the RPC (getTokenAccountsByOwner) on a
+    cache miss. Listeners are called with every balance change. Tracked
+    accounts are subscribed again after a reconnect.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        client,
+        owner: Pubkey,
+        commitment: str = "processed",
+        reconnect_delay: float = 1,
+    ):
+        self.ws_url = ws_url
+        self.client = client
+        self.owner = owner
+        self.commitment = commitment
+        self.reconnect_delay = reconnect_delay
+        self.balances: dict[str, float] = {}
+        # Associated token account of every tracked mint
+        self.accounts: dict[str, Pubkey] = {}
+        self.listeners: list[Callable[[str, float], None]] = []
+        self.hits = 0
+        self.misses = 0
+        self.notifications = 0
+        self.__ws = None
+        self.__stopping = False
+        self.__ids = itertools.count(1)
+        self.__requests: dict[int, str] = {}
+        self.__subscriptions: dict[int, str] = {}
+        self.__task: Optional[asyncio.Task] = None
+        self.__sends: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def start(self) -> None:
+        """Connect to the RPC websocket and subscribe to the tracked accounts."""
+        if self.__task is None:
+            self.__stopping = False
+            self.__task = asyncio.create_task(self.__listen())
+
+    async def stop(self) -> None:
+        """Close the websocket."""
+        self.__stopping = True
+        tasks = ([self.__task] if self.__task else []) + list(self.__sends)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.__task = None
+
+    def track(self, mint: Pubkey) -> None:
+        """Follow the balance of our associated token account of mint."""
+        token_address = str(mint)
+        if token_address in self.accounts:
+            return
+        self.accounts[token_address] = get_associated_token_address(self.owner, mint)
+        if self.__ws is not None:
+            self.__send(self.__subscribe(self.__ws, token_address))
+
+    def untrack(self, token_address: str) -> None:
+        """Forget the balance of a mint and unsubscribe from its account."""
+        self.balances.pop(token_address, None)
+        if self.accounts.pop(token_address, None) is None:
+            return
+        for subscription, address in list(self.__subscriptions.items()):
+            if address == token_address:
+                del self.__subscriptions[subscription]
+                if self.__ws is not None:
+                    self.__send(self.__unsubscribe(self.__ws, subscription))
+
+    def set(self, token_address: str, balance: float) -> None:
+        """Set the balance of a mint, listeners are called when it changed."""
+        if self.balances.get(token_address) == balance:
+            return
+        self.balances[token_address] = balance
+        for listener in self.listeners:
+            try:
+                listener(token_address, balance)
+            except Exception as e:
+                print(f"ERROR [BALANCES] Listener of {token_address} failed: {e}")
+
+    def cached(self, token_address: str) -> Optional[float]:
+        """Return the cached balance of a mint, None when it is not known."""
+        return self.balances.get(token_address)
+
+    async def get(self, mint: Pubkey) -> Optional[float]:
+        """Return the balance of a mint, read from the RPC on a cache miss."""
+        token_address = str(mint)
+        if token_address in self.balances:
+            self.hits += 1
+            return self.balances[token_address]
+
+        self.misses += 1
+        balance = await Utils.get_token_balance(self.client, self.owner, mint)
+        if balance is None:
+            return None
+        # A notification received meanwhile is more recent
+        if token_address not in self.balances:
+            self.set(token_address, balance)
+        return self.balances[token_address]
+
+    def __send(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self.__sends.add(task)
+        task.add_done_callback(self.__sends.discard)
+
+    async def __request(self, ws, method: str, params: list) -> int:
+        request_id = next(self.__ids)
+        await ws.send(
+            json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        )
+        return request_id
+
+    async def __subscribe(self, ws, token_address: str) -> None:
+        account = self.accounts.get(token_address)
+        if account is None:
+            return
+        try:
+            request_id = await self.__request(
+                ws,
+                "accountSubscribe",
+                [str(account), {"encoding": "base64", "commitment": self.commitment}],
+            )
+            self.__requests[request_id] = token_address
+        except Exception as e:
+            # Subscribed again once reconnected
+            print(f"WARNING [BALANCES] Unable to subscribe to {token_address}: {e}")
+
+    async def __unsubscribe(self, ws, subscription: int) -> None:
+        try:
+            await self.__request(ws, "accountUnsubscribe", [subscription])
+        except Exception as e:
+            print(f"WARNING [BALANCES] Unable to unsubscribe from {subscription}: {e}")
+
+    def __on_message(self, message: str) -> None:
+        data = json.loads(message)
+
+        if "id" in data:
+            # Subscription acknowledgement, unsubscriptions aren't tracked
+            token_address = self.__requests.pop(data["id"], None)
+            if token_address is None:
+                return
+            if "result" not in data:
+                print(f"WARNING [BALANCES] Subscription to {token_address} failed: {data}")
+            elif token_address in self.accounts:
+                self.__subscriptions[data["result"]] = token_address
+            elif self.__ws is not None:
+                # Untracked before the acknowledgement
+                self.__send(self.__unsubscribe(self.__ws, data["result"]))
+            return
+
+        if data.get("method") == "accountNotification":
+            params = data["params"]
+            token_address = self.__subscriptions.get(params["subscription"])
+            if token_address is not None:
+                self.notifications += 1
+                self.set(token_address, _account_balance(params["result"]["value"]))
+
+    async def __listen(self) -> None:
+        while not self.__stopping:
+            try:
+                async with websockets.connect(self.ws_url) as ws:
+                    self.__ws = ws
+                    self.__requests.clear()
+                    self.__subscriptions.clear()
+                    for token_address in list(self.accounts):
+                        await self.__subscribe(ws, token_address)
+                    async for message in ws:
+                        self.__on_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"WARNING [BALANCES] Websocket disconnected: {e}")
+            finally:
+                self.__ws = None
+            await asyncio.sleep(self.reconnect_delay)
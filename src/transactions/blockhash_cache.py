@@ -0,0 +1,74 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+from solana.rpc.commitment import Confirmed
+from solders.hash import Hash
+
+
+class BlockhashCache:
+    """
+    Latest blockhash, refreshed on a background task.
+
+    Transaction builders read it synchronously with get(), which only returns
+    a blockhash fetched less than max_age seconds ago. The last valid block
+    height of the blockhash is kept alongside it. Listeners are called with
+    every new blockhash.
+    """
+
+    def __init__(self, client, refresh_interval: float = 2, max_age: float = 30):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.blockhash: Optional[Hash] = None
+        self.last_valid_block_height: Optional[int] = None
+        self.fetched_at = 0.0
+        self.listeners: list[Callable[[Hash], None]] = []
+        self.__task: Optional[asyncio.Task] = None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the blockhash has been fetched."""
+        return time.monotonic() - self.fetched_at
+
+    def start(self) -> None:
+        """Start the refresh task."""
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        """Stop the refresh task."""
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+
+    def get(self) -> Optional[tuple[Hash, int]]:
+        """Return the cached blockhash and its last valid block height, None if stale."""
+        if self.blockhash is None or self.age > self.max_age:
+            return None
+        return self.blockhash, self.last_valid_block_height
+
+    async def latest(self) -> tuple[Hash, int]:
+        """Return the cached blockhash, fetching it when it is missing or stale."""
+        return self.get() or await self.refresh()
+
+    async def refresh(self) -> tuple[Hash, int]:
+        """Fetch the latest blockhash."""
+        response = await self.client.get_latest_blockhash(commitment=Confirmed)
+        changed = response.value.blockhash != self.blockhash
+        self.blockhash = response.value.blockhash
+        self.last_valid_block_height = response.value.last_valid_block_height
+        self.fetched_at = time.monotonic()
+        if changed:
+            for listener in self.listeners:
+                listener(self.blockhash)
+        return self.blockhash, self.last_valid_block_height
+
+    async def __run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"WARNING [BLOCKHASH RPC] Unable to refresh latest blockhash: {e}")
+            await asyncio.sleep(self.refresh_interval)
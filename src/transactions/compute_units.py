@@ -0,0 +1,107 @@
+import asyncio
+import math
+import time
+from typing import Optional
+
+from solana.rpc.commitment import Processed
+from solders.compute_budget import set_compute_unit_limit
+from solders.instruction import Instruction
+from solders.message import Message
+from solders.pubkey import Pubkey
+from solders.transaction import Transaction as SolTransaction
+
+from ..constants import UNIT_BUDGET
+from .blockhash_cache import BlockhashCache
+
+# Most compute units a transaction can request
+MAX_UNITS = 1_400_000
+
+# Program and discriminator of every instruction of a transaction
+Shape = tuple[tuple[Pubkey, bytes], ...]
+
+
+class ComputeUnitEstimator:
+    """
+    Compute unit limit of a transaction, measured by simulating its shape.
+
+    A shape is the sequence of (program, discriminator) of the instructions
+    (buy, ATA creation + buy, sell + close...), transactions of the same shape
+    consume about the same units whatever their amounts. The first transaction
+    of a shape is simulated on a background task and requests default_units,
+    the next ones request the measured units plus `margin`. A shape is
+    simulated again by the first transaction built revalidate_interval seconds
+    after its last simulation, failed simulations included.
+    """
+
+    def __init__(
+        self,
+        client,
+        blockhash_cache: BlockhashCache,
+        margin: float = 0.1,
+        revalidate_interval: float = 300,
+        default_units: int = UNIT_BUDGET,
+    ):
+        self.client = client
+        self.blockhash_cache = blockhash_cache
+        self.margin = margin
+        self.revalidate_interval = revalidate_interval
+        self.default_units = default_units
+        self.units: dict[Shape, int] = {}
+        self.simulated_at: dict[Shape, float] = {}
+        self.simulations = 0
+        self.errors = 0
+        self.__simulating: dict[Shape, asyncio.Task] = {}
+
+    async def stop(self) -> None:
+        """Cancel the simulations in progress."""
+        tasks = list(self.__simulating.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def limit(self, instructions: list[Instruction], payer: Pubkey) -> int:
+        """
+        Compute unit limit of a transaction made of instructions (compute budget
+        instructions excluded). Schedules a simulation of its shape when it is
+        unknown or has to be revalidated.
+        """
+        shape = self.shape(instructions)
+        age = time.monotonic() - self.simulated_at.get(shape, -math.inf)
+        stale = age > self.revalidate_interval
+        if stale and shape not in self.__simulating:
+            task = asyncio.create_task(self.estimate(instructions, payer))
+            self.__simulating[shape] = task
+            task.add_done_callback(lambda _: self.__simulating.pop(shape, None))
+
+        units = self.units.get(shape)
+        if units is None:
+            return self.default_units
+        return min(math.ceil(units * (1 + self.margin)), MAX_UNITS)
+
+    async def estimate(self, instructions: list[Instruction], payer: Pubkey) -> Optional[int]:
+        """Simulate the instructions and cache the units consumed by their shape."""
+        shape = self.shape(instructions)
+        self.simulated_at[shape] = time.monotonic()
+        self.simulations += 1
+        try:
+            blockhash, _ = await self.blockhash_cache.latest()
+            message = Message.new_with_blockhash(
+                [set_compute_unit_limit(MAX_UNITS), *instructions], payer, blockhash
+            )
+            response = await self.client.simulate_transaction(
+                SolTransaction.new_unsigned(message), commitment=Processed
+            )
+            result = response.value
+            if result.err is not None or not result.units_consumed:
+                raise RuntimeError(result.err)
+        except Exception as e:
+            self.errors += 1
+            print(f"WARNING [COMPUTE UNITS] Unable to simulate transaction: {e}")
+            return None
+
+        self.units[shape] = result.units_consumed
+        return result.units_consumed
+
+    @staticmethod
+    def shape(instructions: list[Instruction]) -> Shape:
+        return tuple((ix.program_id, bytes(ix.data[:8])) for ix in instructions)
@@ -0,0 +1,224 @@
+import asyncio
+import itertools
+import json
+import websockets
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from solana.rpc.commitment import Confirmed
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
+
+
+@dataclass(slots=True)
+class PendingSignature:
+    future: asyncio.Future
+    last_valid_block_height: int
+    callbacks: list[Callable[[bool], None]] = field(default_factory=list)
+    subscription: Optional[int] = None
+
+
+class ConfirmationManager:
+    """
+    Confirm sent transactions with signatureSubscribe over one RPC websocket.
+
+    watch() registers a signature and returns a future resolved with True once
+    the transaction lands without error, False if it lands with an error or if
+    the block height goes past the last valid block height of its blockhash.
+    Pending signatures are subscribed again after a reconnect.
+
+    The block height is polled every expiry_interval seconds. Signatures about
+    to be expired get a last status check first (one getSignatureStatuses for
+    all of them), in case their notification was missed while disconnected.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        client,
+        commitment: str = "confirmed",
+        expiry_interval: float = 2,
+        reconnect_delay: float = 1,
+    ):
+        self.ws_url = ws_url
+        self.client = client
+        self.commitment = commitment
+        self.expiry_interval = expiry_interval
+        self.reconnect_delay = reconnect_delay
+        self.pending: dict[str, PendingSignature] = {}
+        self.confirmed = 0
+        self.failed = 0
+        self.expired = 0
+        self.max_pending = 0
+        self.__ws = None
+        self.__stopping = False
+        self.__ids = itertools.count(1)
+        self.__requests: dict[int, str] = {}
+        self.__subscriptions: dict[int, str] = {}
+        self.__tasks: list[asyncio.Task] = []
+        self.__sends: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def start(self) -> None:
+        """Connect to the RPC websocket and start watching block heights."""
+        if not self.__tasks:
+            self.__stopping = False
+            self.__tasks = [
+                asyncio.create_task(self.__listen()),
+                asyncio.create_task(self.__expire()),
+            ]
+
+    async def stop(self) -> None:
+        """
+        Close the websocket. Pending futures are cancelled without calling their
+        callbacks: the transactions may still land, they are not failures.
+        """
+        # httpx may swallow the cancellation of a request in flight
+        self.__stopping = True
+        tasks = self.__tasks + list(self.__sends)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.__tasks = []
+        for pending in self.pending.values():
+            pending.future.cancel()
+        self.pending.clear()
+        self.__subscriptions.clear()
+
+    def watch(
+        self,
+        signature: Signature | str,
+        last_valid_block_height: int,
+        callback: Callable[[bool], None] = None,
+    ) -> asyncio.Future:
+        """Wait for the confirmation of a sent transaction, callback is called with the result."""
+        signature = str(signature)
+        pending = self.pending.get(signature)
+        if pending is None:
+            pending = self.pending[signature] = PendingSignature(
+                asyncio.get_running_loop().create_future(), last_valid_block_height
+            )
+            self.max_pending = max(self.max_pending, len(self.pending))
+            if self.__ws is not None:
+                task = asyncio.create_task(self.__subscribe(self.__ws, signature))
+                self.__sends.add(task)
+                task.add_done_callback(self.__sends.discard)
+        if callback is not None:
+            pending.callbacks.append(callback)
+        return pending.future
+
+    def __resolve(self, signature: str, confirmed: bool, expired: bool = False) -> None:
+        pending = self.pending.pop(signature, None)
+        if pending is None:
+            return
+        if pending.subscription is not None:
+            self.__subscriptions.pop(pending.subscription, None)
+
+        if confirmed:
+            self.confirmed += 1
+        elif expired:
+            self.expired += 1
+        else:
+            self.failed += 1
+
+        if not pending.future.done():
+            pending.future.set_result(confirmed)
+        for callback in pending.callbacks:
+            try:
+                callback(confirmed)
+            except Exception as e:
+                print(f"ERROR [CONFIRM RPC] Callback of {signature} failed: {e}")
+
+    async def __subscribe(self, ws, signature: str) -> None:
+        request_id = next(self.__ids)
+        self.__requests[request_id] = signature
+        try:
+            await ws.send(
+                json.dumps(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": request_id,
+                        "method": "signatureSubscribe",
+                        "params": [signature, {"commitment": self.commitment}],
+                    }
+                )
+            )
+        except Exception as e:
+            # Subscribed again once reconnected
+            self.__requests.pop(request_id, None)
+            print(f"WARNING [CONFIRM RPC] Unable to subscribe to {signature}: {e}")
+
+    def __on_message(self, message: str) -> None:
+        data = json.loads(message)
+
+        if "id" in data:
+            # Subscription acknowledgement
+            signature = self.__requests.pop(data["id"], None)
+            pending = self.pending.get(signature)
+            if pending is not None and "result" in data:
+                pending.subscription = data["result"]
+                self.__subscriptions[data["result"]] = signature
+            elif pending is not None:
+                print(f"WARNING [CONFIRM RPC] Subscription to {signature} failed: {data}")
+            return
+
+        if data.get("method") == "signatureNotification":
+            params = data["params"]
+            signature = self.__subscriptions.pop(params["subscription"], None)
+            if signature is not None:
+                value = params["result"]["value"]
+                self.__resolve(signature, value.get("err") is None)
+
+    async def __listen(self) -> None:
+        while not self.__stopping:
+            try:
+                async with websockets.connect(self.ws_url) as ws:
+                    self.__ws = ws
+                    self.__requests.clear()
+                    self.__subscriptions.clear()
+                    for signature in list(self.pending):
+                        await self.__subscribe(ws, signature)
+                    async for message in ws:
+                        self.__on_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"WARNING [CONFIRM RPC] Websocket disconnected: {e}")
+            finally:
+                self.__ws = None
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def __expire(self) -> None:
+        while not self.__stopping:
+            await asyncio.sleep(self.expiry_interval)
+            if not self.pending:
+                continue
+            try:
+                block_height = (await self.client.get_block_height(commitment=Confirmed)).value
+                await self.__expire_before(block_height)
+            except Exception as e:
+                print(f"WARNING [CONFIRM RPC] Unable to check expired signatures: {e}")
+
+    async def __expire_before(self, block_height: int) -> None:
+        expired = [
+            signature
+            for signature, pending in self.pending.items()
+            if pending.last_valid_block_height < block_height
+        ]
+        if not expired:
+            return
+
+        response = await self.client.get_signature_statuses(
+            [Signature.from_string(signature) for signature in expired]
+        )
+        for signature, status in zip(expired, response.value):
+            if status is not None and status.confirmation_status in (
+                TransactionConfirmationStatus.Confirmed,
+                TransactionConfirmationStatus.Finalized,
+            ):
+                self.__resolve(signature, status.err is None)
+            else:
+                print(f"WARNING [CONFIRM RPC] Transaction {signature} expired")
+                self.__resolve(signature, False, expired=True)
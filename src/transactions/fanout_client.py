@@ -0,0 +1,136 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from solana.rpc.types import TxOpts
+
+from .rpc_client import RpcClient
+
+
+@dataclass(slots=True)
+class Endpoint:
+    url: str
+    client: RpcClient
+    requests: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    latency: float = 0.0  # Smoothed duration of a successful request, in seconds
+    failed_at: float = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        return 1 - self.errors / self.requests if self.requests else 1.0
+
+
+class FanoutClient:
+    """
+    RpcClient over several RPC endpoints.
+
+    send_raw_transaction() submits a signed transaction to every endpoint at
+    once and returns the first successful answer, the slower endpoints finish
+    in the background. Every other RpcClient method (reads) is called on the
+    fastest healthy endpoint, falling back to the next ones on error.
+
+    An endpoint is unhealthy after max_errors errors in a row, reads skip it
+    for retry_after seconds. Transactions are still sent to it, a success
+    makes it healthy again.
+    """
+
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, urls: Iterable[str], max_errors: int = 3, retry_after: float = 30):
+        self.endpoints = [Endpoint(url, RpcClient(url)) for url in dict.fromkeys(urls)]
+        self.max_errors = max_errors
+        self.retry_after = retry_after
+        self.__background: set[asyncio.Task] = set()
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or not asyncio.iscoroutinefunction(
+            getattr(RpcClient, name, None)
+        ):
+            raise AttributeError(name)
+
+        async def read(*args, **kwargs):
+            return await self.__read(name, args, kwargs)
+
+        return read
+
+    def is_healthy(self, endpoint: Endpoint) -> bool:
+        return (
+            endpoint.consecutive_errors < self.max_errors
+            or time.monotonic() - endpoint.failed_at > self.retry_after  # noqa: W503
+        )
+
+    def ranked(self) -> list[Endpoint]:
+        """Endpoints for reads: the healthy ones, fastest first, then the others."""
+        return sorted(
+            self.endpoints,
+            key=lambda endpoint: (not self.is_healthy(endpoint), endpoint.latency),
+        )
+
+    async def send_raw_transaction(self, txn: bytes, opts: TxOpts = None):
+        """Send a transaction to every endpoint, returns the first successful answer."""
+        tasks = [
+            asyncio.create_task(
+                self.__call(endpoint, endpoint.client.send_raw_transaction(txn, opts=opts))
+            )
+            for endpoint in self.endpoints
+        ]
+        error = None
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                result = await next_done
+            except Exception as e:
+                error = e
+                continue
+
+            # Keep the stats of the slower endpoints
+            for task in tasks:
+                if not task.done():
+                    self.__background.add(task)
+                    task.add_done_callback(self.__forget)
+            return result
+        raise error
+
+    async def close(self) -> None:
+        """Close the clients of every endpoint."""
+        await asyncio.gather(*self.__background, return_exceptions=True)
+        await asyncio.gather(*[endpoint.client.close() for endpoint in self.endpoints])
+
+    async def __read(self, name: str, args, kwargs):
+        error = None
+        for endpoint in self.ranked():
+            try:
+                return await self.__call(endpoint, getattr(endpoint.client, name)(*args, **kwargs))
+            except Exception as e:
+                print(f"WARNING [RPC] {name} failed on {endpoint.url}: {e}")
+                error = e
+        raise error
+
+    async def __call(self, endpoint: Endpoint, request):
+        """Await a request of an endpoint, and update its stats."""
+        endpoint.requests += 1
+        start = time.perf_counter()
+        try:
+            result = await request
+        except Exception:
+            endpoint.errors += 1
+            endpoint.consecutive_errors += 1
+            endpoint.failed_at = time.monotonic()
+            raise
+
+        latency = time.perf_counter() - start
+        endpoint.latency = (
+            latency
+            if endpoint.latency == 0
+            else endpoint.latency + self.LATENCY_SMOOTHING * (latency - endpoint.latency)
+        )
+        endpoint.consecutive_errors = 0
+        return result
+
+    def __forget(self, task: asyncio.Task) -> None:
+        self.__background.discard(task)
+        if not task.cancelled():
+            # Already counted in the endpoint stats
+            task.exception()
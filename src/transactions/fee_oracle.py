@@ -0,0 +1,102 @@
+import asyncio
+import math
+from typing import Iterable, Optional
+
+from solders.pubkey import Pubkey
+
+from ..constants import PUMP_FEE, SOL_DECIMALS, UNIT_BUDGET, UNIT_PRICE
+
+# Urgency tiers
+BUY = "buy"
+SELL = "sell"
+STOP_LOSS = "stop_loss"
+
+
+class FeeOracle:
+    """
+    Compute unit price (micro-lamports per CU) estimated from the
+    prioritization fees paid in the recent slots, sampled on a background task.
+
+    Each urgency tier reads its own percentile of the samples: a buy right
+    after a create has to land in the next block, a stop-loss has to get out,
+    a regular sell can wait a little. Prices are kept within [min_price,
+    max_price], min_price is used until the first samples are fetched.
+
+    priority_fee() turns the percentile of a tier into the total fee in SOL
+    paid to PumpPortal. It is not capped by max_price, which bounds what our
+    own RPC transactions pay per CU, but kept within [min_fee, max_fee] SOL.
+
+    Only transactions write-locking `accounts` (the pump.fun fee account, in
+    every buy and sell) are sampled, so the estimate follows pump.fun contention.
+    """
+
+    def __init__(
+        self,
+        client,
+        percentiles: dict[str, float] = None,
+        refresh_interval: float = 5,
+        min_price: int = UNIT_PRICE,
+        max_price: int = 100_000,
+        accounts: Iterable[Pubkey] = (PUMP_FEE,),
+        min_fee: float = 0.0,
+        max_fee: float = math.inf,
+    ):
+        self.client = client
+        self.percentiles = percentiles or {BUY: 75, SELL: 50, STOP_LOSS: 90}
+        self.refresh_interval = refresh_interval
+        self.min_price = min_price
+        self.max_price = max_price
+        self.accounts = list(accounts)
+        self.min_fee = min_fee
+        self.max_fee = max_fee
+        self.samples: list[int] = []
+        self.prices: dict[str, int] = {}
+        self.fee_prices: dict[str, int] = {}
+        self.__task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the sampling task."""
+        if self.__task is None:
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        """Stop the sampling task."""
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+
+    def price(self, tier: str) -> int:
+        """Compute unit price of an urgency tier, in micro-lamports."""
+        return self.prices.get(tier, self.min_price)
+
+    def priority_fee(self, tier: str, units: int = UNIT_BUDGET) -> float:
+        """Total priority fee in SOL of a transaction consuming `units` compute units."""
+        fee = self.fee_prices.get(tier, self.min_price) * units / 1e6 / SOL_DECIMALS
+        return min(max(fee, self.min_fee), self.max_fee)
+
+    async def refresh(self) -> None:
+        """Sample the recent prioritization fees, and update the price of every tier."""
+        self.samples = sorted(await self.client.get_recent_prioritization_fees(self.accounts))
+        if not self.samples:
+            return
+        self.fee_prices = {
+            tier: self.__percentile(percentile) for tier, percentile in self.percentiles.items()
+        }
+        self.prices = {
+            tier: min(max(price, self.min_price), self.max_price)
+            for tier, price in self.fee_prices.items()
+        }
+
+    def __percentile(self, percentile: float) -> int:
+        """Nearest-rank percentile of the samples."""
+        rank = math.ceil(percentile / 100 * len(self.samples))
+        return self.samples[min(max(rank, 1), len(self.samples)) - 1]
+
+    async def __run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"WARNING [FEE ORACLE] Unable to sample prioritization fees: {e}")
+            await asyncio.sleep(self.refresh_interval)
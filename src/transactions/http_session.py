@@ -0,0 +1,67 @@
+import asyncio
+import importlib.util
+import httpx
+
+
+class HttpSession:
+    """Persistent keep-alive HTTP connection pool, shared by every trade sent over HTTP."""
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 10,
+        http2: bool = False,
+        timeout: float = 10,
+    ):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.http2 = http2 and self.__h2_available()
+        self.__client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return the pooled client, opening it on first use or after a close."""
+        if self.__client is None or self.__client.is_closed:
+            self.__client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60,
+                ),
+            )
+        return self.__client
+
+    async def warmup(self, connections: int | None = None) -> None:
+        """Open the pool connections (TCP + TLS) before the first trade needs them."""
+        connections = connections or self.max_connections
+        results = await asyncio.gather(
+            *[self.client.head("/") for _ in range(connections)],
+            return_exceptions=True,
+        )
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            print(f"WARNING [HTTP] Warm-up of {self.base_url} failed: {failed[0]}")
+        else:
+            print(f"INFO [HTTP] {connections} connection(s) to {self.base_url} warmed up")
+
+    async def post(self, url: str, data: dict) -> httpx.Response:
+        """Send a POST request through the pool."""
+        return await self.client.post(url, data=data)
+
+    async def close(self) -> None:
+        """Close every pooled connection."""
+        if self.__client is not None:
+            await self.__client.aclose()
+            self.__client = None
+
+    @staticmethod
+    def __h2_available() -> bool:
+        """HTTP/2 needs the optional h2 package (httpx[http2])."""
+        if importlib.util.find_spec("h2") is None:
+            print("WARNING [HTTP] HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+            return False
+        return True
@@ -0,0 +1,84 @@
+import struct
+from solders.instruction import Instruction, AccountMeta
+from solders.pubkey import Pubkey
+
+from ..constants import (
+    PUMP_GLOBAL,
+    PUMP_FEE,
+    PUMP_EVENT_AUTHORITY,
+    PUMP_PROGRAM,
+    PUMP_BUY_DISCRIMINATOR,
+    PUMP_SELL_DISCRIMINATOR,
+    SYSTEM_PROGRAM,
+    SYSTEM_TOKEN_PROGRAM,
+    SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM,
+    SYSTEM_RENT,
+)
+
+# discriminator, token amount, max SOL cost (buy) or min SOL output (sell)
+INSTRUCTION_DATA = struct.Struct("<QQQ")
+
+# Positions of the per trade accounts in both instructions
+MINT, BONDING_CURVE, ASSOCIATED_BONDING_CURVE, ASSOCIATED_USER, USER = range(2, 7)
+
+
+def _readonly(pubkey: Pubkey) -> AccountMeta:
+    return AccountMeta(pubkey=pubkey, is_signer=False, is_writable=False)
+
+
+def _writable(pubkey: Pubkey) -> AccountMeta:
+    return AccountMeta(pubkey=pubkey, is_signer=False, is_writable=True)
+
+
+class InstructionTemplates:
+    """
+    pump.fun buy/sell instructions of a wallet, with every static account meta
+    built once. Each trade only patches in the mint, bonding curve, associated
+    bonding curve, ATA and the amounts.
+    """
+
+    def __init__(self, user: Pubkey):
+        self.user = user
+        head = [
+            _readonly(PUMP_GLOBAL),
+            _writable(PUMP_FEE),
+            None,  # mint
+            None,  # bonding curve
+            None,  # associated bonding curve
+            None,  # associated user
+            AccountMeta(pubkey=user, is_signer=True, is_writable=True),
+            _readonly(SYSTEM_PROGRAM),
+        ]
+        tail = [_readonly(PUMP_EVENT_AUTHORITY), _readonly(PUMP_PROGRAM)]
+        self.buy_accounts = head + [
+            _readonly(SYSTEM_TOKEN_PROGRAM),
+            _readonly(SYSTEM_RENT),
+        ] + tail
+        self.sell_accounts = head + [
+            _readonly(SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM),
+            _readonly(SYSTEM_TOKEN_PROGRAM),
+        ] + tail
+
+    def buy(self, transaction, ata: Pubkey, amount: int, max_sol_cost: int) -> Instruction:
+        """Build a buy instruction of amount tokens (base units)."""
+        return self.__build(
+            self.buy_accounts, PUMP_BUY_DISCRIMINATOR, transaction, ata, amount, max_sol_cost
+        )
+
+    def sell(self, transaction, ata: Pubkey, amount: int, min_sol_output: int) -> Instruction:
+        """Build a sell instruction of amount tokens (base units)."""
+        return self.__build(
+            self.sell_accounts, PUMP_SELL_DISCRIMINATOR, transaction, ata, amount, min_sol_output
+        )
+
+    def __build(self, template, discriminator, transaction, ata, amount, sol_amount):
+        accounts = template.copy()
+        accounts[MINT] = _readonly(transaction.token.mint)
+        accounts[BONDING_CURVE] = _writable(transaction.bondingCurveKey)
+        accounts[ASSOCIATED_BONDING_CURVE] = _writable(transaction.associatedBondingCurveKey)
+        accounts[ASSOCIATED_USER] = _writable(ata)
+        return Instruction(
+            PUMP_PROGRAM,
+            INSTRUCTION_DATA.pack(discriminator, amount, sol_amount),
+            accounts,
+        )
@@ -0,0 +1,81 @@
+import struct
+from typing import Iterable
+
+from solana.rpc.commitment import Confirmed
+from solders.address_lookup_table_account import (
+    ID as ADDRESS_LOOKUP_TABLE_PROGRAM,
+    AddressLookupTable,
+    AddressLookupTableAccount,
+    derive_lookup_table_address,
+)
+from solders.instruction import Instruction, AccountMeta
+from solders.pubkey import Pubkey
+
+from ..constants import (
+    PUMP_GLOBAL,
+    PUMP_FEE,
+    PUMP_EVENT_AUTHORITY,
+    PUMP_PROGRAM,
+    SYSTEM_PROGRAM,
+    SYSTEM_TOKEN_PROGRAM,
+    SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM,
+    SYSTEM_RENT,
+)
+
+# Accounts of every pump.fun buy and sell, whatever the mint and the wallet
+PUMP_STATIC_ACCOUNTS = [
+    PUMP_GLOBAL,
+    PUMP_FEE,
+    PUMP_EVENT_AUTHORITY,
+    PUMP_PROGRAM,
+    SYSTEM_PROGRAM,
+    SYSTEM_TOKEN_PROGRAM,
+    SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM,
+    SYSTEM_RENT,
+]
+
+# Address lookup table program instructions
+CREATE_LOOKUP_TABLE = 0
+EXTEND_LOOKUP_TABLE = 2
+
+
+async def load_lookup_table(client, address: Pubkey) -> AddressLookupTableAccount:
+    """Fetch an address lookup table, to compile v0 messages with it."""
+    response = await client.get_account_info(address, commitment=Confirmed)
+    if response.value is None:
+        raise ValueError(f"Address lookup table {address} not found")
+    table = AddressLookupTable.deserialize(response.value.data)
+    return AddressLookupTableAccount(address, list(table.addresses))
+
+
+def create_lookup_table(
+    authority: Pubkey, payer: Pubkey, recent_slot: int
+) -> tuple[Instruction, Pubkey]:
+    """Instruction creating the lookup table of authority, and the table address."""
+    address, bump = derive_lookup_table_address(authority, recent_slot)
+    data = struct.pack("<IQB", CREATE_LOOKUP_TABLE, recent_slot, bump)
+    return _instruction(address, authority, payer, data), address
+
+
+def extend_lookup_table(
+    address: Pubkey, authority: Pubkey, payer: Pubkey, addresses: Iterable[Pubkey]
+) -> Instruction:
+    """Instruction appending addresses to a lookup table."""
+    addresses = list(addresses)
+    data = struct.pack("<IQ", EXTEND_LOOKUP_TABLE, len(addresses)) + b"".join(
+        bytes(pubkey) for pubkey in addresses
+    )
+    return _instruction(address, authority, payer, data)
+
+
+def _instruction(address: Pubkey, authority: Pubkey, payer: Pubkey, data: bytes) -> Instruction:
+    return Instruction(
+        ADDRESS_LOOKUP_TABLE_PROGRAM,
+        data,
+        [
+            AccountMeta(pubkey=address, is_signer=False, is_writable=True),
+            AccountMeta(pubkey=authority, is_signer=True, is_writable=False),
+            AccountMeta(pubkey=payer, is_signer=True, is_writable=True),
+            AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
+        ],
+    )
@@ -0,0 +1,211 @@
+import asyncio
+from typing import Optional
+
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.hash import Hash
+
+from ..utils import Utils
+from .balance_cache import BalanceCache
+from .blockhash_cache import BlockhashCache
+from .compute_units import ComputeUnitEstimator
+from .fee_oracle import FeeOracle, STOP_LOSS
+from .instruction_templates import InstructionTemplates
+from .rpc_transaction import RpcTransaction, SignedTransaction
+
+
+class PresignedSells:
+    """
+    Signed sell transaction of every tracked position, ready to be sent.
+
+    A position's transaction is rebuilt on a background task whenever the
+    blockhash cache gets a new blockhash, the known token balance changes, or
+    a trade frame brings new bonding curve reserves. Balances follow the
+    balance cache when one is given. Rebuilds are coalesced:
+    a position is signed once per wake-up whatever the number of changes.
+    Triggering a sell then costs a single sendTransaction.
+
+    Sells are signed with the priority fee of a single urgency tier (the
+    stop-loss by default): sells of another tier are built on the spot.
+    """
+
+    def __init__(
+        self,
+        client,
+        account,
+        blockhash_cache: BlockhashCache,
+        templates: InstructionTemplates = None,
+        fee_oracle: FeeOracle = None,
+        compute_units: ComputeUnitEstimator = None,
+        lookup_tables: list[AddressLookupTableAccount] = None,
+        balance_cache: BalanceCache = None,
+        tier: str = STOP_LOSS,
+    ):
+        self.client = client
+        self.account = account
+        self.blockhash_cache = blockhash_cache
+        self.templates = templates or InstructionTemplates(account.pubkey())
+        self.fee_oracle = fee_oracle
+        self.compute_units = compute_units
+        self.lookup_tables = lookup_tables
+        self.balance_cache = balance_cache
+        self.tier = tier
+        self.positions: dict[str, RpcTransaction] = {}
+        self.balances: dict[str, float] = {}
+        self.signed: dict[str, tuple[Hash, SignedTransaction]] = {}
+        self.builds = 0
+        self.hits = 0
+        self.misses = 0
+        self.__dirty: set[str] = set()
+        self.__changed: Optional[asyncio.Event] = None
+        self.__task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def start(self) -> None:
+        """Listen to the blockhash cache and start the rebuild task."""
+        if self.__task is None:
+            self.__changed = asyncio.Event()
+            self.blockhash_cache.listeners.append(self.__on_blockhash)
+            if self.balance_cache is not None:
+                self.balance_cache.listeners.append(self.set_balance)
+            self.__task = asyncio.create_task(self.__run())
+            if self.__dirty:
+                self.__changed.set()
+
+    async def stop(self) -> None:
+        """Stop the rebuild task."""
+        if self.__task is not None:
+            self.blockhash_cache.listeners.remove(self.__on_blockhash)
+            if self.balance_cache is not None:
+                self.balance_cache.listeners.remove(self.set_balance)
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions=True)
+            self.__task = None
+
+    def track(self, transaction, balance: float = None) -> None:
+        """
+        Keep a sell of the position signed. Its balance is fetched on the
+        background task when it is not given.
+        """
+        token_address = transaction.token.address
+        self.positions[token_address] = RpcTransaction(
+            self.client,
+            transaction,
+            self.account,
+            blockhash_cache=self.blockhash_cache,
+            templates=self.templates,
+            fee_oracle=self.fee_oracle,
+            compute_units=self.compute_units,
+            lookup_tables=self.lookup_tables,
+            balance_cache=self.balance_cache,
+        )
+        if balance is None and self.balance_cache is not None:
+            balance = self.balance_cache.cached(token_address)
+        if balance is not None:
+            self.balances[token_address] = balance
+        self.__mark(token_address)
+
+    def untrack(self, token_address: str) -> None:
+        """Forget the position."""
+        self.positions.pop(token_address, None)
+        self.balances.pop(token_address, None)
+        self.signed.pop(token_address, None)
+        self.__dirty.discard(token_address)
+
+    def update(self, transaction) -> None:
+        """Rebuild the sell of a tracked position with the reserves of a newer trade."""
+        rpc = self.positions.get(transaction.token.address)
+        if rpc is None:
+            return
+        # The bonding curve accounts don't change, keep the ones already derived
+        transaction.bondingCurveKey = rpc.transaction.bondingCurveKey
+        transaction.associatedBondingCurveKey = rpc.transaction.associatedBondingCurveKey
+        rpc.transaction = transaction
+        self.__mark(transaction.token.address)
+
+    def set_balance(self, token_address: str, balance: float) -> None:
+        """Set the token balance of a tracked position, its sell is rebuilt if it changed."""
+        if token_address not in self.positions or self.balances.get(token_address) == balance:
+            return
+        self.balances[token_address] = balance
+        self.__mark(token_address)
+
+    def get(self, token_address: str, tier: str = STOP_LOSS) -> Optional[SignedTransaction]:
+        """
+        Return the signed sell of a position, None if missing, stale (its
+        blockhash is not the latest), waiting to be rebuilt with newer reserves
+        or balance, or signed for another urgency tier.
+        """
+        signed = self.signed.get(token_address)
+        current = self.blockhash_cache.get()
+        if (
+            signed is None
+            or tier != self.tier  # noqa: W503
+            or token_address in self.__dirty  # noqa: W503
+            or current is None  # noqa: W503
+            or signed[0] != current[0]  # noqa: W503
+        ):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return signed[1]
+
+    def __mark(self, token_address: str) -> None:
+        self.__dirty.add(token_address)
+        if self.__changed is not None:
+            self.__changed.set()
+
+    def __on_blockhash(self, blockhash: Hash) -> None:
+        for token_address in self.positions:
+            self.__mark(token_address)
+
+    async def __run(self) -> None:
+        while True:
+            await self.__changed.wait()
+            self.__changed.clear()
+            dirty, self.__dirty = self.__dirty, set()
+            for token_address in dirty:
+                # Outdated, not handed out while the rebuilds are running
+                self.signed.pop(token_address, None)
+            for token_address in dirty:
+                try:
+                    await self.__rebuild(token_address)
+                except Exception as e:
+                    print(f"ERROR [SELL RPC] Unable to pre-sign sell of {token_address}: {e}")
+
+    async def __rebuild(self, token_address: str) -> None:
+        rpc = self.positions.get(token_address)
+        if rpc is None or rpc.transaction.vSolInBondingCurve is None:
+            # Reloaded positions have no reserves until their first trade frame
+            return
+
+        if token_address not in self.balances:
+            if self.balance_cache is not None:
+                balance = await self.balance_cache.get(rpc.token.mint)
+            else:
+                balance = await Utils.get_token_balance(
+                    self.client, self.account.pubkey(), rpc.token.mint
+                )
+            if rpc is not self.positions.get(token_address) or not balance:
+                # Untracked meanwhile, or nothing to sell yet
+                return
+            self.balances.setdefault(token_address, balance)
+
+        if not self.balances[token_address]:
+            # Sold out, nothing left to pre-sign
+            self.signed.pop(token_address, None)
+            return
+
+        current = self.blockhash_cache.get()
+        if current is None:
+            # Rebuilt by the listener once the blockhash cache is refreshed
+            self.signed.pop(token_address, None)
+            return
+
+        blockhash, _ = current
+        self.signed[token_address] = (
+            blockhash,
+            rpc.build_sell_transaction(self.balances[token_address], blockhash, self.tier),
+        )
+        self.builds += 1
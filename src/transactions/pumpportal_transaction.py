@@ -1,15 +1,20 @@
 import requests
 import os
 
+from .http_session import HttpSession
+
+PUMPPORTAL_BASE_URL = "https://pumpportal.fun"
+
 
 class PumpPortalTransaction:
 
     PUMPPORTAL_API_KEY = os.getenv("PUMPPORTAL_API_KEY", None)
 
-    def __init__(self, transaction):
+    def __init__(self, transaction, session: HttpSession = None):
         self.transaction = transaction
+        self.session = session
         self.token = transaction.token if transaction.token else None
-        self.token_address = str(self.token.mint) if self.token else None
+        self.token_address = self.token.address if self.token else None
 
     def send_buy_transaction(self, amount=0, slippage=3):
         if self.__assert_pumpportal_api_key() is True and self.__assert_tokens() is True:
@@ -19,24 +24,10 @@ class PumpPortalTransaction:
             try:
 
                 response = requests.post(
-                    url=f"https://pumpportal.fun/api/trade?api-key={self.PUMPPORTAL_API_KEY}",
-                    data={
-                        "action": "buy",
-                        "mint": self.token_address,
-                        "amount": amount,
-                        "denominatedInSol": "true",
-                        "slippage": slippage,
-                        "priorityFee": 0.0001,
-                        "pool": "pump",
-                    },
+                    url=f"{PUMPPORTAL_BASE_URL}{self.__trade_path()}",
+                    data=self.__buy_payload(amount, slippage),
                 )
-                data = response.json()
-                if "errors" in data and data["errors"]:
-                    print(f"ERROR [BUY HTTP] Buy transaction failed: {data['errors']}")
-                    return False
-
-                print(f"INFO [BUY HTTP] Buy transaction sent: {data['signature']}")
-                return True
+                return self.__handle_response(response.json(), "BUY")
 
             except Exception as e:
                 print(f"ERROR [BUY HTTP] Buy transaction failed: {e}")
@@ -52,31 +43,90 @@ class PumpPortalTransaction:
 
             try:
                 response = requests.post(
-                    url=f"https://pumpportal.fun/api/trade?api-key={self.PUMPPORTAL_API_KEY}",
-                    data={
-                        "action": "sell",
-                        "mint": self.token_address,
-                        "amount": f"{amount}%",
-                        "denominatedInSol": "false",
-                        "slippage": slippage,
-                        "priorityFee": 0.0001,
-                        "pool": "pump",
-                    },
+                    url=f"{PUMPPORTAL_BASE_URL}{self.__trade_path()}",
+                    data=self.__sell_payload(amount, slippage),
                 )
-                data = response.json()
-                if "errors" in data and data["errors"]:
-                    print(
-                        f"ERROR [SELL HTTP] Sell transaction failed: {data['errors']}"
-                    )
-                    return False
-
-                print(f"INFO [SELL HTTP] Sell transaction sent: {data['signature']}")
-                return True
+                return self.__handle_response(response.json(), "SELL")
             except Exception as e:
                 print(f"ERROR [SELL HTTP] Sell transaction failed: {e}")
                 return False
         return False
 
+    async def send_buy_transaction_async(self, amount=0, slippage=3, priority_fee=0.0001):
+        """
+        Send a BUY transaction through the pooled HTTP session, without blocking the loop.
+        priority_fee is in SOL.
+        """
+        if self.__assert_pumpportal_api_key() is True and self.__assert_tokens() is True:
+            print(
+                f"INFO [BUY HTTP] Buying token: {self.token.name} ({self.token_address})..."
+            )
+            try:
+                response = await self.session.post(
+                    self.__trade_path(), self.__buy_payload(amount, slippage, priority_fee)
+                )
+                return self.__handle_response(response.json(), "BUY")
+            except Exception as e:
+                print(f"ERROR [BUY HTTP] Buy transaction failed: {e}")
+                return False
+
+        return False
+
+    async def send_sell_transaction_async(self, amount=100, slippage=3, priority_fee=0.0001):
+        """
+        Send a SELL transaction through the pooled HTTP session, without blocking the loop.
+        priority_fee is in SOL.
+        """
+        if self.__assert_pumpportal_api_key() is True and self.__assert_tokens() is True:
+
+            print(f"INFO [SELL HTTP] Selling token: {self.token_address}")
+
+            try:
+                response = await self.session.post(
+                    self.__trade_path(), self.__sell_payload(amount, slippage, priority_fee)
+                )
+                return self.__handle_response(response.json(), "SELL")
+            except Exception as e:
+                print(f"ERROR [SELL HTTP] Sell transaction failed: {e}")
+                return False
+        return False
+
+    def __trade_path(self):
+        return f"/api/trade?api-key={self.PUMPPORTAL_API_KEY}"
+
+    def __buy_payload(self, amount, slippage, priority_fee=0.0001):
+        return {
+            "action": "buy",
+            "mint": self.token_address,
+            "amount": amount,
+            "denominatedInSol": "true",
+            "slippage": slippage,
+            "priorityFee": priority_fee,
+            "pool": "pump",
+        }
+
+    def __sell_payload(self, amount, slippage, priority_fee=0.0001):
+        return {
+            "action": "sell",
+            "mint": self.token_address,
+            "amount": f"{amount}%",
+            "denominatedInSol": "false",
+            "slippage": slippage,
+            "priorityFee": priority_fee,
+            "pool": "pump",
+        }
+
+    def __handle_response(self, data, action):
+        """Check the trade API response and log the transaction signature."""
+        if "errors" in data and data["errors"]:
+            print(
+                f"ERROR [{action} HTTP] {action.capitalize()} transaction failed: {data['errors']}"
+            )
+            return False
+
+        print(f"INFO [{action} HTTP] {action.capitalize()} transaction sent: {data['signature']}")
+        return True
+
     def __assert_pumpportal_api_key(self):
         if self.PUMPPORTAL_API_KEY is None:
             print("ERROR [SELL HTTP] Missing PUMPPORTAL_API_KEY")
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+from solana.rpc.commitment import Confirmed
+from solana.rpc.types import TxOpts
+
+
+class Rebroadcaster:
+    """
+    Send signed transactions again until they are confirmed or expired.
+
+    An RPC node may drop a transaction before it reaches the leader, the same
+    signed bytes are then re-sent every `interval` seconds until the
+    confirmation future of the transaction is done (the ConfirmationManager
+    resolves it when the transaction lands or its blockhash expires). Re-sending
+    a transaction can't make it land twice, and doesn't cost more fees.
+    Every attempt is timed.
+    """
+
+    def __init__(self, client, interval: float = 0.5, max_attempts: int = 0):
+        self.client = client
+        self.interval = interval
+        self.max_attempts = max_attempts  # 0 = until confirmed or expired
+        self.active: dict[str, asyncio.Task] = {}
+        self.attempts = 0
+        self.errors = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        """Mean duration of a send attempt, in seconds."""
+        return self.total_latency / self.attempts if self.attempts else 0.0
+
+    def rebroadcast(self, signature, transaction: bytes, done: asyncio.Future) -> None:
+        """Re-send transaction (already sent once) every interval until done."""
+        signature = str(signature)
+        if self.interval <= 0 or signature in self.active:
+            return
+        task = asyncio.create_task(self.__run(signature, transaction, done))
+        self.active[signature] = task
+        task.add_done_callback(lambda _: self.active.pop(signature, None))
+
+    async def stop(self) -> None:
+        """Stop every rebroadcast."""
+        tasks = list(self.active.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __run(self, signature: str, transaction: bytes, done: asyncio.Future) -> None:
+        opts = TxOpts(skip_preflight=True, preflight_commitment=Confirmed, max_retries=0)
+        attempt = 1
+        while self.max_attempts <= 0 or attempt < self.max_attempts:
+            await asyncio.wait([done], timeout=self.interval)
+            if done.done():
+                return
+
+            attempt += 1
+            start = time.perf_counter()
+            try:
+                await self.client.send_raw_transaction(transaction, opts=opts)
+            except Exception as e:
+                self.errors += 1
+                print(f"WARNING [RPC] Attempt {attempt} to send {signature} failed: {e}")
+            self.last_latency = time.perf_counter() - start
+            self.max_latency = max(self.max_latency, self.last_latency)
+            self.total_latency += self.last_latency
+            self.attempts += 1
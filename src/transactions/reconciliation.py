@@ -0,0 +1,86 @@
+import asyncio
+import struct
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from solana.rpc.commitment import Confirmed
+from solders.pubkey import Pubkey
+from spl.token.instructions import get_associated_token_address
+
+from ..constants import SOL_DECIMALS, TOKEN_DECIMALS
+from ..models.transaction import derive_bonding_curve_accounts
+
+# getMultipleAccounts accepts 100 accounts per call
+MAX_ACCOUNTS = 100
+# SPL token account: mint, owner, then the u64 amount
+TOKEN_AMOUNT = struct.Struct("<64xQ")
+# pump.fun bonding curve: discriminator, virtual token and SOL reserves, real
+# token and SOL reserves, token total supply, complete flag
+BONDING_CURVE = struct.Struct("<8xQQQQQ?")
+
+
+@dataclass(slots=True)
+class OnChainPosition:
+    """Token balance of a position and reserves of its bonding curve, read from the chain."""
+
+    balance: float = 0.0
+    sol_reserves: Optional[float] = None
+    token_reserves: Optional[float] = None
+    complete: bool = False
+
+    @property
+    def alive(self) -> bool:
+        """Tokens are held and can still be sold on the bonding curve."""
+        return self.balance > 0 and self.sol_reserves is not None and not self.complete
+
+
+def _token_balance(data: bytes) -> float:
+    if len(data) < TOKEN_AMOUNT.size:
+        return 0.0
+    return TOKEN_AMOUNT.unpack_from(data)[0] / TOKEN_DECIMALS
+
+
+def _read_curve(position: OnChainPosition, data: bytes) -> None:
+    if len(data) < BONDING_CURVE.size:
+        return
+    virtual_tokens, virtual_sol, _, _, _, complete = BONDING_CURVE.unpack_from(data)
+    position.sol_reserves = virtual_sol / SOL_DECIMALS
+    position.token_reserves = virtual_tokens / TOKEN_DECIMALS
+    position.complete = complete
+
+
+async def reconcile(
+    client, owner: Pubkey, mints: Iterable[Pubkey], batch_size: int = MAX_ACCOUNTS
+) -> dict[str, OnChainPosition]:
+    """
+    Read our associated token account and the bonding curve of every mint.
+
+    Accounts are fetched with getMultipleAccounts, batch_size accounts per
+    call, every batch at once: the time taken barely depends on the number
+    of mints. Reserves are in the units of the trade stream (SOL, tokens).
+    """
+    mints = list(mints)
+    accounts = []
+    for mint in mints:
+        accounts.append(get_associated_token_address(owner, mint))
+        accounts.append(derive_bonding_curve_accounts(mint)[0])
+
+    responses = await asyncio.gather(
+        *(
+            client.get_multiple_accounts(
+                accounts[start:start + batch_size], commitment=Confirmed, encoding="base64"
+            )
+            for start in range(0, len(accounts), batch_size)
+        )
+    )
+    values = [value for response in responses for value in response.value]
+
+    positions = {}
+    for index, mint in enumerate(mints):
+        token_account, bonding_curve = values[2 * index], values[2 * index + 1]
+        position = positions[str(mint)] = OnChainPosition()
+        if token_account is not None:
+            position.balance = _token_balance(bytes(token_account.data))
+        if bonding_curve is not None:
+            _read_curve(position, bytes(bonding_curve.data))
+    return positions
@@ -0,0 +1,30 @@
+from typing import Iterable
+
+from solana.rpc.async_api import AsyncClient
+from solders.pubkey import Pubkey
+
+
+class RpcClient(AsyncClient):
+    """AsyncClient with the RPC methods solana-py doesn't wrap."""
+
+    async def get_recent_prioritization_fees(self, accounts: Iterable[Pubkey] = ()) -> list[int]:
+        """
+        Prioritization fees (micro-lamports per CU) of the recent slots, oldest
+        first. With accounts, only transactions write-locking them are counted.
+        """
+        result = await self.__request(
+            "getRecentPrioritizationFees", [[str(account) for account in accounts]]
+        )
+        return [entry["prioritizationFee"] for entry in sorted(result, key=lambda e: e["slot"])]
+
+    async def __request(self, method: str, params: list):
+        provider = self._provider
+        response = await provider.session.post(
+            **provider._build_common_request_kwargs(),
+            json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params},
+        )
+        response.raise_for_status()
+        data = response.json()
+        if "error" in data:
+            raise RuntimeError(f"{method} failed: {data['error']}")
+        return data["result"]
@@ -1,44 +1,87 @@
 import asyncio
-import struct
-from solders.message import Message
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.hash import Hash
+from solders.message import Message, MessageV0
 from solana.rpc.types import TxOpts
-from solders.instruction import Instruction, AccountMeta
 from solana.rpc.commitment import Confirmed
-from solders.transaction import Transaction as SolTransaction
+from solders.transaction import Transaction as SolTransaction, VersionedTransaction
 from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
 from spl.token.instructions import (
     get_associated_token_address,
     close_account,
-    create_associated_token_account,
+    create_idempotent_associated_token_account,
     CloseAccountParams,
 )
 from ..constants import (
-    PUMP_GLOBAL,
-    PUMP_FEE,
-    PUMP_EVENT_AUTHORITY,
-    PUMP_PROGRAM,
-    SYSTEM_PROGRAM,
     SYSTEM_TOKEN_PROGRAM,
-    SYSTEM_RENT,
     UNIT_BUDGET,
     UNIT_PRICE,
     SOL_DECIMALS,
     TOKEN_DECIMALS,
 )
 from ..utils import Utils
+from .balance_cache import BalanceCache
+from .blockhash_cache import BlockhashCache
+from .compute_units import ComputeUnitEstimator
+from .confirmation_manager import ConfirmationManager
+from .fee_oracle import FeeOracle, BUY, SELL
+from .rebroadcaster import Rebroadcaster
+from .instruction_templates import InstructionTemplates
+
+# Legacy transaction, or v0 when compiled with address lookup tables
+SignedTransaction = SolTransaction | VersionedTransaction
 
 
 class RpcTransaction:
 
-    def __init__(self, client, transaction, account):
+    def __init__(
+        self,
+        client,
+        transaction,
+        account,
+        blockhash_cache: BlockhashCache = None,
+        known_atas: set = None,
+        templates: InstructionTemplates = None,
+        presigned_sells=None,
+        confirmations: ConfirmationManager = None,
+        rebroadcaster: Rebroadcaster = None,
+        fee_oracle: FeeOracle = None,
+        compute_units: ComputeUnitEstimator = None,
+        lookup_tables: list[AddressLookupTableAccount] = None,
+        balance_cache: BalanceCache = None,
+    ):
         self.client = client
+        self.blockhash_cache = blockhash_cache or BlockhashCache(client)
+        # Associated token accounts of our wallet known to exist on chain
+        self.known_atas = known_atas if known_atas is not None else set()
         self.transaction = transaction
         self.account = account
+        self.templates = templates or InstructionTemplates(account.pubkey())
+        # Sell transactions kept signed for the tracked positions (PresignedSells)
+        self.presigned_sells = presigned_sells
+        # Without a ConfirmationManager, sends wait for their confirmation by polling
+        self.confirmations = confirmations
+        self.rebroadcaster = rebroadcaster
+        # Compute unit prices of the urgency tiers, UNIT_PRICE without an oracle
+        self.fee_oracle = fee_oracle
+        # Compute unit limits measured by simulation, UNIT_BUDGET without an estimator
+        self.compute_units = compute_units
+        # Transactions are v0 messages loading the static accounts from these tables
+        self.lookup_tables = lookup_tables
+        # Token balances of our positions, read from the RPC on every sell without a cache
+        self.balance_cache = balance_cache
         self.token = transaction.token if transaction.token else None
-        self.token_address = str(self.token.mint) if self.token else None
+        self.token_address = self.token.address if self.token else None
+        # Bonding curve accounts are only derived for the mints we actually trade
+        if self.token and transaction.associatedBondingCurveKey is None:
+            transaction.set_associated_bonding_curve()
 
-    async def send_buy_transaction(self, amount=0, max_retries=5):
-        """Sends a buy transaction for the first available token using RPC."""
+    async def send_buy_transaction(self, amount=0, max_retries=5, on_confirmed=None):
+        """
+        Sends a buy transaction for the first available token using RPC.
+        With on_confirmed, returns once sent and calls on_confirmed(bool) when
+        the transaction lands or expires.
+        """
 
         if await self.client.is_connected() is True:
             print(f"INFO [BUY RPC] Buying token: {self.token.name} ({self.token_address})...")
@@ -47,49 +90,76 @@ class RpcTransaction:
                 self.account.pubkey(), self.token.mint
             )
 
-            await self.__create_ata(associated_token_account, self.token)
-
-            # Calculate amount of tokens
-            buy_amount = int(self.transaction.sol_for_tokens(amount) * TOKEN_DECIMALS)
+            # Calculate amount of tokens, scaled to base units by __build_instructions
+            buy_amount = self.transaction.sol_for_tokens(amount)
 
             # Build instructions
             buy_instruction = self.__build_instructions(
                 associated_token_account, buy_amount, 0
             )
-            instructions = [
-                set_compute_unit_limit(UNIT_BUDGET),
-                set_compute_unit_price(UNIT_PRICE),
-            ]
+            instructions = []
+
+            # Create the ATA in the buy transaction itself, it is a no-op if it already exists
+            if associated_token_account not in self.known_atas:
+                instructions.append(
+                    create_idempotent_associated_token_account(
+                        self.account.pubkey(), self.account.pubkey(), self.token.mint
+                    )
+                )
 
             instructions.append(buy_instruction)
+            instructions = self.__with_compute_budget(instructions, BUY)
 
             try:
                 # Send transaction
-                tx = await self.__send_transaction(instructions)
+                transaction, last_valid_block_height = await self.__sign(instructions)
+                tx = await self.__send_signed(transaction)
                 print(
                     f"INFO [BUY RPC] Buy transaction sent: {tx} ; confirming transaction..."
                 )
-
-                confirmed = await self.client.confirm_transaction(
-                    tx, commitment="confirmed"
-                )
-                return confirmed
             except Exception as e:
                 print(f"ERROR [BUY RPC] Buy transaction failed: {e}")
                 return False
 
-    async def send_sell_transaction(self):
-        """Sells all available tokens at market price using RPC."""
+            def landed(confirmed):
+                print(f"INFO [BUY RPC] Buy transaction {tx} confirmed: {confirmed}")
+                if confirmed:
+                    self.known_atas.add(associated_token_account)
+                    if self.balance_cache is not None:
+                        self.balance_cache.set(self.token_address, buy_amount)
+                if on_confirmed is not None:
+                    on_confirmed(confirmed)
+
+            return await self.__confirm(transaction, last_valid_block_height, landed, on_confirmed)
+
+    async def send_sell_transaction(self, on_confirmed=None, tier=SELL):
+        """
+        Sells all available tokens at market price using RPC, paying the
+        priority fee of the urgency tier (see FeeOracle).
+        With on_confirmed, returns once sent like send_buy_transaction.
+        """
+        presigned = (
+            self.presigned_sells.get(self.token_address, tier) if self.presigned_sells else None
+        )
+        if presigned is not None:
+            # Signed in the background with the cached blockhash and fee of the tier
+            print(f"INFO [SELL RPC] Sending pre-signed sell of {self.token_address}...")
+            return await self.__send_sell(
+                presigned, self.blockhash_cache.last_valid_block_height, on_confirmed
+            )
+
         if await self.client.is_connected() is True:
             print(f"INFO [SELL RPC] Selling token: {self.token.name} ({self.token_address})")
 
             sender = self.account.pubkey()
 
-            # Get Associated Token Address (ATA)
-            associated_token_account = get_associated_token_address(sender, self.token.mint)
-
             # Fetch Token Balance
-            token_balance = Utils.get_token_balance(sender, self.token.mint)
+            if self.balance_cache is not None:
+                token_balance = await self.balance_cache.get(self.token.mint)
+            else:
+                token_balance = await Utils.get_token_balance(
+                    self.client, sender, self.token.mint
+                )
 
             if token_balance == 0 or token_balance is None:
                 print(f"WARNING [SELL RPC] No tokens to sell for {self.token_address}")
@@ -99,86 +169,119 @@ class RpcTransaction:
                 f"INFO [SELL RPC] Selling {token_balance} tokens of {self.token_address}..."
             )
 
-            # Calculate amount of tokens
-            sell_amount = self.transaction.tokens_for_sol(token_balance)
-
-            # Build instructions
-            sell_instruction = self.__build_instructions(
-                self.transaction, associated_token_account, sell_amount, 1
+            blockhash, last_valid_block_height = await self.blockhash_cache.latest()
+            return await self.__send_sell(
+                self.build_sell_transaction(token_balance, blockhash, tier),
+                last_valid_block_height,
+                on_confirmed,
             )
-            instructions = [
-                set_compute_unit_limit(UNIT_BUDGET),
-                set_compute_unit_price(UNIT_PRICE),
-                sell_instruction,
-                close_account(
-                    CloseAccountParams(
-                        SYSTEM_TOKEN_PROGRAM,
-                        associated_token_account,
-                        sender,
-                        sender,
-                    )
-                ),
-            ]
-            try:
-                # Send transaction
-                tx = await self.__send_transaction(instructions)
-                print(
-                    f"INFO [SELL RPC] Sell transaction sent: {tx} ; confirming transaction..."
-                )
 
-                confirmed = await self.client.confirm_transaction(
-                    tx, commitment="confirmed"
+    def build_sell_transaction(
+        self, token_balance: float, blockhash: Hash, tier: str = SELL
+    ) -> SignedTransaction:
+        """Build and sign the transaction selling token_balance tokens and closing the ATA."""
+        sender = self.account.pubkey()
+
+        # Get Associated Token Address (ATA)
+        associated_token_account = get_associated_token_address(sender, self.token.mint)
+
+        # Calculate amount of tokens
+        sell_amount = self.transaction.tokens_for_sol(token_balance)
+
+        # Build instructions
+        sell_instruction = self.__build_instructions(
+            associated_token_account, sell_amount, 1
+        )
+        instructions = [
+            sell_instruction,
+            close_account(
+                CloseAccountParams(
+                    SYSTEM_TOKEN_PROGRAM,
+                    associated_token_account,
+                    sender,
+                    sender,
                 )
-                print(f"INFO [SELL RPC] Sell transaction confirmed: {confirmed}")
+            ),
+        ]
+        instructions = self.__with_compute_budget(instructions, tier)
+        return self.__compile(instructions, blockhash)
 
-                return confirmed
-            except Exception as e:
-                print(f"ERROR [SELL RPC] Sell transaction failed: {e}")
-                return False
+    def unit_price(self, tier: str) -> int:
+        """Compute unit price (micro-lamports) of an urgency tier."""
+        return self.fee_oracle.price(tier) if self.fee_oracle else UNIT_PRICE
 
-    async def __create_ata(self, ata, token, max_retries=5):
-        """Create an associated token account with retries strategy."""
-        for ata_attempt in range(max_retries):
-            try:
-                account_info = await self.client.get_account_info(ata)
-                if account_info.value is None:
-                    print(
-                        f"INFO [ATA RPC] Creating associated token account (Attempt {ata_attempt + 1})..."  # noqa: E501
-                    )
-                    create_ata_ix = create_associated_token_account(
-                        self.account.pubkey(), self.account.pubkey(), token.mint
-                    )
-                    message = Message([create_ata_ix], self.account.pubkey())
-                    latest_blockhash = await self.client.get_latest_blockhash()
-                    create_ata_tx = SolTransaction(
-                        [self.account],
-                        message,
-                        latest_blockhash.value.blockhash,
-                    )
-                    await self.client.send_transaction(
-                        txn=create_ata_tx,
-                        opts=TxOpts(
-                            skip_preflight=True, preflight_commitment=Confirmed
-                        ),
-                    )
-                    print(f"INFO [ATA RPC] Associated token account address: {ata}")
-                    break
-                else:
-                    print("WARNING [ATA RPC] Associated token account already exists.")
-                    print(f"INFO [ATA RPC] Associated token account address: {ata}")
-                    break
-            except Exception:
-                print(
-                    f"WARNING [ATA RPC] Attempt {ata_attempt + 1} to create associated token account failed"  # noqa: E501
+    def compute_unit_limit(self, instructions: list) -> int:
+        """Compute unit limit of a transaction made of instructions."""
+        if self.compute_units is None:
+            return UNIT_BUDGET
+        return self.compute_units.limit(instructions, self.account.pubkey())
+
+    def __with_compute_budget(self, instructions: list, tier: str) -> list:
+        """Prepend the compute unit limit and price instructions."""
+        return [
+            set_compute_unit_limit(self.compute_unit_limit(instructions)),
+            set_compute_unit_price(self.unit_price(tier)),
+            *instructions,
+        ]
+
+    async def __send_sell(
+        self, transaction: SignedTransaction, last_valid_block_height, on_confirmed
+    ):
+        """Send a signed sell transaction and confirm it."""
+        try:
+            # Send transaction
+            tx = await self.__send_signed(transaction)
+            print(
+                f"INFO [SELL RPC] Sell transaction sent: {tx} ; confirming transaction..."
+            )
+        except Exception as e:
+            print(f"ERROR [SELL RPC] Sell transaction failed: {e}")
+            return False
+
+        def landed(confirmed):
+            print(f"INFO [SELL RPC] Sell transaction {tx} confirmed: {confirmed}")
+            if confirmed:
+                # The sell closes the ATA
+                self.known_atas.discard(
+                    get_associated_token_address(self.account.pubkey(), self.token.mint)
                 )
-                if ata_attempt < max_retries - 1:
-                    wait_time = 2**ata_attempt
-                    asyncio.sleep(wait_time)
-                else:
-                    print(
-                        "ERROR [ATA RPC] Max retries reached. Unable to create associated token account."  # noqa: E501
-                    )
-                    return False
+                if self.balance_cache is not None:
+                    self.balance_cache.set(self.token_address, 0.0)
+            if on_confirmed is not None:
+                on_confirmed(confirmed)
+
+        return await self.__confirm(transaction, last_valid_block_height, landed, on_confirmed)
+
+    async def __confirm(
+        self, transaction: SignedTransaction, last_valid_block_height, landed, on_confirmed
+    ) -> bool:
+        """
+        Confirm a sent transaction, landed(bool) is called with the result.
+        Only waits for it when no on_confirmed callback is given. The
+        transaction is re-sent meanwhile when a Rebroadcaster is attached.
+        """
+        tx = transaction.signatures[0]
+        if self.confirmations is not None:
+            future = self.confirmations.watch(tx, last_valid_block_height, landed)
+            if self.rebroadcaster is not None:
+                self.rebroadcaster.rebroadcast(tx, bytes(transaction), future)
+            return True if on_confirmed is not None else await future
+
+        done = asyncio.get_running_loop().create_future()
+        if self.rebroadcaster is not None:
+            self.rebroadcaster.rebroadcast(tx, bytes(transaction), done)
+        try:
+            response = await self.client.confirm_transaction(
+                tx, commitment=Confirmed, last_valid_block_height=last_valid_block_height
+            )
+            status = response.value[0]
+            confirmed = status is not None and status.err is None
+        except Exception as e:
+            print(f"ERROR [RPC] Transaction {tx} not confirmed: {e}")
+            confirmed = False
+        done.set_result(confirmed)
+        landed(confirmed)
+        return confirmed if on_confirmed is None else True
 
     def __build_instructions(
         self,
@@ -187,64 +290,30 @@ class RpcTransaction:
         tx_type=0,
     ):
         """Build instructions used inside a transaction."""
-        data = bytearray()
+        token_amount = int(amount * TOKEN_DECIMALS)
+        sol_amount = Utils.calculate_preventiv_sol_amount(amount, tx_type)
         if tx_type == 0:
-            data.extend(struct.pack("<Q", 16927863322537952870))
-        else:
-            data.extend(struct.pack("<Q", 12502976635542562355))
-        data.extend(struct.pack("<Q", int(amount * TOKEN_DECIMALS)))
-        data.extend(
-            struct.pack("<Q", Utils.calculate_preventiv_sol_amount(amount, tx_type))
-        )
+            return self.templates.buy(self.transaction, ata, token_amount, sol_amount)
+        return self.templates.sell(self.transaction, ata, token_amount, sol_amount)
 
-        return Instruction(
-            PUMP_PROGRAM,
-            bytes(data),
-            self.__get_instructions_accounts(ata),
-        )
+    async def __sign(self, instructions: list = []):
+        """Sign a transaction with the latest blockhash, and return its last valid block height."""
+        # Compile message
+        blockhash, last_valid_block_height = await self.blockhash_cache.latest()
+        return self.__compile(instructions, blockhash), last_valid_block_height
 
-    def __get_instructions_accounts(self, ata):
-        """Generate the accounts for a transaction."""
-        return [
-            AccountMeta(pubkey=PUMP_GLOBAL, is_signer=False, is_writable=False),
-            AccountMeta(pubkey=PUMP_FEE, is_signer=False, is_writable=True),
-            AccountMeta(
-                pubkey=self.token.mint,
-                is_signer=False,
-                is_writable=False,
-            ),
-            AccountMeta(
-                pubkey=self.transaction.bondingCurveKey,
-                is_signer=False,
-                is_writable=True,
-            ),
-            AccountMeta(
-                pubkey=self.transaction.associatedBondingCurveKey,
-                is_signer=False,
-                is_writable=True,
-            ),
-            AccountMeta(pubkey=ata, is_signer=False, is_writable=True),
-            AccountMeta(pubkey=self.account.pubkey(), is_signer=True, is_writable=True),
-            AccountMeta(pubkey=SYSTEM_PROGRAM, is_signer=False, is_writable=False),
-            AccountMeta(
-                pubkey=SYSTEM_TOKEN_PROGRAM, is_signer=False, is_writable=False
-            ),
-            AccountMeta(pubkey=SYSTEM_RENT, is_signer=False, is_writable=False),
-            AccountMeta(
-                pubkey=PUMP_EVENT_AUTHORITY, is_signer=False, is_writable=False
-            ),
-            AccountMeta(pubkey=PUMP_PROGRAM, is_signer=False, is_writable=False),
-        ]
+    def __compile(self, instructions: list, blockhash: Hash) -> SignedTransaction:
+        """Sign the instructions, as a v0 transaction when lookup tables are given."""
+        payer = self.account.pubkey()
+        if self.lookup_tables:
+            message = MessageV0.try_compile(payer, instructions, self.lookup_tables, blockhash)
+            return VersionedTransaction(message, [self.account])
+        return SolTransaction([self.account], Message(instructions, payer), blockhash)
 
-    async def __send_transaction(self, instructions: list = []):
-        """Send a transaction using RPC."""
-        # Compile message
-        latest_blockhash = await self.client.get_latest_blockhash()
-        msg = Message(instructions, self.account.pubkey())
-        tx = SolTransaction([self.account], msg, latest_blockhash.value.blockhash)
-        # Send transaction
-        res = await self.client.send_transaction(
-            txn=tx,
+    async def __send_signed(self, transaction: SignedTransaction):
+        """Send an already signed transaction, returns its signature."""
+        res = await self.client.send_raw_transaction(
+            bytes(transaction),
             opts=TxOpts(skip_preflight=True, preflight_commitment=Confirmed),
         )
 
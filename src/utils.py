@@ -1,5 +1,5 @@
-import difflib
 import os
+import random
 import re
 import struct
 import hashlib
@@ -12,6 +12,7 @@ from solders.pubkey import Pubkey
 from dotenv import load_dotenv
 
 from .constants import SOL_DECIMALS
+from .similarity import SimilarityIndex
 
 load_dotenv()
 
@@ -22,19 +23,18 @@ SLIPPAGE_PERCENT = float(os.getenv("SLIPPAGE_PERCENT")) / 100
 class Utils:
 
     @staticmethod
-    def is_similar_token(tokens: list, new_token_name: str) -> bool:
+    def is_similar_token(tokens: list | SimilarityIndex, new_token_name: str) -> bool:
         """Checks if a token's name is too similar to a previously bought token."""
-        for token in tokens:
-            existing_name = token["name"]
-            similarity = difflib.SequenceMatcher(
-                None, existing_name.lower(), new_token_name.lower()
-            ).ratio()
-
-            if similarity >= SIMILARITY_THRESHOLD:
-                print(
-                    f"INFO [SKIPPED] {new_token_name} (Too similar to {existing_name}, Similarity: {similarity:.2f})"  # noqa: E501
-                )
-                return True
+        index = tokens if isinstance(tokens, SimilarityIndex) else SimilarityIndex(
+            token["name"] for token in tokens
+        )
+        match = index.find(new_token_name, SIMILARITY_THRESHOLD)
+        if match is not None:
+            existing_name, similarity = match
+            print(
+                f"INFO [SKIPPED] {new_token_name} (Too similar to {existing_name}, Similarity: {similarity:.2f})"  # noqa: E501
+            )
+            return True
         return False
 
     @staticmethod
@@ -56,6 +56,15 @@ class Utils:
             print(f"Error fetching token balance: {e}")
             return None
 
+    @staticmethod
+    def backoff_delay(attempt: int, base: float, cap: float) -> float:
+        """
+        Jittered exponential backoff: a random delay up to base * 2**attempt
+        seconds, capped. The first retry happens almost right away.
+        """
+        # The exponent is bounded, 2.0**1024 would overflow on a long outage
+        return random.uniform(0, min(cap, base * 2.0 ** min(attempt, 32)))
+
     @staticmethod
     def calculate_discriminator(instruction_name):
         # Create a SHA256 hash object
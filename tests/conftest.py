@@ -1,9 +1,26 @@
 import pytest
+import pytest_asyncio
+import asyncio
+import base64
+import itertools
 import json
+import threading
+import time
+import websockets
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
 
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM
+from solders.hash import Hash
 from solders.litesvm import LiteSVM
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction import Transaction as SolTransaction
+
+from src.constants import SYSTEM_TOKEN_PROGRAM
+
+SIGNATURE = str(Signature.new_unique())
 
 
 @pytest.fixture
@@ -108,3 +125,300 @@ def test_account(litesvm_client):
 @pytest.fixture
 def test_pubkey():
     return Pubkey(bytes([1] * 32)).new_unique()
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    """Local HTTP server answering every POST with a configurable JSON body."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        self.requests = []
+        self.connections = set()
+        self.response = {}
+        super().__init__(("127.0.0.1", 0), StubHTTPHandler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHTTPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, don't let them wait for an ACK
+    disable_nagle_algorithm = True
+
+    def do_HEAD(self):
+        self.server.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode()
+        self.server.requests.append(
+            {"path": self.path, "data": {k: v[0] for k, v in parse_qs(body).items()}}
+        )
+        payload = json.dumps(self.server.response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_http_server():
+    """Fixture to run a local HTTP server in a background thread."""
+    server = StubHTTPServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class StubRPCServer(StubHTTPServer):
+    """
+    Local Solana JSON-RPC server. `results` maps a method to its result, or to a
+    callable receiving the request params. `delay` slows every answer down and
+    methods listed in `drop` never get an answer (connection closed).
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.calls = []
+        self.delay = 0
+        self.drop = set()
+        super().__init__()
+        self.RequestHandlerClass = StubRPCHandler
+
+    def called(self, method):
+        return [params for name, params in self.calls if name == method]
+
+
+class StubRPCHandler(StubHTTPHandler):
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length))
+        requests = body if isinstance(body, list) else [body]
+        answers = []
+        for request in requests:
+            method, params = request["method"], request.get("params", [])
+            self.server.calls.append((method, params))
+            if method in self.server.drop:
+                self.close_connection = True
+                return
+            result = self.server.results.get(method)
+            if callable(result):
+                result = result(params)
+            answers.append({"jsonrpc": "2.0", "id": request["id"], "result": result})
+
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        payload = json.dumps(answers if isinstance(body, list) else answers[0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def rpc_context(value):
+    """Wrap a value the way RPC methods returning a context do."""
+    return {"context": {"slot": 1}, "value": value}
+
+
+def confirmed_statuses(params):
+    """getSignatureStatuses handler, every signature is confirmed."""
+    status = {
+        "slot": 1,
+        "confirmations": None,
+        "err": None,
+        "status": {"Ok": None},
+        "confirmationStatus": "confirmed",
+    }
+    return rpc_context([status for _ in params[0]])
+
+
+def latest_blockhash(blockhash, last_valid_block_height):
+    return rpc_context(
+        {"blockhash": str(blockhash), "lastValidBlockHeight": last_valid_block_height}
+    )
+
+
+def token_accounts(mint, amount):
+    """getTokenAccountsByOwner (jsonParsed) result holding amount tokens of mint."""
+    return rpc_context(
+        [
+            {
+                "pubkey": str(Pubkey.new_unique()),
+                "account": {
+                    "lamports": 2039280,
+                    "owner": str(SYSTEM_TOKEN_PROGRAM),
+                    "executable": False,
+                    "rentEpoch": 0,
+                    "space": 165,
+                    "data": {
+                        "program": "spl-token",
+                        "space": 165,
+                        "parsed": {
+                            "type": "account",
+                            "info": {
+                                "mint": str(mint),
+                                "tokenAmount": {
+                                    "amount": str(int(amount * 10**6)),
+                                    "decimals": 6,
+                                    "uiAmount": amount,
+                                    "uiAmountString": str(amount),
+                                },
+                            },
+                        },
+                    },
+                },
+            }
+        ]
+    )
+
+
+def sent_transactions(server):
+    """Transactions received by the stub RPC server."""
+    return [
+        SolTransaction.from_bytes(base64.b64decode(params[0]))
+        for params in server.called("sendTransaction")
+    ]
+
+
+def unit_price(transaction):
+    """Compute unit price set by a transaction, in micro-lamports."""
+    message = transaction.message
+    for ix in message.instructions:
+        if message.account_keys[ix.program_id_index] == COMPUTE_BUDGET_PROGRAM and ix.data[0] == 3:
+            return int.from_bytes(ix.data[1:9], "little")
+
+
+async def until(condition):
+    """Wait (1s at most) until condition() is true."""
+    async def wait():
+        while not condition():
+            await asyncio.sleep(0.005)
+
+    await asyncio.wait_for(wait(), 1)
+
+
+def start_stub_rpc_server():
+    """Run a local Solana JSON-RPC server in a background thread."""
+    server = StubRPCServer()
+    server.results["getLatestBlockhash"] = latest_blockhash(Hash.default(), 1000)
+    server.results["getBlockHeight"] = 900
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    return server
+
+
+def stop_stub_rpc_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_rpc_server():
+    """Fixture to run a local Solana JSON-RPC server in a background thread."""
+    server = start_stub_rpc_server()
+    yield server
+    stop_stub_rpc_server(server)
+
+
+@pytest.fixture
+def rpc_server(stub_rpc_server):
+    """Stub RPC server accepting and confirming every transaction."""
+    stub_rpc_server.results["getHealth"] = "ok"
+    stub_rpc_server.results["sendTransaction"] = SIGNATURE
+    stub_rpc_server.results["getSignatureStatuses"] = confirmed_statuses
+    return stub_rpc_server
+
+
+@pytest.fixture
+def stub_rpc_servers():
+    """Fixture to run three local Solana JSON-RPC servers."""
+    servers = [start_stub_rpc_server() for _ in range(3)]
+    yield servers
+    for server in servers:
+        stop_stub_rpc_server(server)
+
+
+class StubRPCWebsocket:
+    """
+    Local Solana RPC websocket. Subscriptions are acknowledged with a new
+    subscription id, notifications are sent on demand with notify().
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.connections = set()
+        self.subscriptions = {}
+        self.server = None
+        self.__ids = itertools.count(1)
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    def called(self, method):
+        return [request["params"] for request in self.requests if request["method"] == method]
+
+    async def start(self):
+        self.server = await websockets.serve(self.__handle, "127.0.0.1", 0)
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def notify(self, method, key, result):
+        """Send a notification of the subscription made for key (first subscription param)."""
+        payload = json.dumps(
+            {
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": {"result": result, "subscription": self.subscriptions[key]},
+            }
+        )
+        for connection in list(self.connections):
+            await connection.send(payload)
+
+    async def disconnect(self):
+        """Close every client connection."""
+        for connection in list(self.connections):
+            await connection.close()
+
+    async def __handle(self, connection):
+        self.connections.add(connection)
+        try:
+            async for message in connection:
+                request = json.loads(message)
+                self.requests.append(request)
+                subscription = next(self.__ids)
+                if request["params"]:
+                    self.subscriptions[request["params"][0]] = subscription
+                await connection.send(
+                    json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": subscription})
+                )
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.connections.discard(connection)
+
+
+@pytest_asyncio.fixture
+async def stub_rpc_websocket():
+    """Fixture to run a local Solana RPC websocket on the test event loop."""
+    server = StubRPCWebsocket()
+    await server.start()
+    yield server
+    await server.stop()
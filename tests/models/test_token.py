@@ -19,3 +19,14 @@ class TestToken:
         assert token.mint is None
         assert token.name is None
         assert token.symbol is None
+
+    def test_token_mint_from_address(self, test_pubkey):
+        """Test the mint can be given as a string and is converted to a Pubkey on access."""
+        token = Token(mint=str(test_pubkey))
+        assert token.address == str(test_pubkey)
+        assert token.mint == test_pubkey
+        assert token == Token(mint=test_pubkey)
+
+    def test_token_slots(self):
+        """Test Token instances don't carry a per-instance __dict__."""
+        assert not hasattr(Token(), "__dict__")
@@ -1,6 +1,9 @@
 import pytest
+from solders.pubkey import Pubkey
+from spl.token.instructions import get_associated_token_address
 
-from src.models.transaction import Transaction
+from src.constants import PUMP_PROGRAM
+from src.models.transaction import Transaction, derive_bonding_curve_accounts
 from src.models.token import Token
 
 
@@ -62,3 +65,31 @@ class TestTransaction:
 
         transaction = Transaction(txType="buy", tokenAmount=None, solAmount=None)
         assert transaction.token_price() is None
+
+    def test_transaction_slots(self):
+        """Test Transaction instances don't carry a per-instance __dict__."""
+        assert not hasattr(Transaction(), "__dict__")
+
+    def test_set_associated_bonding_curve(self, test_pubkey):
+        """Test bonding curve accounts are derived from the mint."""
+        transaction = Transaction(token=Token(mint=test_pubkey))
+        transaction.set_associated_bonding_curve()
+
+        bonding_curve, _ = Pubkey.find_program_address(
+            ["bonding-curve".encode(), bytes(test_pubkey)], PUMP_PROGRAM
+        )
+        assert transaction.bondingCurveKey == bonding_curve
+        assert transaction.associatedBondingCurveKey == get_associated_token_address(
+            bonding_curve, test_pubkey
+        )
+
+    def test_bonding_curve_derivation_cached(self, test_pubkey):
+        """Test the derivation runs once per mint."""
+        derive_bonding_curve_accounts.cache_clear()
+
+        Transaction(token=Token(mint=test_pubkey)).set_associated_bonding_curve()
+        Transaction(token=Token(mint=test_pubkey)).set_associated_bonding_curve()
+
+        info = derive_bonding_curve_accounts.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
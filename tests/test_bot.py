@@ -20,6 +20,30 @@ from src.bot import Bot
 from src.models.token import Token
 from src.models.transaction import Transaction
 from src.parser import Parser
+from src.storage import Storage
+from src.transactions.reconciliation import OnChainPosition
+
+
+def connection(messages, error=None):
+    """Mocked websockets.connect() receiving messages, then failing with error."""
+    ws = AsyncMock()
+
+    async def receive():
+        for message in messages:
+            yield message
+        if error is not None:
+            raise error
+
+    ws.__aiter__ = Mock(return_value=receive())
+    connect = AsyncMock()
+    connect.__aenter__.return_value = ws
+    return connect, ws
+
+
+async def send_confirmed(*args, on_confirmed=None, **kwargs):
+    """Transaction sent, and confirmed right away."""
+    on_confirmed(True)
+    return True
 
 
 class TestBot:
@@ -56,21 +80,28 @@ class TestBot:
 
     @pytest.mark.asyncio
     async def test_subscribe_token_transactions(self):
-        """Test subscribing to token transactions."""
+        """Test token transaction subscriptions are sent together."""
         ws_mock = AsyncMock()
-        token_address = "some_token_address"
-        await self.bot.subscribe_token_transactions(ws_mock, token_address)
+        self.bot.subscriptions.attach(ws_mock)
+        await self.bot.subscribe_token_transactions(ws_mock, "token_b")
+        await self.bot.subscribe_token_transactions(ws_mock, "token_a")
+        await self.bot.subscriptions.flush()
         ws_mock.send.assert_called_once_with(
-            json.dumps({"method": "subscribeTokenTrade", "keys": [token_address]})
+            json.dumps({"method": "subscribeTokenTrade", "keys": ["token_a", "token_b"]})
         )
+        await self.bot.subscriptions.detach()
 
     @pytest.mark.asyncio
     async def test_unsubscribe_token_transactions(self):
         """Test unsubscribing from token transactions."""
         ws_mock = AsyncMock()
         token_address = "some_token_address"
+        self.bot.subscriptions.attach(ws_mock)
+        await self.bot.subscribe_token_transactions(ws_mock, token_address)
+        await self.bot.subscriptions.flush()
         await self.bot.unsubscribe_token_transactions(ws_mock, token_address)
-        ws_mock.send.assert_called_once_with(
+        await self.bot.subscriptions.flush()
+        ws_mock.send.assert_called_with(
             json.dumps({"method": "unsubscribeTokenTrade", "keys": [token_address]})
         )
 
@@ -141,7 +172,7 @@ class TestBot:
         ), patch(
             "src.transactions.rpc_transaction.RpcTransaction.send_buy_transaction",
             new_callable=AsyncMock,
-            return_value=True,
+            side_effect=send_confirmed,
         ):
 
             await self.bot.run()
@@ -209,7 +240,7 @@ class TestBot:
         ), patch(
             "src.transactions.rpc_transaction.RpcTransaction.send_sell_transaction",
             new_callable=AsyncMock,
-            return_value=True,
+            side_effect=send_confirmed,
         ):
 
             await self.bot.run()
@@ -222,3 +253,143 @@ class TestBot:
             self.bot.unsubscribe_new_tokens.asseunsubscribe_token_transactiort_called_once_with(
                 mock_ws
             )
+
+    @pytest.mark.asyncio
+    async def test_reload_reconciles_positions(self, tmp_path):
+        """Test reloaded positions are checked on chain, dead ones are set to inactive."""
+        storage = Storage(str(tmp_path / "tokens.json"))
+        held, sold = str(Pubkey.new_unique()), str(Pubkey.new_unique())
+        for address in (held, sold):
+            storage.add(
+                {"name": "Test Token", "address": address, "status": "active", "price": 1e-8}
+            )
+        bot = Bot(storage)
+        positions = {
+            held: OnChainPosition(2.5, 30.0, 1_073_000_000.0),
+            sold: OnChainPosition(0.0, 30.0, 1_073_000_000.0),
+        }
+
+        with patch(
+            "src.bot.reconcile", new_callable=AsyncMock, return_value=positions
+        ), patch.object(bot, "subscribe_token_transactions", new_callable=AsyncMock):
+            await bot._Bot__reload_tracked_tokens(AsyncMock())
+            bot.subscribe_token_transactions.assert_called_once()
+
+        assert list(bot.tracked_tokens) == [held]
+        assert storage.get(sold)["status"] == "inactive"
+        assert bot.curves.get(held).sol_reserves == 30.0
+        assert bot.tracked_tokens[held].price == 30.0 / 1_073_000_000.0
+        assert bot.balance_cache.cached(held) == 2.5
+
+    @pytest.mark.asyncio
+    async def test_reload_http_positions_not_reconciled(self, tmp_path):
+        """Test HTTP positions, held by the PumpPortal wallet, are not checked on our wallet."""
+        storage = Storage(str(tmp_path / "tokens.json"))
+        address = str(Pubkey.new_unique())
+        storage.add({"name": "Test Token", "address": address, "status": "active", "price": 1e-8})
+        bot = Bot(storage, is_rpc=False)
+
+        with patch("src.bot.reconcile", new_callable=AsyncMock) as reconcile, patch.object(
+            bot, "subscribe_token_transactions", new_callable=AsyncMock
+        ):
+            await bot._Bot__reload_tracked_tokens(AsyncMock())
+            reconcile.assert_not_called()
+
+        assert list(bot.tracked_tokens) == [address]
+        assert storage.get(address)["status"] == "active"
+
+    @pytest.mark.asyncio
+    async def test_hot_reconnect(self, tmp_path, load_file):
+        """Test a dropped connection is opened again keeping the positions in memory."""
+        message = load_file("tests/etc/transactions/buy.json")
+        tx = Parser(json.loads(message)).parse()
+        token_address = str(tx.token.mint)
+        bot = Bot(Storage(str(tmp_path / "tokens.json")), is_rpc=False, hot_reconnect=True)
+        bot.tracked_tokens[token_address] = tx.token
+        first, first_ws = connection([message], ConnectionError("connection reset"))
+        second, second_ws = connection([message], asyncio.CancelledError())
+
+        with patch("websockets.connect", side_effect=[first, second]), patch(
+            "src.bot.RECONNECT_BASE_DELAY", 0
+        ), patch.object(bot.http_session, "warmup", new_callable=AsyncMock):
+            with pytest.raises(asyncio.CancelledError):
+                await bot.run()
+
+        assert bot.reconnects == 1
+        assert bot.tracked_tokens[token_address] is tx.token
+        assert call(
+            json.dumps({"method": "subscribeTokenTrade", "keys": [token_address]})
+        ) in second_ws.send.call_args_list
+
+    @pytest.mark.asyncio
+    async def test_clients_survive_restart(self, tmp_path):
+        """Test the RPC client is still usable when run() is started again, until close()."""
+        bot = Bot(Storage(str(tmp_path / "tokens.json")), is_rpc=False)
+        session = bot.client.endpoints[0].client._provider.session
+
+        with patch(
+            "websockets.connect", side_effect=[connection([])[0], connection([])[0]]
+        ), patch.object(bot.http_session, "warmup", new_callable=AsyncMock):
+            await bot.run()
+            assert not session.is_closed
+            await bot.run()
+            assert not session.is_closed
+
+        await bot.close()
+        assert session.is_closed
+
+    @pytest.mark.asyncio
+    async def test_similar_names_in_same_burst(self, tmp_path, load_file):
+        """Test a create similar to a token still being bought is skipped."""
+        message = json.loads(load_file("tests/etc/transactions/create.json"))
+        bot = Bot(Storage(str(tmp_path / "tokens.json")))
+        bot.dispatcher = MagicMock()
+        first = dict(message, mint=str(Pubkey.new_unique()))
+        similar = dict(message, mint=str(Pubkey.new_unique()), name="Justice For Kanye!")
+        other = dict(message, mint=str(Pubkey.new_unique()), name="Bitcoin Revolution")
+
+        for frame in (first, similar, other):
+            bot._Bot__route_message(AsyncMock(), json.dumps(frame))
+
+        submitted = [args.args[0] for args in bot.dispatcher.submit.call_args_list]
+        assert submitted == [first["mint"], other["mint"]]
+
+        # A failed buy releases its name
+        with patch(
+            "src.transactions.rpc_transaction.RpcTransaction.send_buy_transaction",
+            new_callable=AsyncMock,
+            return_value=False,
+        ):
+            await bot._Bot__buy_token(AsyncMock(), Parser(first).parse())
+        assert list(bot.pending_names) == [other["mint"]]
+        bot._Bot__route_message(AsyncMock(), json.dumps(similar))
+        assert bot.dispatcher.submit.call_args.args[0] == similar["mint"]
+
+    @pytest.mark.asyncio
+    async def test_pending_buy_reconciled(self, tmp_path, load_file):
+        """Test a sent buy is stored as pending, and tracked at startup once found on chain."""
+        tx = Parser(json.loads(load_file("tests/etc/transactions/create.json"))).parse()
+        token_address = tx.token.address
+        storage = Storage(str(tmp_path / "tokens.json"))
+        bot = Bot(storage)
+        bot.dispatcher = MagicMock()
+
+        # Sent, the bot stops before its confirmation
+        with patch(
+            "src.transactions.rpc_transaction.RpcTransaction.send_buy_transaction",
+            new_callable=AsyncMock,
+            return_value=True,
+        ):
+            await bot._Bot__buy_token(AsyncMock(), tx)
+        assert storage.get(token_address)["status"] == "pending"
+
+        restarted = Bot(storage)
+        with patch(
+            "src.bot.reconcile",
+            new_callable=AsyncMock,
+            return_value={token_address: OnChainPosition(1000.0, 30.0, 1_073_000_000.0)},
+        ), patch.object(restarted, "subscribe_token_transactions", new_callable=AsyncMock):
+            await restarted._Bot__reload_tracked_tokens(AsyncMock())
+
+        assert list(restarted.tracked_tokens) == [token_address]
+        assert storage.get(token_address)["status"] == "active"
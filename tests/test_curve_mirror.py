@@ -0,0 +1,79 @@
+import pytest
+
+from src.curve_mirror import CurveMirror, CurveState
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.parser import Parser
+
+MINT = "5D75Q7cxdEZHoYrctCzNJ5nvNSTTm6nGuhUDWgHNpump"
+
+
+def trade(tx_type, sol_amount, token_amount, **reserves):
+    return Transaction(
+        token=Token(mint=MINT),
+        txType=tx_type,
+        solAmount=sol_amount,
+        tokenAmount=token_amount,
+        **reserves,
+    )
+
+
+@pytest.fixture
+def mirror():
+    mirror = CurveMirror()
+    mirror.track(
+        trade("create", 2.0, 0, vSolInBondingCurve=40.0, vTokensInBondingCurve=800_000_000.0)
+    )
+    return mirror
+
+
+class TestCurveMirror:
+
+    def test_track(self, mirror):
+        """Test tracking a mint seeds its curve from the reserves of the transaction."""
+        assert MINT in mirror
+        assert mirror.get(MINT) == CurveState(40.0, 800_000_000.0)
+
+    def test_trades_move_reserves(self, mirror):
+        """Test buys and sells without reserves move the curve by their amounts."""
+        buy = trade("buy", 1.0, 19_000_000.0)
+        assert mirror.apply(buy) is True
+        assert (buy.vSolInBondingCurve, buy.vTokensInBondingCurve) == (41.0, 781_000_000.0)
+
+        sell = trade("sell", 0.5, 9_000_000.0)
+        assert mirror.apply(sell) is True
+        assert mirror.get(MINT) == CurveState(40.5, 790_000_000.0, trades=2)
+        # Quotes use the mirrored reserves
+        assert sell.tokens_for_sol(1_000) == pytest.approx(
+            trade("sell", 0, 0, vSolInBondingCurve=40.5, vTokensInBondingCurve=790_000_000.0)
+            .tokens_for_sol(1_000)
+        )
+
+    def test_frame_reserves_reset_curve(self, mirror, load_json):
+        """Test a frame carrying the reserves replaces the mirrored state."""
+        mirror.apply(trade("buy", 1.0, 19_000_000.0))
+        data = load_json("tests/etc/transactions/buy.json")
+        data.update({"vTokensInBondingCurve": 700_000_000, "vSolInBondingCurve": 46.0})
+
+        tx = Parser(data).parse()
+        assert mirror.apply(tx) is True
+        assert mirror.get(MINT) == CurveState(46.0, 700_000_000.0)
+
+    def test_unknown_curve(self):
+        """Test trades of untracked mints, or before the reserves are known, are ignored."""
+        mirror = CurveMirror()
+        buy = trade("buy", 1.0, 19_000_000.0)
+        assert mirror.apply(buy) is False
+        assert len(mirror) == 0
+
+        mirror.track(trade("buy", 1.0, 19_000_000.0))
+        assert mirror.apply(buy) is False
+        assert buy.vSolInBondingCurve is None
+
+        mirror.seed(MINT, 30.0, 1_000_000_000.0)
+        assert mirror.apply(buy) is True
+        assert mirror.get(MINT) == CurveState(31.0, 981_000_000.0, trades=1)
+
+        mirror.untrack(MINT)
+        assert mirror.fill(buy) is False
+        assert MINT not in mirror
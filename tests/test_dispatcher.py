@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+
+from src.dispatcher import Dispatcher
+
+
+class TestDispatcher:
+
+    @pytest.mark.asyncio
+    async def test_route_frames_in_order(self):
+        """Test frames are routed in the order they have been received."""
+        routed = []
+        dispatcher = Dispatcher(routed.append, maxsize=10)
+        dispatcher.start()
+
+        for frame in ["a", "b", "c"]:
+            await dispatcher.put(frame)
+        await dispatcher.join()
+        await dispatcher.stop()
+
+        assert routed == ["a", "b", "c"]
+        assert dispatcher.depth == 0
+
+    @pytest.mark.asyncio
+    async def test_jobs_ordered_per_key(self):
+        """Test jobs of the same key run one after the other, in submission order."""
+        dispatcher = Dispatcher(lambda frame: None)
+        executed = []
+
+        def job(name, delay):
+            async def _job():
+                await asyncio.sleep(delay)
+                executed.append(name)
+            return _job
+
+        dispatcher.submit("mint_1", job("first", 0.02))
+        dispatcher.submit("mint_1", job("second", 0))
+        await dispatcher.join()
+
+        assert executed == ["first", "second"]
+        assert dispatcher.workers == {}
+        assert dispatcher.jobs == {}
+
+    @pytest.mark.asyncio
+    async def test_jobs_concurrent_across_keys(self):
+        """Test a slow job on one key does not hold up jobs of other keys."""
+        dispatcher = Dispatcher(lambda frame: None)
+        executed = []
+        release = asyncio.Event()
+
+        async def slow_job():
+            await release.wait()
+            executed.append("slow")
+
+        async def fast_job():
+            executed.append("fast")
+            release.set()
+
+        dispatcher.submit("mint_1", slow_job)
+        dispatcher.submit("mint_2", fast_job)
+        await asyncio.wait_for(dispatcher.join(), timeout=1)
+
+        assert executed == ["fast", "slow"]
+
+    @pytest.mark.asyncio
+    async def test_failing_job_does_not_stop_worker(self):
+        """Test an exception in a job is reported and the next jobs still run."""
+        dispatcher = Dispatcher(lambda frame: None)
+        executed = []
+
+        async def failing_job():
+            raise ValueError("boom")
+
+        async def job():
+            executed.append("done")
+
+        dispatcher.submit("mint_1", failing_job)
+        dispatcher.submit("mint_1", job)
+        await dispatcher.join()
+
+        assert executed == ["done"]
+
+    @pytest.mark.asyncio
+    async def test_queue_depth(self):
+        """Test the queue depth metrics while the dispatch task is not running."""
+        dispatcher = Dispatcher(lambda frame: None, maxsize=5)
+
+        for frame in range(3):
+            await dispatcher.put(frame)
+
+        assert dispatcher.depth == 3
+        assert dispatcher.max_depth == 3
+
+        dispatcher.start()
+        await dispatcher.join()
+        await dispatcher.stop()
+
+        assert dispatcher.depth == 0
+        assert dispatcher.max_depth == 3
+
+    @pytest.mark.asyncio
+    async def test_queue_full_logged_once(self, capsys):
+        """Test a full queue is reported once, then once with the waits when it has room again."""
+        dispatcher = Dispatcher(lambda frame: None, maxsize=2)
+        for frame in range(2):
+            await dispatcher.put(frame)
+
+        waiting = [asyncio.create_task(dispatcher.put(frame)) for frame in range(2, 5)]
+        await asyncio.sleep(0.01)
+        assert capsys.readouterr().out.count("Queue full") == 1
+
+        dispatcher.start()
+        await asyncio.gather(*waiting)
+        await dispatcher.join()
+        await dispatcher.put(5)
+        await dispatcher.stop()
+
+        assert "Queue has room again, 3 frame(s) waited" in capsys.readouterr().out
+        assert dispatcher.waited == 3
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_running_jobs(self):
+        """Test stop() lets the running jobs and their follow-ups finish, within the timeout."""
+        dispatcher = Dispatcher(lambda frame: None)
+        executed = []
+
+        async def follow_up():
+            executed.append("stored")
+
+        async def buy():
+            await asyncio.sleep(0.02)
+            executed.append("sent")
+            dispatcher.submit("mint_1", follow_up)
+
+        async def stuck():
+            await asyncio.sleep(10)
+            executed.append("stuck")
+
+        dispatcher.submit("mint_1", buy)
+        dispatcher.submit("mint_2", stuck)
+        await asyncio.wait_for(dispatcher.stop(timeout=0.1), 1)
+
+        assert executed == ["sent", "stored"]
+        assert dispatcher.workers == {}
@@ -1,7 +1,8 @@
+import json
 import pytest
 from solders.pubkey import Pubkey
 
-from src.parser import Parser
+from src.parser import Parser, loads
 from src.models.token import Token
 from src.models.transaction import Transaction
 
@@ -50,3 +51,41 @@ class TestParser:
         assert transaction.tokenAmount == 15000.0
         assert transaction.solAmount == 0.005
         assert transaction.marketCapSol == 120.75
+
+    def test_parse_trade_reserves(self, load_json):
+        """Test reserves are decoded from trade messages carrying them."""
+        data = load_json("tests/etc/transactions/buy.json")
+        assert Parser(data).parse().vSolInBondingCurve is None
+
+        data.update({"vTokensInBondingCurve": 785_000_000, "vSolInBondingCurve": 41.5})
+        transaction = Parser(data).parse()
+        assert transaction.vTokensInBondingCurve == 785_000_000.0
+        assert transaction.vSolInBondingCurve == 41.5
+
+    def test_parse_does_not_derive_bonding_curve(self, load_json):
+        """Test bonding curve accounts are left to be derived when the mint is traded."""
+        data = load_json("tests/etc/transactions/buy.json")
+        transaction = Parser(data).parse()
+
+        assert transaction.bondingCurveKey is None
+        assert transaction.associatedBondingCurveKey is None
+
+    def test_decode_raw_frame(self, load_file):
+        """Test decoding a raw frame keeps the mint as a string."""
+        transaction = Parser.decode(load_file("tests/etc/transactions/create.json"))
+
+        assert transaction.token.address == "BXvk2E3EtQ68tJ4nSagj4V6eyphCnZ9qHhzqCGoTpump"
+        assert transaction.token._pubkey is None
+        assert transaction.solAmount == 2.0
+        assert isinstance(transaction.solAmount, float)
+        assert transaction.vSolInBondingCurve == 40.999999999999964
+        assert transaction.initialBuy is None
+
+    def test_decode_message_without_mint(self):
+        """Test messages without mint are not decoded into a Transaction."""
+        assert Parser.decode('{"message": "Successfully subscribed to keys."}') is None
+
+    def test_loads(self, load_file):
+        """Test the fast decoder returns the same data as json.loads."""
+        frame = load_file("tests/etc/transactions/create.json")
+        assert loads(frame) == json.loads(frame)
@@ -0,0 +1,27 @@
+import pytest
+
+from src.prefilter import Prefilter
+
+TRACKED_MINT = "5D75Q7cxdEZHoYrctCzNJ5nvNSTTm6nGuhUDWgHNpump"
+
+
+class TestPrefilter:
+
+    @pytest.mark.parametrize("fixture", ["create", "buy", "sell"])
+    def test_accept_relevant_frames(self, load_file, fixture):
+        """Test creates and trades on tracked mints are accepted."""
+        prefilter = Prefilter()
+        frame = load_file(f"tests/etc/transactions/{fixture}.json")
+
+        assert prefilter.accept(frame, {TRACKED_MINT: None}) is True
+        assert prefilter.dropped == 0
+
+    def test_drop_irrelevant_frames(self, load_file):
+        """Test trades on untracked mints and control messages are dropped."""
+        prefilter = Prefilter()
+
+        assert prefilter.accept(load_file("tests/etc/transactions/buy.json"), {}) is False
+        assert prefilter.accept(load_file("tests/etc/transactions/sell.json"), {}) is False
+        assert prefilter.accept('{"message":"Successfully subscribed to keys."}', {}) is False
+        assert prefilter.received == 3
+        assert prefilter.dropped == 3
@@ -0,0 +1,83 @@
+import random
+import pytest
+
+from src.curve_mirror import CurveMirror
+from src.models.token import Token
+from src.models.transaction import Transaction
+from benchmarks.quote_engine import QuoteEngine
+
+U64_MAX = 2**64 - 1
+
+
+def buy_u64(sol_reserves, token_reserves, lamports):
+    remaining = sol_reserves * token_reserves // (sol_reserves + lamports) + 1
+    return token_reserves - remaining if remaining < token_reserves else 0
+
+
+def buy_cost_u64(sol_reserves, token_reserves, tokens, fee_basis_points=100):
+    if tokens >= token_reserves:
+        return U64_MAX
+    cost = tokens * sol_reserves // (token_reserves - tokens) + 1
+    return cost + cost * fee_basis_points // 10_000
+
+
+def sell_u64(sol_reserves, token_reserves, tokens, fee_basis_points=100):
+    output = tokens * sol_reserves // (token_reserves + tokens)
+    return output - output * fee_basis_points // 10_000
+
+
+@pytest.fixture
+def reserves():
+    random.seed(7)
+    sol = [random.randint(10**9, 2 * 10**11) for _ in range(20)]
+    tokens = [random.randint(10**14, 1_073 * 10**12) for _ in range(20)]
+    return sol, tokens
+
+
+class TestQuoteEngine:
+
+    def test_matches_program_math(self, reserves):
+        """Test quotes equal the program integer math, 128-bit products included."""
+        sol, tokens = reserves
+        engine = QuoteEngine(range(len(sol)), sol, tokens)
+        lamports = [1, 10**6, 10**9, 85 * 10**9] + [random.randint(1, 10**12) for _ in range(50)]
+        amounts = [0, 1, 10**6, 2 * 10**15] + [random.randint(1, 10**15) for _ in range(50)]
+
+        buys, costs, sells = engine.buy(lamports), engine.buy_cost(amounts), engine.sell(amounts)
+        assert buys.shape == (len(sol), len(lamports))
+        for i, (sol_reserves, token_reserves) in enumerate(zip(sol, tokens)):
+            assert buys[i].tolist() == [
+                buy_u64(sol_reserves, token_reserves, size) for size in lamports
+            ]
+            assert costs[i].tolist() == [
+                buy_cost_u64(sol_reserves, token_reserves, size) for size in amounts
+            ]
+            assert sells[i].tolist() == [
+                sell_u64(sol_reserves, token_reserves, size) for size in amounts
+            ]
+
+    def test_fee(self):
+        """Test the fee is deducted from sells and added to buy costs."""
+        free = QuoteEngine(["mint"], [30 * 10**9], [1_073 * 10**12], fee_basis_points=0)
+        engine = QuoteEngine(["mint"], [30 * 10**9], [1_073 * 10**12])
+
+        assert engine.sell(10**12)[0, 0] == free.sell(10**12)[0, 0] * 99 // 100 + 1
+        assert engine.buy_cost(10**12)[0, 0] == free.buy_cost(10**12)[0, 0] * 101 // 100
+
+    def test_from_mirror(self):
+        """Test the engine quotes the tracked mints with known reserves, in base units."""
+        mirror = CurveMirror()
+        mirror.track(
+            Transaction(
+                token=Token(mint="known"),
+                vSolInBondingCurve=30.0,
+                vTokensInBondingCurve=1_073_000_000.0,
+            )
+        )
+        mirror.track(Transaction(token=Token(mint="unknown")))
+
+        engine = QuoteEngine.from_mirror(mirror)
+        assert engine.mints == ["known"]
+        assert engine.sell([10**12]).tolist() == [[sell_u64(30 * 10**9, 1_073 * 10**12, 10**12)]]
+        # 1 SOL on a 30 SOL / 1.073B tokens curve: 1.073B - 30 * 1.073B / 31 tokens
+        assert engine.buy(10**9)[0, 0] / 1e6 == pytest.approx(1_073e6 / 31)
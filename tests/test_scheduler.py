@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+import pytest_asyncio
+
+from src.scheduler import Scheduler
+
+
+class TestScheduler:
+
+    @pytest_asyncio.fixture
+    async def scheduler(self):
+        scheduler = Scheduler()
+        scheduler.start()
+        yield scheduler
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_fire_in_deadline_order(self, scheduler):
+        """Test timers fire by deadline, not by insertion order."""
+        fired = []
+        scheduler.schedule("late", 0.03, lambda: fired.append("late"))
+        scheduler.schedule("early", 0.01, lambda: fired.append("early"))
+        scheduler.schedule("now", 0, lambda: fired.append("now"))
+
+        await asyncio.sleep(0.06)
+
+        assert fired == ["now", "early", "late"]
+        assert len(scheduler) == 0
+
+    @pytest.mark.asyncio
+    async def test_fire_without_activity(self, scheduler):
+        """Test a timer fires on its own while nothing else happens on the loop."""
+        fired = asyncio.Event()
+        scheduler.schedule("mint_1", 0.01, fired.set)
+
+        await asyncio.wait_for(fired.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_earlier_deadline_wakes_up_scheduler(self, scheduler):
+        """Test a new earliest deadline is honoured while waiting for a later one."""
+        fired = asyncio.Event()
+        scheduler.schedule("mint_1", 60, lambda: None)
+        await asyncio.sleep(0)
+        scheduler.schedule("mint_2", 0.01, fired.set)
+
+        await asyncio.wait_for(fired.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_cancel(self, scheduler):
+        """Test a cancelled timer never fires."""
+        fired = []
+        scheduler.schedule("mint_1", 0.01, lambda: fired.append("mint_1"))
+        scheduler.cancel("mint_1")
+
+        await asyncio.sleep(0.03)
+
+        assert fired == []
+
+    @pytest.mark.asyncio
+    async def test_reschedule(self, scheduler):
+        """Test rescheduling a key replaces its previous timer."""
+        fired = []
+        scheduler.schedule("mint_1", 0.01, lambda: fired.append("first"))
+        scheduler.schedule("mint_1", 0.02, lambda: fired.append("second"))
+
+        await asyncio.sleep(0.05)
+
+        assert fired == ["second"]
+
+    @pytest.mark.asyncio
+    async def test_failing_callback(self, scheduler):
+        """Test an exception in a callback doesn't stop the scheduler."""
+        fired = asyncio.Event()
+
+        def fail():
+            raise ValueError("boom")
+
+        scheduler.schedule("mint_1", 0, fail)
+        scheduler.schedule("mint_2", 0.01, fired.set)
+
+        await asyncio.wait_for(fired.wait(), timeout=1)
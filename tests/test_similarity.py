@@ -0,0 +1,65 @@
+import difflib
+import random
+import string
+import pytest
+
+from src.similarity import SimilarityIndex
+
+WORDS = ["trump", "doge", "pepe", "moon", "elon", "cat", "inu", "classic", "official", "win"]
+
+
+def brute_force(names, new_name, threshold):
+    """Reference implementation: compare against every stored name."""
+    for name in names:
+        if difflib.SequenceMatcher(None, name.lower(), new_name.lower()).ratio() >= threshold:
+            return True
+    return False
+
+
+def random_name(rng):
+    if rng.random() < 0.5:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+    alphabet = string.ascii_letters + " .-"
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+
+
+class TestSimilarityIndex:
+
+    def test_find(self, mock_token_storage):
+        """Test a similar stored name is found with its similarity."""
+        index = SimilarityIndex(token["name"] for token in mock_token_storage)
+
+        existing_name, similarity = index.find("Trump for the win", 0.6)
+        assert existing_name == "Trump Win All"
+        assert similarity == difflib.SequenceMatcher(
+            None, "trump win all", "trump for the win"
+        ).ratio()
+        assert index.find("Bitcoin Revolution", 0.6) is None
+
+    def test_find_single_character_matches(self):
+        """Test names only sharing scattered characters are still compared."""
+        index = SimilarityIndex(["Doge"])
+        assert index.find("D.O.G.E", 0.6) is not None
+
+    def test_find_duplicate(self):
+        """Test duplicate names are indexed once and always similar."""
+        index = SimilarityIndex(["Doge", "DOGE", "doge"])
+        assert len(index) == 1
+        assert index.find("dOgE", 1.0) == ("Doge", 1.0)
+
+    def test_find_empty(self):
+        """Test an empty index never finds a similar name."""
+        assert SimilarityIndex().find("Doge", 0.0) is None
+
+    @pytest.mark.parametrize("threshold", [0.0, 0.3, 0.6, 0.8, 1.0])
+    def test_same_result_as_brute_force(self, threshold):
+        """Test the index answers exactly like comparing against every stored name."""
+        rng = random.Random(threshold)
+        names = [random_name(rng) for _ in range(300)]
+        index = SimilarityIndex(names)
+
+        for _ in range(300):
+            new_name = random_name(rng)
+            assert (index.find(new_name, threshold) is not None) == brute_force(
+                names, new_name, threshold
+            )
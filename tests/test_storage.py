@@ -1,8 +1,10 @@
+import asyncio
 import pytest
 import os
 import json
+import threading
 
-from src.storage import Storage
+from src.storage import Storage, StorageWriter
 
 class TestStorage:
 
@@ -59,4 +61,113 @@ class TestStorage:
             saved_data = json.load(file)
 
         assert saved_data == test_data
-        
\ No newline at end of file
+        
+    def test_storage_add_and_update(self):
+        """Test tokens are indexed by address and updated in place."""
+        self.storage.add({"name": "TokenA", "address": "abc123", "status": "active"})
+
+        assert self.storage.update("abc123", {"status": "inactive"}) is True
+        assert self.storage.update("unknown", {"status": "inactive"}) is False
+        assert self.storage.get("abc123")["status"] == "inactive"
+        assert self.storage.tokens == [
+            {"name": "TokenA", "address": "abc123", "status": "inactive"}
+        ]
+        assert self.storage.names.find("tokena", 1.0) == ("TokenA", 1.0)
+
+    def test_storage_journal(self):
+        """Test changes are appended to the journal and replayed on load."""
+        self.temp_file.write_text(json.dumps([{"name": "TokenA", "address": "abc123"}]))
+        self.storage.load()
+        self.storage.add({"name": "TokenB", "address": "xyz456", "status": "active"})
+        self.storage.update("xyz456", {"status": "inactive"})
+
+        # The snapshot is untouched, changes are in the journal
+        assert json.loads(self.temp_file.read_text()) == [{"name": "TokenA", "address": "abc123"}]
+        assert len(open(self.storage.journal_path).readlines()) == 2
+
+        storage = Storage(filepath=str(self.temp_file))
+        storage.load()
+
+        assert storage.tokens == [
+            {"name": "TokenA", "address": "abc123"},
+            {"name": "TokenB", "address": "xyz456", "status": "inactive"},
+        ]
+        # Loading folds the journal into the snapshot
+        assert json.loads(self.temp_file.read_text()) == storage.tokens
+        assert not os.path.exists(storage.journal_path)
+
+    def test_storage_journal_torn_entry(self):
+        """Test a journal entry torn by a crash is skipped."""
+        self.storage.add({"name": "TokenA", "address": "abc123"})
+        with open(self.storage.journal_path, "a") as journal:
+            journal.write('{"op": "update", "addr')
+
+        storage = Storage(filepath=str(self.temp_file))
+        storage.load()
+
+        assert storage.tokens == [{"name": "TokenA", "address": "abc123"}]
+
+    def test_storage_compaction(self, monkeypatch):
+        """Test the journal is folded into the snapshot when it is too long."""
+        monkeypatch.setattr(Storage, "COMPACT_EVERY", 3)
+        for i in range(3):
+            self.storage.add({"name": f"Token{i}", "address": f"address_{i}"})
+
+        assert not os.path.exists(self.storage.journal_path)
+        assert len(json.loads(self.temp_file.read_text())) == 3
+
+    @pytest.mark.asyncio
+    async def test_writer_coalesces_changes(self, monkeypatch):
+        """Test changes made within the delay are written together, off the event loop."""
+        threads = []
+        write = self.storage.write
+
+        def record_thread(*args):
+            threads.append(threading.current_thread())
+            write(*args)
+
+        monkeypatch.setattr(self.storage, "write", record_thread)
+        writer = StorageWriter(self.storage, delay=0.02)
+        writer.start()
+
+        self.storage.add({"name": "TokenA", "address": "abc123", "status": "active"})
+        self.storage.update("abc123", {"status": "inactive"})
+        assert writer.pending_writes == 2
+        assert not os.path.exists(self.storage.journal_path)
+
+        await asyncio.sleep(0.1)
+
+        assert writer.flushes == 1
+        assert writer.pending_writes == 0
+        assert writer.last_flush_latency > 0
+        assert threads[0] is not threading.main_thread()
+        assert len(open(self.storage.journal_path).readlines()) == 2
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_writer_flushes_on_stop(self):
+        """Test stopping the writer writes the pending changes."""
+        writer = StorageWriter(self.storage, delay=60)
+        writer.start()
+        self.storage.add({"name": "TokenA", "address": "abc123"})
+
+        await writer.stop()
+
+        assert writer.pending_writes == 0
+        assert self.storage.on_change is None
+        storage = Storage(filepath=str(self.temp_file))
+        storage.load()
+        assert storage.tokens == [{"name": "TokenA", "address": "abc123"}]
+
+    @pytest.mark.asyncio
+    async def test_writer_compaction(self, monkeypatch):
+        """Test the writer replaces the snapshot when the journal is due for compaction."""
+        monkeypatch.setattr(Storage, "COMPACT_EVERY", 2)
+        writer = StorageWriter(self.storage, delay=0)
+        writer.start()
+        self.storage.add({"name": "TokenA", "address": "abc123"})
+        self.storage.add({"name": "TokenB", "address": "xyz456"})
+        await writer.stop()
+
+        assert not os.path.exists(self.storage.journal_path)
+        assert json.loads(self.temp_file.read_text()) == self.storage.tokens
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock
+
+from src.subscriptions import SubscriptionManager
+
+
+def frames(ws):
+    """Frames sent on a mocked websocket."""
+    return [json.loads(call.args[0]) for call in ws.send.call_args_list]
+
+
+class TestSubscriptionManager:
+
+    @pytest.mark.asyncio
+    async def test_changes_coalesced(self):
+        """Test changes made within the delay are sent in one frame per method."""
+        ws = AsyncMock()
+        manager = SubscriptionManager(delay=0.01)
+        manager.attach(ws)
+        manager.subscribe("mint_1")
+        manager.subscribe("mint_2")
+        manager.subscribe("mint_3")
+        await asyncio.sleep(0.03)
+
+        manager.unsubscribe("mint_1")
+        manager.unsubscribe("mint_2")
+        manager.subscribe("mint_4")
+        # Subscribed then unsubscribed within the window, never sent
+        manager.subscribe("mint_5")
+        manager.unsubscribe("mint_5")
+        await asyncio.sleep(0.03)
+
+        assert frames(ws) == [
+            {"method": "subscribeTokenTrade", "keys": ["mint_1", "mint_2", "mint_3"]},
+            {"method": "subscribeTokenTrade", "keys": ["mint_4"]},
+            {"method": "unsubscribeTokenTrade", "keys": ["mint_1", "mint_2"]},
+        ]
+        assert manager.acknowledged == {"mint_3", "mint_4"}
+        assert not manager.pending
+
+    @pytest.mark.asyncio
+    async def test_reapplied_after_reconnect(self):
+        """Test a new connection is subscribed to the whole set in one frame."""
+        ws = AsyncMock()
+        manager = SubscriptionManager(delay=0.01)
+        manager.attach(ws)
+        for index in range(3):
+            manager.subscribe(f"mint_{index}")
+        await manager.flush()
+
+        await manager.detach()
+        assert frames(ws)[-1] == {
+            "method": "unsubscribeTokenTrade",
+            "keys": ["mint_0", "mint_1", "mint_2"],
+        }
+
+        reconnected = AsyncMock()
+        manager.attach(reconnected)
+        await asyncio.sleep(0.03)
+        assert frames(reconnected) == [
+            {"method": "subscribeTokenTrade", "keys": ["mint_0", "mint_1", "mint_2"]}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_dropped_connection(self):
+        """Test nothing is sent on a lost connection, the next one gets the whole set."""
+        ws = AsyncMock()
+        manager = SubscriptionManager(delay=0.01)
+        manager.attach(ws)
+        manager.subscribe("mint_1")
+        await manager.flush()
+
+        manager.drop()
+        manager.subscribe("mint_2")
+        await asyncio.sleep(0.03)
+        assert ws.send.call_count == 1
+
+        reconnected = AsyncMock()
+        manager.attach(reconnected)
+        await manager.flush()
+        assert frames(reconnected) == [
+            {"method": "subscribeTokenTrade", "keys": ["mint_1", "mint_2"]}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_send_retried(self):
+        """Test keys whose frame couldn't be sent are sent again by the next flush."""
+        ws = AsyncMock()
+        ws.send.side_effect = [ConnectionError("closed"), None]
+        manager = SubscriptionManager()
+        manager.attach(ws)
+        manager.subscribe("mint_1")
+
+        await manager.flush()
+        assert manager.pending
+
+        await manager.flush()
+        assert not manager.pending
+        assert manager.frames == 1
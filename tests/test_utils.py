@@ -36,3 +36,15 @@ class TestUtils:
         """Test calculate discriminator"""
         result = Utils.calculate_discriminator(instruction_name)
         assert result == expected
+
+    def test_backoff_delay(self):
+        """Test the backoff starts near zero, doubles and is capped."""
+        for attempt, bound in [(0, 0.1), (1, 0.2), (3, 0.8), (10, 5)]:
+            delays = [Utils.backoff_delay(attempt, 0.1, 5) for _ in range(100)]
+            assert all(0 <= delay <= bound for delay in delays)
+            # Jittered
+            assert len(set(delays)) > 1
+
+    def test_backoff_delay_long_outage(self):
+        """Test the delay stays capped after thousands of attempts."""
+        assert 0 <= Utils.backoff_delay(5000, 0.1, 5) <= 5
@@ -0,0 +1,128 @@
+import asyncio
+import base64
+import struct
+import pytest
+
+from solana.rpc.async_api import AsyncClient
+from solders.keypair import Keypair
+from spl.token.instructions import get_associated_token_address
+
+from src.constants import PUMP_PROGRAM, SYSTEM_TOKEN_PROGRAM
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.transactions.balance_cache import BalanceCache
+from src.transactions.instruction_templates import INSTRUCTION_DATA
+from src.transactions.rpc_transaction import RpcTransaction
+from tests.conftest import rpc_context, sent_transactions, token_accounts, until
+
+
+def token_account(mint, owner, amount):
+    """accountNotification result of an SPL token account holding amount tokens."""
+    data = bytes(mint) + bytes(owner) + struct.pack("<Q", int(amount * 10**6)) + bytes(93)
+    return rpc_context(
+        {
+            "data": [base64.b64encode(data).decode(), "base64"],
+            "executable": False,
+            "lamports": 2039280,
+            "owner": str(SYSTEM_TOKEN_PROGRAM),
+            "rentEpoch": 0,
+            "space": len(data),
+        }
+    )
+
+
+@pytest.fixture
+def owner():
+    return Keypair()
+
+
+@pytest.fixture
+def cache(stub_rpc_websocket, stub_rpc_server, owner):
+    return BalanceCache(
+        stub_rpc_websocket.url,
+        AsyncClient(stub_rpc_server.url),
+        owner.pubkey(),
+        reconnect_delay=0.01,
+    )
+
+
+class TestBalanceCache:
+
+    @pytest.mark.asyncio
+    async def test_account_notifications(self, cache, stub_rpc_websocket, owner, test_pubkey):
+        """Test the balance follows the notifications of the associated token account."""
+        ata = str(get_associated_token_address(owner.pubkey(), test_pubkey))
+        changes = []
+        cache.listeners.append(lambda token_address, balance: changes.append(balance))
+        cache.start()
+        cache.track(test_pubkey)
+        await until(lambda: ata in stub_rpc_websocket.subscriptions)
+        assert stub_rpc_websocket.called("accountSubscribe") == [
+            [ata, {"encoding": "base64", "commitment": "processed"}]
+        ]
+
+        await stub_rpc_websocket.notify(
+            "accountNotification", ata, token_account(test_pubkey, owner.pubkey(), 1234.5)
+        )
+        await until(lambda: cache.cached(str(test_pubkey)) == 1234.5)
+
+        # Closed by the sell
+        await stub_rpc_websocket.notify("accountNotification", ata, rpc_context(None))
+        await until(lambda: cache.cached(str(test_pubkey)) == 0)
+        assert changes == [1234.5, 0]
+        assert cache.notifications == 2
+        await cache.stop()
+
+    @pytest.mark.asyncio
+    async def test_rpc_fallback_on_miss(self, cache, stub_rpc_server, test_pubkey):
+        """Test the RPC is only read when the balance is not cached."""
+        stub_rpc_server.results["getTokenAccountsByOwner"] = token_accounts(test_pubkey, 42.0)
+
+        assert await cache.get(test_pubkey) == 42.0
+        assert await cache.get(test_pubkey) == 42.0
+        assert len(stub_rpc_server.called("getTokenAccountsByOwner")) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_resubscribed_and_untracked(self, cache, stub_rpc_websocket, test_pubkey):
+        """Test accounts are subscribed again after a reconnect, and unsubscribed when untracked."""
+        cache.track(test_pubkey)
+        cache.start()
+        await until(lambda: len(stub_rpc_websocket.called("accountSubscribe")) == 1)
+
+        await stub_rpc_websocket.disconnect()
+        await until(lambda: len(stub_rpc_websocket.called("accountSubscribe")) == 2)
+
+        await asyncio.sleep(0.01)
+        cache.untrack(str(test_pubkey))
+        await until(lambda: stub_rpc_websocket.called("accountUnsubscribe"))
+        assert len(cache) == 0
+        await cache.stop()
+
+    @pytest.mark.asyncio
+    async def test_updated_from_fills(self, rpc_server, cache, owner, test_pubkey):
+        """Test confirmed buys and sells set the balance, sells don't read it from the RPC."""
+        position = Transaction(
+            token=Token(mint=test_pubkey, name="Test Token"),
+            txType="create",
+            vSolInBondingCurve=30.0,
+            vTokensInBondingCurve=1_073_000_000.0,
+        )
+        rpc = RpcTransaction(
+            AsyncClient(rpc_server.url), position, owner, balance_cache=cache
+        )
+
+        assert await rpc.send_buy_transaction(0.01)
+        # UI amount of the tokens the buy instruction asks for
+        message = sent_transactions(rpc_server)[0].message
+        buy = next(
+            ix for ix in message.instructions
+            if message.account_keys[ix.program_id_index] == PUMP_PROGRAM
+        )
+        _, amount, _ = INSTRUCTION_DATA.unpack(bytes(buy.data))
+        assert cache.cached(str(test_pubkey)) == amount / 10**6
+        assert cache.cached(str(test_pubkey)) == position.sol_for_tokens(0.01)
+
+        assert await rpc.send_sell_transaction()
+        assert rpc_server.called("getTokenAccountsByOwner") == []
+        assert cache.cached(str(test_pubkey)) == 0
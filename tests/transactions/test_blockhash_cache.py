@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+
+from solana.rpc.async_api import AsyncClient
+from solders.hash import Hash
+
+from src.transactions.blockhash_cache import BlockhashCache
+from tests.conftest import latest_blockhash
+
+
+class TestBlockhashCache:
+
+    @pytest.mark.asyncio
+    async def test_background_refresh(self, stub_rpc_server):
+        """Test the blockhash is refreshed in the background and read synchronously."""
+        first, second = Hash.new_unique(), Hash.new_unique()
+        stub_rpc_server.results["getLatestBlockhash"] = latest_blockhash(first, 100)
+        cache = BlockhashCache(AsyncClient(stub_rpc_server.url), refresh_interval=0.05)
+        assert cache.get() is None
+
+        cache.start()
+        await asyncio.sleep(0.03)
+        assert cache.get() == (first, 100)
+
+        stub_rpc_server.results["getLatestBlockhash"] = latest_blockhash(second, 200)
+        await asyncio.sleep(0.1)
+        assert cache.get() == (second, 200)
+        await cache.stop()
+
+    @pytest.mark.asyncio
+    async def test_stale_blockhash(self, stub_rpc_server):
+        """Test a blockhash older than max_age is not returned."""
+        cache = BlockhashCache(AsyncClient(stub_rpc_server.url), max_age=0.01)
+        await cache.refresh()
+        assert cache.get() is not None
+
+        await asyncio.sleep(0.02)
+        assert cache.get() is None
+
+    @pytest.mark.asyncio
+    async def test_latest(self, stub_rpc_server):
+        """Test latest() only calls the RPC when the cache is empty or stale."""
+        cache = BlockhashCache(AsyncClient(stub_rpc_server.url))
+
+        assert await cache.latest() == (Hash.default(), 1000)
+        assert await cache.latest() == (Hash.default(), 1000)
+        assert len(stub_rpc_server.called("getLatestBlockhash")) == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_failure(self):
+        """Test the refresh task survives RPC errors."""
+        cache = BlockhashCache(AsyncClient("http://127.0.0.1:1"), refresh_interval=0.01)
+        cache.start()
+        await asyncio.sleep(0.05)
+        assert cache.get() is None
+        await cache.stop()
@@ -0,0 +1,156 @@
+import asyncio
+import base64
+import pytest
+
+from solana.rpc.async_api import AsyncClient
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM
+from solders.keypair import Keypair
+from solders.transaction import Transaction as SolTransaction
+
+from src.constants import UNIT_BUDGET
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.transactions.blockhash_cache import BlockhashCache
+from src.transactions.compute_units import ComputeUnitEstimator, MAX_UNITS
+from src.transactions.rpc_transaction import RpcTransaction
+from tests.conftest import rpc_context, until
+
+
+def simulation(units, err=None):
+    """simulateTransaction result consuming `units` compute units."""
+    return rpc_context(
+        {"err": err, "logs": [], "accounts": None, "unitsConsumed": units, "returnData": None}
+    )
+
+
+def unit_limit(transaction):
+    """Compute unit limit requested by a transaction."""
+    message = transaction.message
+    for ix in message.instructions:
+        if message.account_keys[ix.program_id_index] == COMPUTE_BUDGET_PROGRAM and ix.data[0] == 2:
+            return int.from_bytes(ix.data[1:5], "little")
+
+
+def simulated_transactions(server):
+    """Transactions simulated by the stub RPC server."""
+    return [
+        SolTransaction.from_bytes(base64.b64decode(params[0]))
+        for params in server.called("simulateTransaction")
+    ]
+
+
+@pytest.fixture
+def rpc_server(rpc_server):
+    """Stub RPC server accepting every transaction, simulations consume 62k units."""
+    rpc_server.results["simulateTransaction"] = simulation(62_000)
+    return rpc_server
+
+
+@pytest.fixture
+def buy_transaction(test_pubkey):
+    return Transaction(
+        token=Token(mint=test_pubkey, name="Test Token"),
+        txType="create",
+        vSolInBondingCurve=30.0,
+        vTokensInBondingCurve=1_073_000_000.0,
+    )
+
+
+def estimator(server, **kwargs):
+    client = AsyncClient(server.url)
+    return ComputeUnitEstimator(client, BlockhashCache(client), **kwargs)
+
+
+class TestComputeUnitEstimator:
+
+    @pytest.mark.asyncio
+    async def test_limit_after_simulation(self, rpc_server, buy_transaction):
+        """Test a shape requests default_units until simulated, then the measure plus margin."""
+        compute_units = estimator(rpc_server, margin=0.1)
+        account = Keypair()
+        rpc = RpcTransaction(
+            compute_units.client, buy_transaction, account, compute_units=compute_units
+        )
+        transaction = rpc.build_sell_transaction(1_000_000, (await rpc.blockhash_cache.latest())[0])
+        instructions = [
+            ix
+            for ix in transaction.message.instructions
+            if transaction.message.account_keys[ix.program_id_index] != COMPUTE_BUDGET_PROGRAM
+        ]
+        assert unit_limit(transaction) == UNIT_BUDGET
+
+        await until(lambda: compute_units.units)
+        assert compute_units.simulations == 1
+        assert list(compute_units.units.values()) == [62_000]
+        blockhash = (await rpc.blockhash_cache.latest())[0]
+        assert unit_limit(rpc.build_sell_transaction(2_000_000, blockhash)) == 68_200
+        # Simulated once with the largest limit, without signature
+        simulated = simulated_transactions(rpc_server)
+        assert len(simulated) == 1
+        assert unit_limit(simulated[0]) == MAX_UNITS
+        assert len(simulated[0].message.instructions) == len(instructions) + 1
+        assert compute_units.simulations == 1
+
+    @pytest.mark.asyncio
+    async def test_shapes(self, rpc_server, buy_transaction):
+        """Test buys with and without ATA creation and sells are measured separately."""
+        compute_units = estimator(rpc_server)
+        account = Keypair()
+        known_atas = set()
+        rpc = RpcTransaction(
+            compute_units.client,
+            buy_transaction,
+            account,
+            known_atas=known_atas,
+            compute_units=compute_units,
+        )
+
+        # Creates the ATA, then the ATA is known
+        assert await rpc.send_buy_transaction(0.01)
+        assert await rpc.send_buy_transaction(0.01)
+        rpc.build_sell_transaction(1_000_000, (await rpc.blockhash_cache.latest())[0])
+        await until(lambda: len(compute_units.units) == 3)
+
+        assert compute_units.simulations == 3
+        assert len(compute_units.units) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_simulation(self, rpc_server, buy_transaction):
+        """Test a failed simulation is not cached and keeps default_units."""
+        rpc_server.results["simulateTransaction"] = simulation(
+            1_200, err={"InstructionError": [2, {"Custom": 6002}]}
+        )
+        compute_units = estimator(rpc_server)
+        rpc = RpcTransaction(
+            compute_units.client, buy_transaction, Keypair(), compute_units=compute_units
+        )
+        blockhash = (await rpc.blockhash_cache.latest())[0]
+
+        rpc.build_sell_transaction(1_000_000, blockhash)
+        await until(lambda: compute_units.errors == 1)
+        assert compute_units.units == {}
+        assert unit_limit(rpc.build_sell_transaction(1_000_000, blockhash)) == UNIT_BUDGET
+        # Not simulated again before revalidate_interval
+        await asyncio.sleep(0.05)
+        assert compute_units.simulations == 1
+
+    @pytest.mark.asyncio
+    async def test_revalidate(self, rpc_server, buy_transaction):
+        """Test a shape is simulated again once revalidate_interval elapsed."""
+        compute_units = estimator(rpc_server, margin=0, revalidate_interval=0.05)
+        rpc = RpcTransaction(
+            compute_units.client, buy_transaction, Keypair(), compute_units=compute_units
+        )
+        blockhash = (await rpc.blockhash_cache.latest())[0]
+
+        rpc.build_sell_transaction(1_000_000, blockhash)
+        await until(lambda: compute_units.units)
+        rpc_server.results["simulateTransaction"] = simulation(80_000)
+        assert unit_limit(rpc.build_sell_transaction(1_000_000, blockhash)) == 62_000
+
+        await asyncio.sleep(0.05)
+        rpc.build_sell_transaction(1_000_000, blockhash)
+        await until(lambda: list(compute_units.units.values()) == [80_000])
+        assert compute_units.simulations == 2
+        assert unit_limit(rpc.build_sell_transaction(1_000_000, blockhash)) == 80_000
+        await compute_units.stop()
@@ -0,0 +1,136 @@
+import asyncio
+import pytest
+
+from solana.rpc.async_api import AsyncClient
+from solders.signature import Signature
+
+from src.transactions.confirmation_manager import ConfirmationManager
+from tests.conftest import confirmed_statuses, rpc_context
+
+
+def notification(err=None):
+    """signatureNotification result."""
+    return rpc_context({"err": err})
+
+
+async def subscribed(server, count=1):
+    """Wait until the stub websocket got count signature subscriptions."""
+    while len(server.called("signatureSubscribe")) < count:
+        await asyncio.sleep(0.005)
+
+
+@pytest.fixture
+def manager(stub_rpc_websocket, stub_rpc_server):
+    return ConfirmationManager(
+        stub_rpc_websocket.url,
+        AsyncClient(stub_rpc_server.url),
+        expiry_interval=0.02,
+        reconnect_delay=0.01,
+    )
+
+
+class TestConfirmationManager:
+
+    @pytest.mark.asyncio
+    async def test_confirmed(self, manager, stub_rpc_websocket):
+        """Test a signature notification resolves the future and calls the callback."""
+        signature = str(Signature.new_unique())
+        results = []
+        manager.start()
+        future = manager.watch(signature, 1000, results.append)
+        await subscribed(stub_rpc_websocket)
+        assert stub_rpc_websocket.called("signatureSubscribe") == [
+            [signature, {"commitment": "confirmed"}]
+        ]
+
+        await stub_rpc_websocket.notify("signatureNotification", signature, notification())
+        assert await asyncio.wait_for(future, 1) is True
+        assert results == [True]
+        assert manager.confirmed == 1
+        assert len(manager) == 0
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed(self, manager, stub_rpc_websocket):
+        """Test a transaction landed with an error resolves with False."""
+        signature = str(Signature.new_unique())
+        manager.start()
+        future = manager.watch(signature, 1000)
+        await subscribed(stub_rpc_websocket)
+
+        await stub_rpc_websocket.notify(
+            "signatureNotification", signature, notification({"InstructionError": [2, "Custom"]})
+        )
+        assert await asyncio.wait_for(future, 1) is False
+        assert manager.failed == 1
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_signatures(self, manager, stub_rpc_websocket):
+        """Test many signatures are tracked at once and resolved independently."""
+        signatures = [str(Signature.new_unique()) for _ in range(20)]
+        manager.start()
+        futures = [manager.watch(signature, 1000) for signature in signatures]
+        await subscribed(stub_rpc_websocket, len(signatures))
+
+        for signature in reversed(signatures[10:]):
+            await stub_rpc_websocket.notify("signatureNotification", signature, notification())
+        await asyncio.wait_for(asyncio.gather(*futures[10:]), 1)
+        assert not any(future.done() for future in futures[:10])
+        assert manager.max_pending == 20
+        assert len(manager) == 10
+        await manager.stop()
+        # Still unknown, not failed
+        assert all(future.cancelled() for future in futures[:10])
+        assert manager.failed == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_is_not_a_failure(self, manager, stub_rpc_websocket):
+        """Test signatures pending at shutdown are cancelled, their callbacks aren't called."""
+        results = []
+        manager.start()
+        future = manager.watch(str(Signature.new_unique()), 1000, results.append)
+        await subscribed(stub_rpc_websocket)
+
+        await manager.stop()
+        assert future.cancelled()
+        assert results == []
+        assert len(manager) == 0
+
+    @pytest.mark.asyncio
+    async def test_resubscribe_after_reconnect(self, manager, stub_rpc_websocket):
+        """Test pending signatures are subscribed again once reconnected."""
+        signature = str(Signature.new_unique())
+        manager.start()
+        future = manager.watch(signature, 1000)
+        await subscribed(stub_rpc_websocket)
+
+        await stub_rpc_websocket.disconnect()
+        await subscribed(stub_rpc_websocket, 2)
+        await stub_rpc_websocket.notify("signatureNotification", signature, notification())
+        assert await asyncio.wait_for(future, 1) is True
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_expired(self, manager, stub_rpc_server):
+        """Test a signature past its last valid block height resolves with False."""
+        stub_rpc_server.results["getSignatureStatuses"] = rpc_context([None])
+        manager.start()
+        future = manager.watch(Signature.new_unique(), 899)
+        still_valid = manager.watch(Signature.new_unique(), 900)
+
+        assert await asyncio.wait_for(future, 1) is False
+        assert not still_valid.done()
+        assert manager.expired == 1
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_missed_notification(self, manager, stub_rpc_server):
+        """Test the status of a signature about to expire is checked one last time."""
+        stub_rpc_server.results["getSignatureStatuses"] = confirmed_statuses
+        manager.start()
+        future = manager.watch(Signature.new_unique(), 899)
+
+        assert await asyncio.wait_for(future, 1) is True
+        assert manager.expired == 0
+        await manager.stop()
@@ -0,0 +1,112 @@
+import asyncio
+import time
+import pytest
+
+from solana.rpc.types import TxOpts
+from solders.hash import Hash
+from solders.keypair import Keypair
+
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.transactions.fanout_client import FanoutClient
+from src.transactions.rpc_transaction import RpcTransaction
+from tests.conftest import SIGNATURE, confirmed_statuses
+
+PAYLOAD = bytes(range(64))
+OPTS = TxOpts(skip_preflight=True)
+
+
+@pytest.fixture
+def servers(stub_rpc_servers):
+    for server in stub_rpc_servers:
+        server.results["sendTransaction"] = SIGNATURE
+    return stub_rpc_servers
+
+
+class TestFanoutClient:
+
+    @pytest.mark.asyncio
+    async def test_send_to_every_endpoint(self, servers):
+        """Test a transaction is sent to every endpoint, the fastest answer is returned."""
+        servers[0].delay = servers[1].delay = 0.3
+        client = FanoutClient([server.url for server in servers])
+
+        start = time.perf_counter()
+        response = await client.send_raw_transaction(PAYLOAD, opts=OPTS)
+        assert time.perf_counter() - start < 0.25
+        assert str(response.value) == SIGNATURE
+
+        await client.close()
+        assert [len(server.called("sendTransaction")) for server in servers] == [1, 1, 1]
+        assert [endpoint.requests for endpoint in client.endpoints] == [1, 1, 1]
+
+    @pytest.mark.asyncio
+    async def test_send_endpoint_failure(self, servers):
+        """Test a transaction is sent as long as one endpoint accepts it."""
+        servers[0].drop.add("sendTransaction")
+        servers[1].drop.add("sendTransaction")
+        client = FanoutClient([server.url for server in servers])
+
+        response = await client.send_raw_transaction(PAYLOAD, opts=OPTS)
+        assert str(response.value) == SIGNATURE
+        await client.close()
+        assert [endpoint.success_rate for endpoint in client.endpoints] == [0.0, 0.0, 1.0]
+
+    @pytest.mark.asyncio
+    async def test_send_failure(self, servers):
+        """Test an error is raised when every endpoint fails."""
+        for server in servers:
+            server.drop.add("sendTransaction")
+        client = FanoutClient([server.url for server in servers])
+
+        with pytest.raises(Exception):
+            await client.send_raw_transaction(PAYLOAD, opts=OPTS)
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_reads_use_fastest_endpoint(self, servers):
+        """Test reads go to the endpoint with the lowest latency only."""
+        servers[0].delay = servers[2].delay = 0.05
+        client = FanoutClient([server.url for server in servers])
+        await client.send_raw_transaction(PAYLOAD, opts=OPTS)
+        # Slower endpoints answer in the background
+        await asyncio.sleep(0.15)
+
+        assert client.ranked()[0].url == servers[1].url
+        assert (await client.get_latest_blockhash()).value.blockhash == Hash.default()
+        assert [len(server.called("getLatestBlockhash")) for server in servers] == [0, 1, 0]
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_reads_fall_back(self, servers):
+        """Test a failing endpoint is skipped, then ranked last once unhealthy."""
+        client = FanoutClient([server.url for server in servers], max_errors=2)
+        servers[0].drop.add("getBlockHeight")
+
+        for _ in range(2):
+            assert (await client.get_block_height()).value == 900
+        assert len(servers[0].called("getBlockHeight")) == 2
+        assert not client.is_healthy(client.endpoints[0])
+
+        await client.get_block_height()
+        assert len(servers[0].called("getBlockHeight")) == 2
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_rpc_transaction(self, servers, test_pubkey):
+        """Test buys are sent to every endpoint through the RpcTransaction interface."""
+        for server in servers:
+            server.results["getHealth"] = "ok"
+            server.results["getSignatureStatuses"] = confirmed_statuses
+        transaction = Transaction(
+            token=Token(mint=test_pubkey, name="Test Token"),
+            txType="create",
+            vSolInBondingCurve=30.0,
+            vTokensInBondingCurve=1_073_000_000.0,
+        )
+        client = FanoutClient([server.url for server in servers])
+
+        assert await RpcTransaction(client, transaction, Keypair()).send_buy_transaction(0.01)
+        await client.close()
+        assert [len(server.called("sendTransaction")) for server in servers] == [1, 1, 1]
+        assert sum(len(server.called("getLatestBlockhash")) for server in servers) == 1
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+
+from solders.keypair import Keypair
+
+from src.constants import PUMP_FEE, UNIT_BUDGET, UNIT_PRICE
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.transactions.fee_oracle import FeeOracle, BUY, SELL, STOP_LOSS
+from src.transactions.rpc_client import RpcClient
+from src.transactions.rpc_transaction import RpcTransaction
+from tests.conftest import sent_transactions, unit_price
+
+
+def prioritization_fees(fees):
+    """getRecentPrioritizationFees result, one slot per fee."""
+    return [{"slot": slot, "prioritizationFee": fee} for slot, fee in enumerate(fees)]
+
+
+class TestFeeOracle:
+
+    @pytest.mark.asyncio
+    async def test_percentiles(self, stub_rpc_server):
+        """Test every tier reads its own percentile of the samples."""
+        stub_rpc_server.results["getRecentPrioritizationFees"] = prioritization_fees(
+            [10_000 * i for i in range(10, 0, -1)]
+        )
+        oracle = FeeOracle(RpcClient(stub_rpc_server.url))
+
+        await oracle.refresh()
+        assert oracle.samples == [10_000 * i for i in range(1, 11)]
+        assert oracle.price(BUY) == 80_000
+        assert oracle.price(SELL) == 50_000
+        assert oracle.price(STOP_LOSS) == 90_000
+        assert stub_rpc_server.called("getRecentPrioritizationFees") == [[[str(PUMP_FEE)]]]
+
+    @pytest.mark.asyncio
+    async def test_clamp(self, stub_rpc_server):
+        """Test prices are kept within [min_price, max_price]."""
+        stub_rpc_server.results["getRecentPrioritizationFees"] = prioritization_fees(
+            [0, 0, 0, 1_000_000]
+        )
+        oracle = FeeOracle(
+            RpcClient(stub_rpc_server.url),
+            percentiles={SELL: 50, STOP_LOSS: 100},
+            max_price=200_000,
+        )
+
+        await oracle.refresh()
+        assert oracle.price(SELL) == UNIT_PRICE
+        assert oracle.price(STOP_LOSS) == 200_000
+
+    @pytest.mark.asyncio
+    async def test_default_price(self, stub_rpc_server):
+        """Test min_price is used until samples are fetched, and kept on errors."""
+        stub_rpc_server.results["getRecentPrioritizationFees"] = []
+        oracle = FeeOracle(RpcClient(stub_rpc_server.url), refresh_interval=0.01)
+
+        oracle.start()
+        await asyncio.sleep(0.05)
+        assert oracle.price(BUY) == UNIT_PRICE
+        assert oracle.priority_fee(BUY) == UNIT_PRICE * UNIT_BUDGET / 1e6 / 1e9
+
+        stub_rpc_server.drop.add("getRecentPrioritizationFees")
+        await asyncio.sleep(0.05)
+        await oracle.stop()
+        assert oracle.price(BUY) == UNIT_PRICE
+
+    @pytest.mark.asyncio
+    async def test_rpc_transaction_unit_price(self, rpc_server, test_pubkey):
+        """Test RPC buys and sells pay the unit price of their tier."""
+        rpc_server.results["getRecentPrioritizationFees"] = prioritization_fees(
+            [10_000 * i for i in range(1, 5)]
+        )
+        buy_transaction = Transaction(
+            token=Token(mint=test_pubkey, name="Test Token"),
+            txType="create",
+            vSolInBondingCurve=30.0,
+            vTokensInBondingCurve=1_073_000_000.0,
+        )
+        client = RpcClient(rpc_server.url)
+        oracle = FeeOracle(client)
+        await oracle.refresh()
+        rpc = RpcTransaction(client, buy_transaction, Keypair(), fee_oracle=oracle)
+
+        assert await rpc.send_buy_transaction(0.01)
+        assert unit_price(sent_transactions(rpc_server)[0]) == oracle.price(BUY) == 30_000
+
+        blockhash = (await client.get_latest_blockhash()).value.blockhash
+        sell = rpc.build_sell_transaction(1_000_000, blockhash, STOP_LOSS)
+        assert unit_price(sell) == oracle.price(STOP_LOSS) == 40_000
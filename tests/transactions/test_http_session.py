@@ -0,0 +1,46 @@
+import pytest
+
+from src.transactions.http_session import HttpSession
+
+
+class TestHttpSession:
+
+    @pytest.mark.asyncio
+    async def test_warmup_opens_connections(self, stub_http_server):
+        """Test warm-up opens the pool connections before any trade."""
+        session = HttpSession(stub_http_server.url, max_connections=3)
+        await session.warmup()
+
+        assert len(stub_http_server.connections) == 3
+        await session.close()
+
+    @pytest.mark.asyncio
+    async def test_post_reuses_connection(self, stub_http_server):
+        """Test consecutive requests are sent over the same keep-alive connection."""
+        stub_http_server.response = {"signature": "test_signature"}
+        session = HttpSession(stub_http_server.url, max_connections=1)
+        await session.warmup()
+
+        for _ in range(3):
+            response = await session.post("/api/trade", {"action": "buy"})
+            assert response.json() == {"signature": "test_signature"}
+
+        assert len(stub_http_server.connections) == 1
+        assert len(stub_http_server.requests) == 3
+        await session.close()
+
+    @pytest.mark.asyncio
+    async def test_reopen_after_close(self, stub_http_server):
+        """Test the session opens a new pool when used after being closed."""
+        session = HttpSession(stub_http_server.url)
+        await session.close()
+        await session.post("/api/trade", {"action": "buy"})
+        await session.close()
+
+        assert len(stub_http_server.requests) == 1
+
+    def test_http2_without_h2(self, monkeypatch):
+        """Test HTTP/2 falls back to HTTP/1.1 when h2 is not installed."""
+        monkeypatch.setattr("importlib.util.find_spec", lambda name: None)
+        session = HttpSession("http://127.0.0.1", http2=True)
+        assert session.http2 is False
@@ -0,0 +1,83 @@
+import struct
+import pytest
+
+from solders.instruction import AccountMeta
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from src.constants import (
+    PUMP_GLOBAL,
+    PUMP_FEE,
+    PUMP_EVENT_AUTHORITY,
+    PUMP_PROGRAM,
+    SYSTEM_PROGRAM,
+    SYSTEM_TOKEN_PROGRAM,
+    SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM,
+    SYSTEM_RENT,
+)
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.transactions.instruction_templates import InstructionTemplates
+from src.utils import Utils
+
+
+@pytest.fixture
+def transaction(test_pubkey):
+    transaction = Transaction(token=Token(mint=test_pubkey))
+    transaction.set_associated_bonding_curve()
+    return transaction
+
+
+def trade_accounts(transaction, ata, user):
+    return [
+        AccountMeta(PUMP_GLOBAL, False, False),
+        AccountMeta(PUMP_FEE, False, True),
+        AccountMeta(transaction.token.mint, False, False),
+        AccountMeta(transaction.bondingCurveKey, False, True),
+        AccountMeta(transaction.associatedBondingCurveKey, False, True),
+        AccountMeta(ata, False, True),
+        AccountMeta(user, True, True),
+        AccountMeta(SYSTEM_PROGRAM, False, False),
+    ]
+
+
+class TestInstructionTemplates:
+
+    def test_buy(self, transaction):
+        """Test the buy instruction accounts and data."""
+        user, ata = Keypair().pubkey(), Pubkey.new_unique()
+        instruction = InstructionTemplates(user).buy(transaction, ata, 1_000, 2_000)
+
+        assert instruction.program_id == PUMP_PROGRAM
+        assert instruction.data == struct.pack(
+            "<QQQ", Utils.calculate_discriminator("global:buy"), 1_000, 2_000
+        )
+        assert instruction.accounts == trade_accounts(transaction, ata, user) + [
+            AccountMeta(SYSTEM_TOKEN_PROGRAM, False, False),
+            AccountMeta(SYSTEM_RENT, False, False),
+            AccountMeta(PUMP_EVENT_AUTHORITY, False, False),
+            AccountMeta(PUMP_PROGRAM, False, False),
+        ]
+
+    def test_sell(self, transaction):
+        """Test the sell instruction accounts and data."""
+        user, ata = Keypair().pubkey(), Pubkey.new_unique()
+        instruction = InstructionTemplates(user).sell(transaction, ata, 1_000, 500)
+
+        assert instruction.data == struct.pack(
+            "<QQQ", Utils.calculate_discriminator("global:sell"), 1_000, 500
+        )
+        assert instruction.accounts == trade_accounts(transaction, ata, user) + [
+            AccountMeta(SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM, False, False),
+            AccountMeta(SYSTEM_TOKEN_PROGRAM, False, False),
+            AccountMeta(PUMP_EVENT_AUTHORITY, False, False),
+            AccountMeta(PUMP_PROGRAM, False, False),
+        ]
+
+    def test_templates_not_modified(self, transaction, test_pubkey):
+        """Test building an instruction doesn't patch the template itself."""
+        templates = InstructionTemplates(Keypair().pubkey())
+        templates.buy(transaction, Pubkey.new_unique(), 1, 1)
+
+        assert templates.buy_accounts[2] is None
+        assert templates.sell_accounts[5] is None
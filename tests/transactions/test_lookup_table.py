@@ -0,0 +1,117 @@
+import base64
+import struct
+import pytest
+
+from solana.rpc.async_api import AsyncClient
+from solders.address_lookup_table_account import (
+    ID as ADDRESS_LOOKUP_TABLE_PROGRAM,
+    AddressLookupTableAccount,
+    derive_lookup_table_address,
+)
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+from src.constants import PUMP_GLOBAL, PUMP_FEE, PUMP_PROGRAM
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.transactions.lookup_table import (
+    PUMP_STATIC_ACCOUNTS,
+    create_lookup_table,
+    extend_lookup_table,
+    load_lookup_table,
+)
+from src.transactions.rpc_transaction import RpcTransaction
+from tests.conftest import SIGNATURE, rpc_context
+
+TABLE = Pubkey.new_unique()
+
+
+def lookup_table_account(addresses, authority=None):
+    """getAccountInfo result of a lookup table holding addresses."""
+    data = struct.pack("<IQQB", 1, 2**64 - 1, 0, 0)
+    data += b"\x01" + bytes(authority) if authority else b"\x00" + bytes(32)
+    data += bytes(2) + b"".join(bytes(address) for address in addresses)
+    return rpc_context(
+        {
+            "data": [base64.b64encode(data).decode(), "base64"],
+            "executable": False,
+            "lamports": 1_000_000,
+            "owner": str(ADDRESS_LOOKUP_TABLE_PROGRAM),
+            "rentEpoch": 0,
+            "space": len(data),
+        }
+    )
+
+
+@pytest.fixture
+def position(test_pubkey):
+    return Transaction(
+        token=Token(mint=test_pubkey, name="Test Token"),
+        txType="buy",
+        vSolInBondingCurve=30.0,
+        vTokensInBondingCurve=1_073_000_000.0,
+    )
+
+
+class TestLookupTable:
+
+    @pytest.mark.asyncio
+    async def test_load(self, stub_rpc_server):
+        """Test a lookup table account is decoded."""
+        stub_rpc_server.results["getAccountInfo"] = lookup_table_account(
+            PUMP_STATIC_ACCOUNTS, Pubkey.new_unique()
+        )
+
+        table = await load_lookup_table(AsyncClient(stub_rpc_server.url), TABLE)
+        assert table.key == TABLE
+        assert table.addresses == PUMP_STATIC_ACCOUNTS
+
+    @pytest.mark.asyncio
+    async def test_load_missing(self, stub_rpc_server):
+        """Test loading a lookup table that doesn't exist fails."""
+        stub_rpc_server.results["getAccountInfo"] = rpc_context(None)
+
+        with pytest.raises(ValueError):
+            await load_lookup_table(AsyncClient(stub_rpc_server.url), TABLE)
+
+    def test_create_and_extend(self):
+        """Test the create and extend instructions of the lookup table program."""
+        authority = Pubkey.new_unique()
+        create, address = create_lookup_table(authority, authority, 1234)
+        expected, bump = derive_lookup_table_address(authority, 1234)
+
+        assert address == expected
+        assert create.program_id == ADDRESS_LOOKUP_TABLE_PROGRAM
+        assert create.data == struct.pack("<IQB", 0, 1234, bump)
+        assert create.accounts[0].pubkey == address
+
+        extend = extend_lookup_table(address, authority, authority, [PUMP_GLOBAL, PUMP_FEE])
+        assert extend.data == struct.pack("<IQ", 2, 2) + bytes(PUMP_GLOBAL) + bytes(PUMP_FEE)
+        assert [meta.is_signer for meta in extend.accounts] == [False, True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_v0_sell(self, stub_rpc_server, position):
+        """Test transactions are v0 messages loading the static accounts from the table."""
+        stub_rpc_server.results["sendTransaction"] = SIGNATURE
+        table = AddressLookupTableAccount(TABLE, PUMP_STATIC_ACCOUNTS)
+        account = Keypair()
+        client = AsyncClient(stub_rpc_server.url)
+
+        legacy = RpcTransaction(client, position, account).build_sell_transaction(
+            1_000_000, Hash.default()
+        )
+        v0 = RpcTransaction(
+            client, position, account, lookup_tables=[table]
+        ).build_sell_transaction(1_000_000, Hash.default())
+
+        assert isinstance(v0.message, MessageV0)
+        assert len(bytes(v0)) < len(bytes(legacy))
+        lookups = v0.message.address_table_lookups
+        assert [lookup.account_key for lookup in lookups] == [TABLE]
+        assert PUMP_GLOBAL not in v0.message.account_keys
+        # Invoked programs are never loaded from a table
+        assert PUMP_PROGRAM in v0.message.account_keys
+        assert VersionedTransaction.from_bytes(bytes(v0)).verify_with_results() == [True]
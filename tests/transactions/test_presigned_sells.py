@@ -0,0 +1,189 @@
+import asyncio
+import pytest
+
+from solana.rpc.async_api import AsyncClient
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.transactions.blockhash_cache import BlockhashCache
+from src.transactions.fee_oracle import FeeOracle, SELL, STOP_LOSS
+from src.transactions.presigned_sells import PresignedSells
+from src.transactions.rpc_transaction import RpcTransaction
+from tests.conftest import latest_blockhash, sent_transactions, token_accounts, unit_price
+
+
+@pytest.fixture
+def position(test_pubkey):
+    return Transaction(
+        token=Token(mint=test_pubkey, name="Test Token"),
+        txType="buy",
+        vSolInBondingCurve=30.0,
+        vTokensInBondingCurve=1_073_000_000.0,
+    )
+
+
+async def settle():
+    """Let the rebuild task run."""
+    await asyncio.sleep(0.05)
+
+
+class TestPresignedSells:
+
+    @pytest.mark.asyncio
+    async def test_sell_sends_presigned(self, rpc_server, position):
+        """Test a sell only sends the transaction signed in the background."""
+        client = AsyncClient(rpc_server.url)
+        account = Keypair()
+        cache = BlockhashCache(client)
+        sells = PresignedSells(client, account, cache)
+        await cache.refresh()
+        sells.start()
+        sells.track(position, balance=1000.0)
+        await settle()
+
+        assert sells.get(position.token.address).message.recent_blockhash == Hash.default()
+        assert sells.builds == 1
+
+        rpc = RpcTransaction(client, position, account, blockhash_cache=cache,
+                             presigned_sells=sells)
+        assert await rpc.send_sell_transaction(tier=STOP_LOSS)
+        assert rpc_server.called("getHealth") == []
+        assert len(rpc_server.called("getLatestBlockhash")) == 1
+        assert len(sent_transactions(rpc_server)) == 1
+        await sells.stop()
+
+    @pytest.mark.asyncio
+    async def test_other_tier_built_on_the_spot(self, rpc_server, position):
+        """Test a sell of another tier than the pre-signed one pays the fee of its own tier."""
+        client = AsyncClient(rpc_server.url)
+        account = Keypair()
+        cache = BlockhashCache(client)
+        oracle = FeeOracle(client)
+        oracle.prices = {SELL: 5_000, STOP_LOSS: 40_000}
+        sells = PresignedSells(client, account, cache, fee_oracle=oracle)
+        await cache.refresh()
+        sells.start()
+        sells.track(position, balance=1000.0)
+        await settle()
+        assert unit_price(sells.signed[position.token.address][1]) == 40_000
+
+        rpc = RpcTransaction(client, position, account, blockhash_cache=cache,
+                             fee_oracle=oracle, presigned_sells=sells)
+        rpc_server.results["getTokenAccountsByOwner"] = token_accounts(position.token.mint, 1000.0)
+        assert await rpc.send_sell_transaction(tier=SELL)
+        assert unit_price(sent_transactions(rpc_server)[0]) == 5_000
+        assert (sells.hits, sells.misses) == (0, 1)
+        await sells.stop()
+
+    @pytest.mark.asyncio
+    async def test_rebuilt_on_new_blockhash(self, rpc_server, position):
+        """Test the sell is signed again when the blockhash cache is refreshed."""
+        client = AsyncClient(rpc_server.url)
+        cache = BlockhashCache(client)
+        sells = PresignedSells(client, Keypair(), cache)
+        await cache.refresh()
+        sells.track(position, balance=1000.0)
+        sells.start()
+        await settle()
+
+        blockhash = Hash.new_unique()
+        rpc_server.results["getLatestBlockhash"] = latest_blockhash(blockhash, 2000)
+        await cache.refresh()
+        # Not rebuilt yet, the old signature is not handed out
+        assert sells.get(position.token.address) is None
+
+        await settle()
+        assert sells.get(position.token.address).message.recent_blockhash == blockhash
+        assert sells.builds == 2
+        await sells.stop()
+        assert cache.listeners == []
+
+    @pytest.mark.asyncio
+    async def test_rebuilt_on_balance_change(self, rpc_server, position):
+        """Test the sell is only signed again when the balance actually changes."""
+        client = AsyncClient(rpc_server.url)
+        cache = BlockhashCache(client)
+        sells = PresignedSells(client, Keypair(), cache)
+        await cache.refresh()
+        sells.start()
+        sells.track(position, balance=1000.0)
+        await settle()
+
+        sells.set_balance(position.token.address, 1000.0)
+        await settle()
+        assert sells.builds == 1
+
+        sells.set_balance(position.token.address, 500.0)
+        await settle()
+        assert sells.builds == 2
+        await sells.stop()
+
+    @pytest.mark.asyncio
+    async def test_dirty_not_handed_out(self, rpc_server, position):
+        """Test a sell waiting for its rebuild is a miss, the sell is built on the spot."""
+        client = AsyncClient(rpc_server.url)
+        account = Keypair()
+        cache = BlockhashCache(client)
+        sells = PresignedSells(client, account, cache)
+        await cache.refresh()
+        sells.start()
+        sells.track(position, balance=1000.0)
+        await settle()
+        assert sells.get(position.token.address) is not None
+
+        newer = Transaction(
+            token=position.token,
+            txType="sell",
+            vSolInBondingCurve=20.0,
+            vTokensInBondingCurve=1_500_000_000.0,
+        )
+        sells.update(newer)
+        # Signed with the previous reserves, not rebuilt yet
+        assert sells.get(position.token.address) is None
+        sells.set_balance(position.token.address, 500.0)
+        assert sells.get(position.token.address) is None
+
+        await settle()
+        assert sells.get(position.token.address) is not None
+        assert sells.builds == 2
+        await sells.stop()
+
+    @pytest.mark.asyncio
+    async def test_balance_fetched(self, rpc_server, position):
+        """Test the balance of a position is fetched when it is not known."""
+        rpc_server.results["getTokenAccountsByOwner"] = token_accounts(
+            position.token.mint, 1234.5
+        )
+        client = AsyncClient(rpc_server.url)
+        cache = BlockhashCache(client)
+        sells = PresignedSells(client, Keypair(), cache)
+        await cache.refresh()
+        sells.start()
+        sells.track(position)
+        await settle()
+
+        assert sells.balances == {position.token.address: 1234.5}
+        assert sells.get(position.token.address) is not None
+        await sells.stop()
+
+    @pytest.mark.asyncio
+    async def test_untracked_and_reloaded(self, rpc_server, position):
+        """Test untracked positions and positions without reserves have no sell signed."""
+        client = AsyncClient(rpc_server.url)
+        cache = BlockhashCache(client)
+        sells = PresignedSells(client, Keypair(), cache)
+        await cache.refresh()
+        sells.start()
+        reloaded = Transaction(token=Token(mint=Pubkey.new_unique(), name="Reloaded"))
+        sells.track(position, balance=1000.0)
+        sells.track(reloaded, balance=1000.0)
+        await settle()
+        assert sells.get(reloaded.token.address) is None
+
+        sells.untrack(position.token.address)
+        assert sells.get(position.token.address) is None
+        assert len(sells) == 1
+        await sells.stop()
@@ -2,9 +2,18 @@ import os
 import pytest
 import requests_mock
 from unittest.mock import MagicMock
+from src.bot import (
+    PRIORITY_FEE_MAX,
+    PUMPPORTAL_PRIORITY_FEE_MAX,
+    PUMPPORTAL_PRIORITY_FEE_MIN,
+)
+from src.constants import UNIT_BUDGET
+from src.transactions.fee_oracle import FeeOracle, BUY, STOP_LOSS
+from src.transactions.http_session import HttpSession
 from src.transactions.pumpportal_transaction import PumpPortalTransaction
 from src.models.transaction import Transaction
 from src.models.token import Token
+from src.transactions.rpc_client import RpcClient
 
 
 @pytest.fixture
@@ -113,3 +122,98 @@ class TestPumpPortalTransaction:
             invalid_pumpportal_transaction.send_sell_transaction(amount=100, slippage=3)
             is False
         )
+
+    @pytest.mark.asyncio
+    async def test_send_buy_transaction_async(self, mock_transaction, stub_http_server):
+        """Test buy transaction through the pooled HTTP session."""
+        session = HttpSession(stub_http_server.url)
+        transaction = PumpPortalTransaction(mock_transaction, session)
+        transaction.PUMPPORTAL_API_KEY = "test_api_key"
+
+        stub_http_server.response = {"signature": "test_signature"}
+        assert await transaction.send_buy_transaction_async(amount=1, slippage=3) is True
+
+        stub_http_server.response = {"errors": ["Buy failed"]}
+        assert await transaction.send_buy_transaction_async(amount=1, slippage=3) is False
+
+        request = stub_http_server.requests[0]
+        assert request["path"] == "/api/trade?api-key=test_api_key"
+        assert request["data"]["action"] == "buy"
+        assert request["data"]["mint"] == transaction.token_address
+        assert request["data"]["priorityFee"] == "0.0001"
+        await session.close()
+
+    @pytest.mark.asyncio
+    async def test_send_sell_transaction_async(self, mock_transaction, stub_http_server):
+        """Test sell transaction through the pooled HTTP session."""
+        session = HttpSession(stub_http_server.url)
+        transaction = PumpPortalTransaction(mock_transaction, session)
+        transaction.PUMPPORTAL_API_KEY = "test_api_key"
+
+        stub_http_server.response = {"signature": "test_signature"}
+        assert await transaction.send_sell_transaction_async(amount=50, slippage=3) is True
+
+        stub_http_server.response = {"errors": ["Sell failed"]}
+        assert await transaction.send_sell_transaction_async(amount=50, slippage=3) is False
+
+        assert stub_http_server.requests[0]["data"]["amount"] == "50%"
+
+        stub_http_server.response = {"signature": "test_signature"}
+        assert await transaction.send_sell_transaction_async(
+            amount=100, slippage=3, priority_fee=0.002
+        )
+        assert stub_http_server.requests[-1]["data"]["priorityFee"] == "0.002"
+        await session.close()
+
+    @pytest.mark.asyncio
+    async def test_oracle_priority_fee_sent(
+        self, mock_transaction, stub_http_server, stub_rpc_server
+    ):
+        """Test the priority fee sent to PumpPortal follows the samples, within its SOL bounds."""
+        session = HttpSession(stub_http_server.url)
+        transaction = PumpPortalTransaction(mock_transaction, session)
+        transaction.PUMPPORTAL_API_KEY = "test_api_key"
+        stub_http_server.response = {"signature": "test_signature"}
+        # Configured like the bot
+        oracle = FeeOracle(
+            RpcClient(stub_rpc_server.url),
+            max_price=PRIORITY_FEE_MAX,
+            min_fee=PUMPPORTAL_PRIORITY_FEE_MIN,
+            max_fee=PUMPPORTAL_PRIORITY_FEE_MAX,
+        )
+
+        # No samples yet: the floor, not UNIT_PRICE * UNIT_BUDGET
+        await transaction.send_buy_transaction_async(
+            amount=1, priority_fee=oracle.priority_fee(BUY)
+        )
+        assert stub_http_server.requests[-1]["data"]["priorityFee"] == "0.0001"
+
+        stub_rpc_server.results["getRecentPrioritizationFees"] = [
+            {"slot": slot, "prioritizationFee": fee}
+            for slot, fee in enumerate([1_000_000, 1_000_000, 1_000_000, 100_000_000])
+        ]
+        await oracle.refresh()
+        # RPC transactions are capped per CU, PumpPortal fees are not
+        assert oracle.price(BUY) == PRIORITY_FEE_MAX
+        await transaction.send_buy_transaction_async(
+            amount=1, priority_fee=oracle.priority_fee(BUY)
+        )
+        assert float(stub_http_server.requests[-1]["data"]["priorityFee"]) == pytest.approx(
+            1_000_000 * UNIT_BUDGET / 1e6 / 1e9
+        )
+        await transaction.send_sell_transaction_async(
+            amount=100, priority_fee=oracle.priority_fee(STOP_LOSS)
+        )
+        assert stub_http_server.requests[-1]["data"]["priorityFee"] == "0.005"
+        await session.close()
+
+    @pytest.mark.asyncio
+    async def test_send_transaction_async_unreachable(self, mock_transaction):
+        """Test failure when the trade API cannot be reached."""
+        session = HttpSession("http://127.0.0.1:1", timeout=1)
+        transaction = PumpPortalTransaction(mock_transaction, session)
+        transaction.PUMPPORTAL_API_KEY = "test_api_key"
+
+        assert await transaction.send_buy_transaction_async(amount=1, slippage=3) is False
+        assert await transaction.send_sell_transaction_async(amount=100, slippage=3) is False
+        await session.close()
@@ -0,0 +1,100 @@
+import asyncio
+import base64
+import pytest
+
+from solana.rpc.async_api import AsyncClient
+from solders.keypair import Keypair
+from solders.signature import Signature
+
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.transactions.rebroadcaster import Rebroadcaster
+from src.transactions.rpc_transaction import RpcTransaction
+from tests.conftest import SIGNATURE, confirmed_statuses, rpc_context, until
+
+PAYLOAD = bytes(range(64))
+
+
+def landed_after(server, sends):
+    """getSignatureStatuses result, the transaction lands once it was sent `sends` times."""
+
+    def statuses(params):
+        if len(server.called("sendTransaction")) < sends:
+            return rpc_context([None])
+        return confirmed_statuses(params)
+
+    return statuses
+
+
+class TestRebroadcaster:
+
+    @pytest.mark.asyncio
+    async def test_rebroadcast_until_done(self, stub_rpc_server):
+        """Test the same bytes are sent again on every interval until the future is done."""
+        stub_rpc_server.results["sendTransaction"] = SIGNATURE
+        rebroadcaster = Rebroadcaster(AsyncClient(stub_rpc_server.url), interval=0.01)
+        done = asyncio.get_running_loop().create_future()
+
+        rebroadcaster.rebroadcast(SIGNATURE, PAYLOAD, done)
+        # Already rebroadcast, ignored
+        rebroadcaster.rebroadcast(SIGNATURE, PAYLOAD, done)
+        await until(lambda: rebroadcaster.attempts >= 3)
+        done.set_result(True)
+        await until(lambda: not rebroadcaster.active)
+
+        sends = stub_rpc_server.called("sendTransaction")
+        assert len(sends) >= 3
+        assert len(sends) == rebroadcaster.attempts
+        assert {base64.b64decode(params[0]) for params in sends} == {PAYLOAD}
+        assert sends[0][1]["maxRetries"] == 0
+        assert rebroadcaster.active == {}
+        assert 0 < rebroadcaster.mean_latency <= rebroadcaster.max_latency
+
+    @pytest.mark.asyncio
+    async def test_send_errors(self, stub_rpc_server):
+        """Test failed attempts are counted and the rebroadcast goes on."""
+        stub_rpc_server.drop.add("sendTransaction")
+        rebroadcaster = Rebroadcaster(AsyncClient(stub_rpc_server.url), interval=0.01)
+        done = asyncio.get_running_loop().create_future()
+
+        rebroadcaster.rebroadcast(SIGNATURE, PAYLOAD, done)
+        await until(lambda: rebroadcaster.errors >= 2)
+        assert rebroadcaster.errors == rebroadcaster.attempts
+        await rebroadcaster.stop()
+        assert rebroadcaster.active == {}
+
+    @pytest.mark.asyncio
+    async def test_max_attempts(self, stub_rpc_server):
+        """Test a transaction is sent at most max_attempts times (first send included)."""
+        stub_rpc_server.results["sendTransaction"] = SIGNATURE
+        rebroadcaster = Rebroadcaster(
+            AsyncClient(stub_rpc_server.url), interval=0.01, max_attempts=3
+        )
+        done = asyncio.get_running_loop().create_future()
+
+        rebroadcaster.rebroadcast(Signature.new_unique(), PAYLOAD, done)
+        await until(lambda: not rebroadcaster.active)
+        assert rebroadcaster.attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_dropped_transaction_lands(self, stub_rpc_server, test_pubkey):
+        """Test a buy dropped twice by the RPC node lands thanks to the rebroadcasts."""
+        stub_rpc_server.results["getHealth"] = "ok"
+        stub_rpc_server.results["sendTransaction"] = SIGNATURE
+        stub_rpc_server.results["getSignatureStatuses"] = landed_after(stub_rpc_server, 3)
+        buy_transaction = Transaction(
+            token=Token(mint=test_pubkey, name="Test Token"),
+            txType="create",
+            vSolInBondingCurve=30.0,
+            vTokensInBondingCurve=1_073_000_000.0,
+        )
+        client = AsyncClient(stub_rpc_server.url)
+        rebroadcaster = Rebroadcaster(client, interval=0.05)
+        rpc = RpcTransaction(client, buy_transaction, Keypair(), rebroadcaster=rebroadcaster)
+
+        assert await rpc.send_buy_transaction(0.01) is True
+        sends = stub_rpc_server.called("sendTransaction")
+        assert len(sends) >= 3
+        assert len({params[0] for params in sends}) == 1
+
+        await until(lambda: not rebroadcaster.active)
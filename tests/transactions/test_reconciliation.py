@@ -0,0 +1,91 @@
+import base64
+import struct
+import pytest
+
+from solana.rpc.async_api import AsyncClient
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from spl.token.instructions import get_associated_token_address
+
+from src.constants import PUMP_PROGRAM, SYSTEM_TOKEN_PROGRAM
+from src.models.transaction import derive_bonding_curve_accounts
+from src.transactions.reconciliation import reconcile
+from tests.conftest import rpc_context
+
+
+def account(data, owner):
+    return {
+        "data": [base64.b64encode(data).decode(), "base64"],
+        "executable": False,
+        "lamports": 2039280,
+        "owner": str(owner),
+        "rentEpoch": 0,
+        "space": len(data),
+    }
+
+
+def token_account(mint, owner, amount):
+    """SPL token account holding amount token base units."""
+    data = bytes(mint) + bytes(owner) + struct.pack("<Q", amount) + bytes(93)
+    return account(data, SYSTEM_TOKEN_PROGRAM)
+
+
+def bonding_curve(sol_reserves, token_reserves, complete=False):
+    """pump.fun bonding curve account with virtual reserves in base units."""
+    data = bytes(8) + struct.pack(
+        "<QQQQQ?", token_reserves, sol_reserves, 0, 0, 10**15, complete
+    )
+    return account(data, PUMP_PROGRAM)
+
+
+def multiple_accounts(accounts):
+    """getMultipleAccounts handler returning the account of every known address."""
+    return lambda params: rpc_context([accounts.get(address) for address in params[0]])
+
+
+class TestReconciliation:
+
+    @pytest.mark.asyncio
+    async def test_reconcile(self, stub_rpc_server):
+        """Test balances and reserves are decoded, missing accounts are reported."""
+        owner = Keypair().pubkey()
+        held, sold, migrated = Pubkey.new_unique(), Pubkey.new_unique(), Pubkey.new_unique()
+        accounts = {
+            str(get_associated_token_address(owner, held)): token_account(held, owner, 2_500_000),
+            str(get_associated_token_address(owner, migrated)): token_account(
+                migrated, owner, 10**6
+            ),
+        }
+        for mint in (held, sold):
+            accounts[str(derive_bonding_curve_accounts(mint)[0])] = bonding_curve(
+                30 * 10**9, 1_073 * 10**12
+            )
+        accounts[str(derive_bonding_curve_accounts(migrated)[0])] = bonding_curve(
+            85 * 10**9, 279 * 10**12, complete=True
+        )
+        stub_rpc_server.results["getMultipleAccounts"] = multiple_accounts(accounts)
+
+        positions = await reconcile(AsyncClient(stub_rpc_server.url), owner, [held, sold, migrated])
+
+        assert positions[str(held)].balance == 2.5
+        assert positions[str(held)].sol_reserves == 30.0
+        assert positions[str(held)].token_reserves == 1_073_000_000.0
+        assert positions[str(held)].alive
+        assert positions[str(sold)].balance == 0
+        assert not positions[str(sold)].alive
+        assert positions[str(migrated)].complete
+        assert not positions[str(migrated)].alive
+
+    @pytest.mark.asyncio
+    async def test_batched(self, stub_rpc_server):
+        """Test the accounts are read in batches of at most 100 accounts."""
+        owner = Keypair().pubkey()
+        mints = [Pubkey.new_unique() for _ in range(120)]
+        stub_rpc_server.results["getMultipleAccounts"] = multiple_accounts({})
+
+        positions = await reconcile(AsyncClient(stub_rpc_server.url), owner, mints)
+
+        assert len(positions) == 120
+        calls = stub_rpc_server.called("getMultipleAccounts")
+        assert sorted(len(params[0]) for params in calls) == [40, 100, 100]
+        assert all(params[1]["encoding"] == "base64" for params in calls)
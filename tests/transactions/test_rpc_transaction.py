@@ -0,0 +1,77 @@
+import pytest
+
+from solana.rpc.async_api import AsyncClient
+from solders.keypair import Keypair
+from spl.token.instructions import get_associated_token_address
+
+from src.constants import PUMP_PROGRAM, SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM
+from src.models.token import Token
+from src.models.transaction import Transaction
+from src.transactions.rpc_transaction import RpcTransaction
+from tests.conftest import sent_transactions
+
+
+@pytest.fixture
+def buy_transaction(test_pubkey):
+    return Transaction(
+        token=Token(mint=test_pubkey, name="Test Token"),
+        txType="create",
+        vSolInBondingCurve=30.0,
+        vTokensInBondingCurve=1_073_000_000.0,
+    )
+
+
+def program_ids(transaction):
+    message = transaction.message
+    return [message.account_keys[ix.program_id_index] for ix in message.instructions]
+
+
+class TestRpcTransaction:
+
+    @pytest.mark.asyncio
+    async def test_buy_single_transaction(self, rpc_server, buy_transaction):
+        """Test the ATA is created by the buy transaction itself."""
+        account = Keypair()
+        known_atas = set()
+        rpc = RpcTransaction(
+            AsyncClient(rpc_server.url), buy_transaction, account, known_atas=known_atas
+        )
+
+        assert await rpc.send_buy_transaction(0.01)
+
+        transactions = sent_transactions(rpc_server)
+        assert len(transactions) == 1
+        assert program_ids(transactions[0])[-2:] == [
+            SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM,
+            PUMP_PROGRAM,
+        ]
+        assert rpc_server.called("getAccountInfo") == []
+        assert known_atas == {
+            get_associated_token_address(account.pubkey(), buy_transaction.token.mint)
+        }
+
+    @pytest.mark.asyncio
+    async def test_buy_known_ata(self, rpc_server, buy_transaction):
+        """Test the ATA creation is skipped when the ATA is known to exist."""
+        account = Keypair()
+        known_atas = {get_associated_token_address(account.pubkey(), buy_transaction.token.mint)}
+        rpc = RpcTransaction(
+            AsyncClient(rpc_server.url), buy_transaction, account, known_atas=known_atas
+        )
+
+        assert await rpc.send_buy_transaction(0.01)
+
+        transactions = sent_transactions(rpc_server)
+        assert SYSTEM_ASSOCIATED_TOKEN_ACCOUNT_PROGRAM not in program_ids(transactions[0])
+
+    @pytest.mark.asyncio
+    async def test_buy_failure_keeps_ata_unknown(self, rpc_server, buy_transaction):
+        """Test a failed buy doesn't mark the ATA as existing."""
+        rpc_server.drop.add("sendTransaction")
+        known_atas = set()
+        rpc = RpcTransaction(
+            AsyncClient(rpc_server.url), buy_transaction, Keypair(), known_atas=known_atas
+        )
+
+        assert await rpc.send_buy_transaction(0.01) is False
+        assert known_atas == set()